@@ -0,0 +1,189 @@
+"""Vectorized evaluation of many 3 x 3 boards at once.
+
+Requires NumPy. Boards are stored in (M, 9) int8 arrays, cell index is
+row * 3 + column (the order of GameBoard.get_board(string_format=True)),
+cell values are EMPTY, X or O - the digits of BitBoard.index.
+"""
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+EMPTY, X, O = 0, 1, 2
+SIGN_CODES = {' ': EMPTY, '_': EMPTY, 'X': X, 'O': O}
+WIN_LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # columns
+    (0, 4, 8), (2, 4, 6),             # diagonals
+)
+
+
+def _require_numpy():
+    """Function raising ImportError if NumPy is not installed."""
+    if np is None:
+        raise ImportError('batch module requires NumPy: pip install numpy')
+
+
+@lru_cache(maxsize=None)
+def _line_tables():
+    """Creates (8, 3) lines cells indexes and (8, 3, 9) one hot cells."""
+    lines = np.array(WIN_LINES, dtype=np.intp)
+    one_hot = np.zeros((8, 3, 9), dtype=np.int8)
+    for line_no, line in enumerate(WIN_LINES):
+        for position, cell in enumerate(line):
+            one_hot[line_no, position, cell] = 1
+    return lines, one_hot
+
+
+def encode(board_strings):
+    """Function to convert boards in '___X_O_XO' format into an array.
+
+    Params: board_strings (iterable): Board strings.
+
+    Returns: boards (ndarray): (M, 9) int8 array.
+
+    Raises: ValueError if a string is not 9 characters long or has other
+            characters than '_', ' ', 'X' and 'O'.
+    """
+    _require_numpy()
+    board_strings = list(board_strings)
+    for board_string in board_strings:
+        if len(board_string) != 9:
+            raise ValueError(f'Board string length should be 9: '
+                             f'{board_string!r}')
+    # characters other than the signs map to -1
+    table = np.full(256, -1, dtype=np.int8)
+    for sign, code in SIGN_CODES.items():
+        table[ord(sign)] = code
+    data = ''.join(board_strings).encode('ascii', errors='replace')
+    boards = table[np.frombuffer(data, dtype=np.uint8)].reshape(-1, 9)
+    if (boards < 0).any():
+        invalid = board_strings[int(np.argmax((boards < 0).any(axis=1)))]
+        raise ValueError(f'Board string should contain only "_", " ", "X" '
+                         f'and "O": {invalid!r}')
+    return boards
+
+
+def decode(boards):
+    """Function to convert (M, 9) array into list of '___X_O_XO' strings."""
+    _require_numpy()
+    signs = np.array([ord('_'), ord('X'), ord('O')], dtype=np.uint8)
+    data = signs[np.asarray(boards)].tobytes().decode('ascii')
+    return [data[i: i + 9] for i in range(0, len(data), 9)]
+
+
+def classify(boards):
+    """Function to evaluate many boards at once.
+
+    Params: boards (ndarray): (M, 9) int8 array of boards.
+
+    Returns: status (dict) of arrays:
+        terminal (M,) bool - True if the game is finished,
+        winner (M,) int8 - X, O or EMPTY if there is no winner,
+        to_move (M,) int8 - X or O, sign of the player to move,
+        legal (M, 9) bool - empty cells of not finished boards,
+        win_moves (M, 9) bool - moves winning for the player to move,
+        block_moves (M, 9) bool - moves blocking the opponent's win.
+    """
+    _require_numpy()
+    boards = np.asarray(boards, dtype=np.int8)
+    lines, one_hot = _line_tables()
+    line_cells = boards[:, lines]
+    x_count = (line_cells == X).sum(axis=2)
+    o_count = (line_cells == O).sum(axis=2)
+    empty_count = 3 - x_count - o_count
+
+    x_wins = (x_count == 3).any(axis=1)
+    o_wins = (o_count == 3).any(axis=1)
+    winner = np.where(x_wins, X, np.where(o_wins, O, EMPTY)).astype(np.int8)
+    empty = boards == EMPTY
+    terminal = x_wins | o_wins | ~empty.any(axis=1)
+    legal = empty & ~terminal[:, None]
+    x_to_move = (boards == X).sum(axis=1) == (boards == O).sum(axis=1)
+    to_move = np.where(x_to_move, X, O).astype(np.int8)
+
+    def completing_moves(count):
+        # the empty cell of lines holding two signs of one player
+        open_lines = (count == 2) & (empty_count == 1)
+        cells = (line_cells == EMPTY) & open_lines[:, :, None]
+        hits = np.tensordot(cells.astype(np.int8), one_hot,
+                            axes=([1, 2], [0, 1]))
+        return (hits > 0) & legal
+
+    x_moves = completing_moves(x_count)
+    o_moves = completing_moves(o_count)
+    x_to_move = x_to_move[:, None]
+    return {
+        'terminal': terminal,
+        'winner': winner,
+        'to_move': to_move,
+        'legal': legal,
+        'win_moves': np.where(x_to_move, x_moves, o_moves),
+        'block_moves': np.where(x_to_move, o_moves, x_moves),
+    }
+
+
+def random_cells(masks, rng):
+    """Function to pick a random cell from every row of masks.
+
+    Params:
+        masks (ndarray): (M, 9) bool array of allowed cells.
+        rng (numpy.random.Generator): Random generator.
+
+    Returns: cells (ndarray): (M,) cells indexes, -1 for empty masks.
+    """
+    weights = rng.random(masks.shape) * masks
+    cells = weights.argmax(axis=1)
+    return np.where(masks.any(axis=1), cells, -1)
+
+
+def easy_policy(status, rng):
+    """Batched 'easy' bot - a random legal move for every board."""
+    return random_cells(status['legal'], rng)
+
+
+def medium_policy(status, rng):
+    """Batched 'medium' bot - a winning move, a blocking move or a random
+    legal move for every board, -1 for finished boards."""
+    win_moves, block_moves = status['win_moves'], status['block_moves']
+    has_win = win_moves.any(axis=1)[:, None]
+    has_block = block_moves.any(axis=1)[:, None]
+    masks = np.where(has_win, win_moves,
+                     np.where(has_block, block_moves, status['legal']))
+    return random_cells(masks, rng)
+
+
+# vectorized policies by name, see play_lockstep
+POLICIES = {'easy': easy_policy, 'medium': medium_policy}
+
+
+def play_lockstep(games, policy_x='medium', policy_o='medium', seed=None):
+    """Function to play many games in lockstep, every ply of all games is
+    made with a single vectorized policy call.
+
+    Params:
+        games (int): Number of games.
+        policy_x (str): Default = 'medium', policy of X, see POLICIES.
+        policy_o (str): Default = 'medium', policy of O, see POLICIES.
+        seed (int): Default = None, seed of NumPy random generator.
+
+    Returns:
+        winners (ndarray): (games,) int8 array - X, O or EMPTY for a draw.
+        boards (ndarray): (games, 9) int8 array of final boards.
+    """
+    _require_numpy()
+    for policy in (policy_x, policy_o):
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown policy: {policy}')
+    rng = np.random.default_rng(seed)
+    boards = np.zeros((games, 9), dtype=np.int8)
+    rows = np.arange(games)
+    for ply in range(9):
+        sign, policy = (X, policy_x) if ply % 2 == 0 else (O, policy_o)
+        status = classify(boards)
+        cells = POLICIES[policy](status, rng)
+        active = cells >= 0
+        boards[rows[active], cells[active]] = sign
+    return classify(boards)['winner'], boards
@@ -0,0 +1,104 @@
+"""Checks that SearchState search allocates no memory per visited position
+and that the 'tactical' bot's ThreatBoard chooses moves without allocating.
+
+Every search is run once to warm up, then repeated under tracemalloc, the
+peak of traced memory over the repeated searches should not grow.
+Exits with status 1 if any search allocated memory.
+
+Run from the repository root:
+    python benchmarks/alloc_check.py
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_board import GameBoard  # noqa: E402
+from search_state import SearchState, X, O  # noqa: E402
+from threats import ThreatBoard  # noqa: E402
+
+POSITIONS = {
+    'empty': ('_________', None),
+    'opening': ('X___O____', None),
+    'mid-game': ('X_O_X__O_', None),
+    '4x4 K=3': ('X____O____X__O__', 3),
+}
+REPEATS = 20
+
+
+def search_allocations(board_string, win_length):
+    """Function to measure memory allocated by repeated searches.
+
+    Params:
+        board_string (str): Position in '___X_O_XO' format.
+        win_length (int): Number of signs in a row needed to win or None.
+
+    Returns: (nodes per search, peak of allocated bytes)
+    """
+    board = GameBoard.from_string(board_string, init=False)
+    state = SearchState.from_rows(board, win_length, count_nodes=True)
+    player = X if board_string.count('X') == board_string.count('O') else O
+    top = 2 * (state.size * state.size + 1)
+    state.negamax(player, -1, top + 1)
+    nodes = state.nodes
+    state.count_nodes = False
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    repeat = 0
+    while repeat < REPEATS:
+        state.negamax(player, -1, top + 1)
+        repeat += 1
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return nodes, peak - before
+
+
+def tactical_allocations(board_string, win_length):
+    """Function to measure memory allocated by repeated resets of one
+    ThreatBoard to the position and choices of the tactical moves.
+
+    Returns: (moves chosen, peak of allocated bytes)
+    """
+    board = GameBoard.from_string(board_string, init=False)
+    player = X if board_string.count('X') == board_string.count('O') else O
+    state = ThreatBoard(len(board), win_length)
+    # warm up, the interpreter specializes the code of the first calls
+    repeat = 0
+    while repeat < REPEATS:
+        state.set_rows(board)
+        state.candidates(player)
+        repeat += 1
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    repeat = 0
+    while repeat < REPEATS:
+        state.set_rows(board)
+        state.candidates(player)
+        repeat += 1
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return REPEATS, peak - before
+
+
+def main():
+    failed = False
+    for check, counted in ((search_allocations, 'nodes'),
+                           (tactical_allocations, 'moves')):
+        print(f'{check.__name__}')
+        print(f'{"position":<10} {counted:>10} {"bytes":>8}')
+        for name, (board_string, win_length) in POSITIONS.items():
+            count, allocated = check(board_string, win_length)
+            failed = failed or allocated > 0
+            if check is search_allocations:
+                count *= REPEATS
+            print(f'{name:<10} {count:>10} {allocated:>8}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
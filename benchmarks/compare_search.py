@@ -0,0 +1,62 @@
+"""Compares number of positions visited by the 'hard' bot searches.
+
+Run from the repository root:
+    python benchmarks/compare_search.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BitBoard  # noqa: E402
+from game_board import GameBoard  # noqa: E402
+from player import Bot  # noqa: E402
+from search_state import SearchState, SIGN_CODES  # noqa: E402
+
+POSITIONS = {
+    'empty': '_________',
+    'opening': 'X___O____',
+    'mid-game': 'X_O_X__O_',
+}
+
+
+def count_nodes(search, use_cache, board_string):
+    """Function to count nodes of one search from a fresh cache.
+
+    Params:
+        search (str): Bot search algorithm.
+        use_cache (bool): Defines if transposition table is used.
+        board_string (str): Position in '___X_O_XO' format.
+
+    Returns: (best move, search_nodes)
+    """
+    sign = BitBoard.from_string(board_string).sign_to_move()
+    bot = Bot('hard', search=search, use_cache=use_cache, sign=sign)
+    Bot.transposition_table.clear()
+    if search == 'minimax':
+        board = GameBoard.from_string(board_string, init=False)
+        best = bot.minimax(board, 0, True)
+    elif search == 'bitboard':
+        best = bot.bitboard_minimax(BitBoard.from_string(board_string), True)
+    elif search == 'state':
+        # SearchState has no cache, it counts its own nodes
+        board = GameBoard.from_string(board_string, init=False)
+        state = SearchState.from_rows(board, count_nodes=True)
+        return state.best_move(SIGN_CODES[sign]), state.nodes
+    else:
+        best = bot.alphabeta_root(BitBoard.from_string(board_string))
+    return best, bot.search_nodes
+
+
+def main():
+    print(f'{"position":<10} {"search":<10} {"cache":<6} {"nodes":>8}  best')
+    for name, board_string in POSITIONS.items():
+        for search in Bot.SEARCHES:
+            for use_cache in (False, True):
+                best, nodes = count_nodes(search, use_cache, board_string)
+                print(f'{name:<10} {search:<10} {str(use_cache):<6} '
+                      f'{nodes:>8}  {best}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Checks the import time of the main.py entry point against a budget.
+
+'import main' is run in fresh interpreters under 'python -X importtime',
+the best of several runs is compared with the budget. Optional engines
+(solution table, MCTS, NumPy batch path) and the subcommand modules must
+not be imported by it at all, they are loaded by the subcommands using
+them. Exits with status 1 if the budget is exceeded or a lazy module was
+imported.
+
+Run from the repository root:
+    python benchmarks/import_budget.py [--budget MS] [--repeats N]
+The default budget leaves headroom on a typical machine, tighten it on the
+box that runs the check.
+"""
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = 12.0
+REPEATS = 7
+# modules loaded only by the subcommands or bot levels using them
+LAZY_MODULES = ('argparse', 'asyncio', 'batch', 'concurrent.futures',
+                'game_log', 'learned', 'mcts', 'metrics', 'numpy', 'server',
+                'simulate', 'solution_table', 'tournament')
+
+
+def python(*args):
+    """Function to run a fresh interpreter in the repository root.
+    Bytecode is written, so the runs measure loading, not compiling.
+
+    Returns: stderr and stdout (tuple) of the process.
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    process = subprocess.run([sys.executable, *args], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True)
+    return process.stderr, process.stdout
+
+
+def import_times(module):
+    """Function to measure one import of the module.
+
+    Returns: times (dict): Cumulative microseconds by module name.
+    """
+    stderr = python('-X', 'importtime', '-c', f'import {module}')[0]
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Check the import time of main.py.')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help='milliseconds allowed for import main')
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    args = parser.parse_args(argv)
+
+    compileall.compile_dir(ROOT, maxlevels=0, quiet=1)
+    # the first run also writes the bitboard tables cache
+    python('-c', 'import main')
+    best = min((import_times('main') for _ in range(args.repeats)),
+               key=lambda times: times['main'])
+    modules = python('-c', 'import sys, main; print(*sys.modules)')[1]
+    loaded = sorted(set(modules.split()) & set(LAZY_MODULES))
+
+    repo_modules = {name[:-3] for name in os.listdir(ROOT)
+                    if name.endswith('.py')}
+    print(f'{"module":<16} {"cumulative ms":>14}')
+    for name, time in sorted(best.items(), key=lambda item: -item[1]):
+        if name in repo_modules:
+            print(f'{name:<16} {time / 1000:>14.2f}')
+    failed = False
+    if best['main'] > args.budget * 1000:
+        print(f'import main took {best["main"] / 1000:.2f} ms, over the '
+              f'budget of {args.budget:.2f} ms')
+        failed = True
+    if loaded:
+        print(f'import main loaded lazy modules: {", ".join(loaded)}')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
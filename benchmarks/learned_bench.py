@@ -0,0 +1,112 @@
+"""Benchmarks training of the 'learned' bot: training games per second and
+convergence towards the 'hard' bot's perfect play.
+
+After every stage of training the policy is checked against the retrograde
+solver in every reachable position ('lost value' counts the positions
+where the policy's move gives up the position's outcome, 0 means perfect
+play) and plays the 'hard' bot and the 'easy' bot with both signs.
+
+Run from the repository root:
+    python benchmarks/learned_bench.py [--games N ...] [--opponents LEVEL ...]
+                                       [--easy-games N] [--seed S]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import CELL_MASKS, IS_WIN, BitBoard  # noqa: E402
+from learned import (DEFAULT_OPPONENTS, POWERS, SELF,  # noqa: E402
+                     SelfPlayTrainer)
+from player import Bot  # noqa: E402
+from retrograde import RetrogradeSolver  # noqa: E402
+from rng import derive_seed  # noqa: E402
+
+STAGES = (5000, 10000, 20000, 50000, 100000, 200000)
+
+
+def lost_value(policy, solver):
+    """Function to count reachable positions where the policy's move loses
+    the position's outcome.
+    """
+    lost = 0
+    for key, value in solver.values.items():
+        if value >> 2 == 0:
+            continue
+        move = divmod(policy.move(key), 3)
+        for cords, outcome, _distance in solver.moves(
+                BitBoard.from_index(key).to_rows()):
+            if cords == move:
+                lost += outcome != value & 3
+    return lost
+
+
+def versus(policy, level, games, seed):
+    """Function to play the policy against a bot, half of the games with
+    every sign.
+
+    Returns: results (dict): policy's wins, losses and draws.
+    """
+    results = {'win': 0, 'loss': 0, 'draw': 0}
+    for game_no in range(games):
+        policy_side = game_no % 2
+        bot = Bot(level, verbose=False, sign='XO'[1 - policy_side],
+                  seed=derive_seed(seed, game_no))
+        masks = [0, 0]
+        index = 0
+        winner = None
+        for ply in range(9):
+            side = ply % 2
+            if side == policy_side:
+                cell = policy.move(index)
+            else:
+                cord_x, cord_y = bot.get_cords(
+                    BitBoard(masks[0], masks[1]).to_rows())
+                cell = cord_x * 3 + cord_y
+            masks[side] |= CELL_MASKS[cell]
+            index += (side + 1) * POWERS[cell]
+            if IS_WIN[masks[side]]:
+                winner = side
+                break
+        if winner is None:
+            results['draw'] += 1
+        elif winner == policy_side:
+            results['win'] += 1
+        else:
+            results['loss'] += 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, nargs='+', default=STAGES,
+                        help='total training games after every stage')
+    parser.add_argument('--opponents', nargs='+', default=DEFAULT_OPPONENTS,
+                        choices=(SELF,) + Bot.LEVELS)
+    parser.add_argument('--easy-games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    solver = RetrogradeSolver(3).solve()
+    trainer = SelfPlayTrainer(opponents=args.opponents, seed=args.seed)
+    print(f'{"games":>8} {"games/s":>9} {"lost value":>11}'
+          f' {"vs hard (w/l/d)":>16} {"vs easy (w/l/d)":>16}')
+    for total in args.games:
+        games = total - trainer.policy.games
+        started = time.perf_counter()
+        trainer.train(games)
+        elapsed = time.perf_counter() - started
+        # the 'hard' bot and the policy play deterministically
+        hard = versus(trainer.policy, 'hard', 2, args.seed)
+        easy = versus(trainer.policy, 'easy', args.easy_games, args.seed)
+        hard = '/'.join(str(value) for value in hard.values())
+        easy = '/'.join(str(value) for value in easy.values())
+        print(f'{total:>8} {games / elapsed:>9.0f}'
+              f' {lost_value(trainer.policy, solver):>11}'
+              f' {hard:>16} {easy:>16}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Benchmarks the 'mcts' bot: rollouts per second and results against
+the 'hard' bot for several rollout budgets.
+
+Run from the repository root:
+    python benchmarks/mcts_bench.py [--games N] [--seed S]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import TicTacToe  # noqa: E402
+from mcts import MonteCarloTreeSearch  # noqa: E402
+from simulate import play_headless  # noqa: E402
+
+BUDGETS = (10, 50, 200, 1000)
+
+
+def rollouts_per_second(rollouts, size=3, win_length=None):
+    """Function to measure rollouts per second from the empty board."""
+    search = MonteCarloTreeSearch(rollouts=rollouts)
+    board = [[' '] * size for _ in range(size)]
+    search.search(board, 'X', win_length)
+    return search.rollouts_done / search.elapsed
+
+
+def versus_hard(rollouts, games, reuse_tree=False):
+    """Function to play the 'mcts' bot against the 'hard' bot, half of
+    the games with every sign.
+
+    Returns: results (dict): mcts wins, losses and draws.
+    """
+    results = {'win': 0, 'loss': 0, 'draw': 0}
+    for game_no in range(games):
+        players = ('mcts', 'hard') if game_no % 2 == 0 else ('hard', 'mcts')
+        game = TicTacToe(*players, render=False)
+        for player in (game.player1, game.player2):
+            if player.bot_level == 'mcts':
+                player.tree_search = MonteCarloTreeSearch(
+                    rollouts=rollouts, reuse_tree=reuse_tree)
+                mcts_sign = player.sign
+        winner = play_headless(game)[0]
+        if winner is None:
+            results['draw'] += 1
+        elif winner == mcts_sign:
+            results['win'] += 1
+        else:
+            results['loss'] += 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    print(f'{"rollouts":>8} {"rollouts/s 3x3":>15} {"rollouts/s 9x9":>15}'
+          f' {"vs hard (w/l/d)":>16} {"reuse tree":>12}')
+    for rollouts in BUDGETS:
+        results = versus_hard(rollouts, args.games)
+        reused = versus_hard(rollouts, args.games, reuse_tree=True)
+        results = '/'.join(str(value) for value in results.values())
+        reused = '/'.join(str(value) for value in reused.values())
+        print(f'{rollouts:>8} {rollouts_per_second(rollouts):>15.0f}'
+              f' {rollouts_per_second(rollouts, 9, 5):>15.0f}'
+              f' {results:>16} {reused:>12}')
+
+
+if __name__ == '__main__':
+    main()
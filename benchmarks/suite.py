@@ -0,0 +1,230 @@
+"""Reproducible micro and macro benchmark suite with regression gating.
+
+Micro benchmarks time the board and search functions from fixed
+positions, macro benchmarks time whole headless play_game runs per bot
+pairing. Every benchmark reseeds random before it runs, so the same moves
+are played on every run, and the 'hard' bot always searches instead of
+reading the optional solution table file. Throughput is the best of
+several repeats, in calls (or games) per second.
+
+Run from the repository root:
+    python benchmarks/suite.py run [--output FILE] [--only NAME]
+    python benchmarks/suite.py baseline [--baseline FILE]
+    python benchmarks/suite.py compare [--baseline FILE] [--threshold T]
+'compare' exits with status 1 if any benchmark is slower than the
+baseline by more than the threshold (default 0.2, i.e. 20 %).
+Baselines are machine specific, record one on the box that runs compare.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# the solution table file is optional, the benchmarks must not depend on it
+os.environ['TICTACTOE_SOLUTION_TABLE'] = os.devnull
+
+from game_board import GameBoard  # noqa: E402
+from main import play_game  # noqa: E402
+from player import Bot  # noqa: E402
+
+SEED = 20240601
+REPEATS = 5
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_THRESHOLD = 0.2
+POSITIONS = {
+    'empty': '_________',
+    'mid-game': 'X_O_X__O_',
+    'near-terminal': 'XOXOOX_X_',
+}
+MINIMAX_CALLS = {'empty': 5, 'mid-game': 100, 'near-terminal': 1000}
+# games per repeat of every bot pairing
+GAMES = {('easy', 'easy'): 1000, ('medium', 'medium'): 1000,
+         ('hard', 'easy'): 50, ('hard', 'hard'): 50, ('mcts', 'medium'): 3,
+         ('tactical', 'medium'): 500}
+
+
+def time_calls(function, number):
+    """Function to time one repeat of a benchmark.
+
+    Params:
+        function (function): Function called without arguments.
+        number (int): Number of calls.
+
+    Returns: elapsed (float): Seconds spent by the calls.
+    """
+    random.seed(SEED)
+    # as in timeit, garbage collection is not part of the measured time
+    gc.collect()
+    gc.disable()
+    try:
+        start = perf_counter()
+        for _ in range(number):
+            function()
+        return perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def minimax_call(board_string):
+    """Function to create a call of 'hard' bot minimax from a fresh cache."""
+    board = GameBoard.from_string(board_string, init=False)
+    sign = 'X' if board_string.count('X') == board_string.count('O') \
+        else 'O'
+    bot = Bot('hard', search='minimax', verbose=False, sign=sign)
+
+    def call():
+        Bot.transposition_table.clear()
+        bot.minimax(board, 0, True)
+    return call
+
+
+def game_call(player_1, player_2):
+    """Function to create a call playing one headless game."""
+    def call():
+        Bot.transposition_table.clear()
+        play_game(player_1, player_2, render=False)
+    return call
+
+
+def benchmarks():
+    """Function to create dict of benchmarks.
+
+    Returns: benchmarks (dict): (function, calls per repeat) by name.
+    """
+    suite = {}
+    for name, board_string in POSITIONS.items():
+        board = GameBoard.from_string(board_string, init=False)
+        suite[f'micro/is_finished/{name}'] = (
+            lambda board=board: GameBoard.is_finished(board), 50000)
+        suite[f'micro/get_empty_cells/{name}'] = (
+            lambda board=board: GameBoard.get_empty_cells(board), 50000)
+        suite[f'micro/from_string/{name}'] = (
+            lambda string=board_string: GameBoard.from_string(string), 20000)
+        suite[f'micro/get_winning_moves/{name}'] = (
+            lambda board=board: Bot.get_winning_moves(board), 20000)
+        suite[f'micro/minimax/{name}'] = (
+            minimax_call(board_string), MINIMAX_CALLS[name])
+    for player_1, player_2 in GAMES:
+        suite[f'macro/play_game/{player_1}-{player_2}'] = (
+            game_call(player_1, player_2), GAMES[player_1, player_2])
+    return suite
+
+
+def run(only=None, repeats=REPEATS, verbose=True):
+    """Function to run the benchmarks. The repeats go round all benchmarks,
+    so a slow spell of a shared machine does not hit only some of them.
+
+    Params:
+        only (str): Default = None, run only benchmarks with the substring
+                    in their names.
+        repeats (int): Default = REPEATS, number of repeats.
+        verbose (bool): Default = True, print every result.
+
+    Returns: results (dict): Throughput of the fastest repeat by benchmark
+             name, calls per second.
+    """
+    suite = {name: benchmark for name, benchmark in benchmarks().items()
+             if only is None or only in name}
+    best = {}
+    for _ in range(repeats):
+        for name, (function, number) in suite.items():
+            elapsed = time_calls(function, number)
+            best[name] = min(best.get(name, elapsed), elapsed)
+    results = {name: suite[name][1] / elapsed
+               for name, elapsed in best.items()}
+    if verbose:
+        for name, throughput in results.items():
+            print(f'{name:<45} {throughput:>14.1f} /s', file=sys.stderr)
+    return results
+
+
+def environment():
+    """Function to describe the machine the benchmarks ran on."""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'seed': SEED,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Function to compare results with the baseline.
+
+    Params:
+        results (dict): Throughput by benchmark name.
+        baseline (dict): Baseline throughput by benchmark name.
+        threshold (float): Default = DEFAULT_THRESHOLD, allowed relative
+                           slowdown.
+
+    Returns: regressions (list): Names of benchmarks slower than allowed.
+    """
+    regressions = []
+    print(f'{"benchmark":<45} {"baseline":>12} {"current":>12} {"change":>8}')
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f'{name:<45} {"-":>12} {current:>12.1f} {"new":>8}')
+            continue
+        change = current / previous - 1
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:<45} {previous:>12.1f} {current:>12.1f} '
+              f'{change:>+8.1%}{flag}')
+    return regressions
+
+
+def build_parser():
+    """Function to create benchmark suite arguments parser."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=('run', 'baseline', 'compare'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='baseline file')
+    parser.add_argument('--threshold', type=float,
+                        default=DEFAULT_THRESHOLD,
+                        help='allowed relative slowdown')
+    parser.add_argument('--only', help='run benchmarks containing the text')
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--output', help='run: write JSON results to file')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'compare':
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline['environment'] != environment():
+            print('Warning: the baseline was recorded in a different '
+                  'environment', baseline['environment'], file=sys.stderr)
+        results = run(args.only, args.repeats, verbose=False)
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f'{len(regressions)} benchmark(s) regressed more than '
+                  f'{args.threshold:.0%}')
+            return 1
+        return 0
+
+    report = {'environment': environment(),
+              'results': run(args.only, args.repeats)}
+    report_json = json.dumps(report, indent=2, sort_keys=True)
+    path = args.baseline if args.command == 'baseline' else args.output
+    if path:
+        with open(path, 'w') as output_file:
+            output_file.write(report_json + '\n')
+    else:
+        print(report_json)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Validates bots and searches against the retrograde solver.
+
+The board is solved by retrograde.py, then every bot level (and every
+'hard' bot search) is asked for a move in every reachable not finished
+position, and the move is checked to keep the position's outcome. The
+perfect players - the 'hard' bot searches - must keep it in every
+position, the other levels are only reported. Finished positions are also
+checked to agree with GameBoard.is_finished.
+Exits with status 1 if a perfect player lost a position's value.
+
+Run from the repository root:
+    python benchmarks/validate_bots.py [--size N] [--win-length K]
+                                       [--levels LEVEL ...]
+                                       [--searches SEARCH ...]
+                                       [--min-stones N] [--limit N]
+Boards larger than 3 x 3 take minutes to solve, limit the validated
+positions with --min-stones and --limit.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_board import GameBoard  # noqa: E402
+from player import Bot  # noqa: E402
+from retrograde import EMPTY, RetrogradeSolver, X  # noqa: E402
+
+DEFAULT_LEVELS = ('medium', 'tactical')
+DEFAULT_SEARCHES = ('alphabeta', 'bitboard', 'minimax', 'state', 'table')
+# searches working only on 3 x 3 board
+SEARCHES_3X3 = ('alphabeta', 'bitboard', 'table')
+SEED = 20240601
+
+
+def to_rows(solver, cells):
+    """Function to create list of rows from cell codes."""
+    signs = ' XO'
+    return [[signs[cells[row * solver.size + column]]
+             for column in range(solver.size)]
+            for row in range(solver.size)]
+
+
+def positions(solver, min_stones=0, limit=None):
+    """Function to list the not finished positions to validate.
+
+    Returns: positions (list): (key, cell codes) tuples, a random sample of
+             limit positions if limit is given.
+    """
+    found = []
+    for key, value in solver.values.items():
+        cells = solver.digits(key)
+        if value >> 2 and len(cells) - cells.count(EMPTY) >= min_stones:
+            found.append((key, cells))
+    found.sort()
+    if limit is not None and len(found) > limit:
+        found = random.Random(SEED).sample(found, limit)
+    return found
+
+
+def check_finished(solver):
+    """Function to count positions where the solver and GameBoard disagree
+    whether the game is finished.
+    """
+    mismatches = 0
+    for key, value in solver.values.items():
+        rows = to_rows(solver, solver.digits(key))
+        finished = GameBoard.is_finished(rows,
+                                         win_length=solver.win_length)[0]
+        mismatches += finished != (value >> 2 == 0)
+    return mismatches
+
+
+def validate(solver, bot_factory, validated):
+    """Function to count moves losing the position's value.
+
+    Params:
+        solver (RetrogradeSolver): Solved game graph.
+        bot_factory (function): Creates Bot object for sign 'X' or 'O'.
+        validated (list): Positions, see positions function.
+
+    Returns: (moves losing the outcome, moves keeping the outcome but not
+             the distance to mate)
+    """
+    bots = {'X': bot_factory('X'), 'O': bot_factory('O')}
+    lost = slower = 0
+    for key, cells in validated:
+        rows = to_rows(solver, cells)
+        sign = 'X' if solver.player_to_move(cells) == X else 'O'
+        outcome, distance = solver.lookup(rows)
+        move = tuple(bots[sign].get_cords([row.copy() for row in rows]))
+        for cords, move_outcome, move_distance in solver.moves(rows):
+            if cords == move:
+                lost += move_outcome != outcome
+                slower += move_outcome == outcome \
+                    and move_distance != distance
+                break
+        else:
+            raise ValueError(f'illegal move {move} in {rows}')
+    return lost, slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Validate bots against the retrograde solver.')
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--levels', nargs='*', default=DEFAULT_LEVELS,
+                        choices=Bot.LEVELS)
+    parser.add_argument('--searches', nargs='*', default=DEFAULT_SEARCHES,
+                        choices=Bot.SEARCHES)
+    parser.add_argument('--min-stones', type=int, default=0,
+                        help='validate positions with at least N signs')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='validate a random sample of N positions')
+    args = parser.parse_args(argv)
+
+    random.seed(SEED)
+    solver = RetrogradeSolver(args.size, args.win_length).solve()
+    validated = positions(solver, args.min_stones, args.limit)
+    print(f'{len(solver.values)} positions solved, '
+          f'{len(validated)} validated')
+    failed = False
+    mismatches = check_finished(solver)
+    print(f'{"finished positions":<24} {mismatches:>8} mismatches')
+    failed = failed or mismatches > 0
+
+    players = [(f'hard/{search}', True,
+                lambda sign, search=search: Bot(
+                    'hard', search=search, verbose=False, sign=sign,
+                    win_length=args.win_length))
+               for search in args.searches
+               if args.size == 3 or search not in SEARCHES_3X3]
+    players += [(level, False,
+                 lambda sign, level=level: Bot(
+                     level, verbose=False, sign=sign,
+                     win_length=args.win_length))
+                for level in args.levels]
+    print(f'{"player":<24} {"lost value":>10} {"slower":>8}')
+    for name, perfect, bot_factory in players:
+        lost, slower = validate(solver, bot_factory, validated)
+        print(f'{name:<24} {lost:>10} {slower:>8}')
+        failed = failed or (perfect and lost > 0)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,324 @@
+import marshal
+import os
+import sys
+
+from game_board import GameBoard
+from symmetry import SYMMETRIES
+
+# Cell index is row * 3 + column, bit number 'index' of a mask is set
+# if the cell is taken by the mask's player.
+CELL_MASKS = tuple(1 << index for index in range(9))
+FULL_MASK = 0b111111111
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+
+
+def _build_win_table():
+    """Creates table telling if mask of 9 bits contains a winning line."""
+    return bytes(any(mask & line == line for line in WIN_MASKS)
+                 for mask in range(FULL_MASK + 1))
+
+
+def _build_empty_cells_table():
+    """Creates table of empty cells indexes for every occupied cells mask."""
+    return tuple(tuple(index for index in range(9)
+                       if not occupied & CELL_MASKS[index])
+                 for occupied in range(FULL_MASK + 1))
+
+
+def _build_symmetry_tables():
+    """Creates tables mapping every mask to its 8 symmetric masks."""
+    tables = []
+    for permutation in SYMMETRIES:
+        table = []
+        for mask in range(FULL_MASK + 1):
+            permuted = 0
+            for index, source in enumerate(permutation):
+                if mask & CELL_MASKS[source]:
+                    permuted |= CELL_MASKS[index]
+            table.append(permuted)
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+def _build_base3_table():
+    """Creates table of base 3 values (digit 1 in every set bit) of masks."""
+    return tuple(sum(3 ** index for index in range(9)
+                     if mask & CELL_MASKS[index])
+                 for mask in range(FULL_MASK + 1))
+
+
+# bump when the tables change, a cache of other version is rebuilt
+TABLES_VERSION = 1
+
+
+def _cache_path():
+    """Function to place the tables cache where the interpreter puts the
+    compiled modules: '__pycache__' next to the source, or the source
+    directory under sys.pycache_prefix (PYTHONPYCACHEPREFIX) if it is set.
+    """
+    name = f'bitboard_tables.{sys.implementation.cache_tag}.bin'
+    head = os.path.dirname(os.path.abspath(__file__))
+    if sys.pycache_prefix is None:
+        return os.path.join(head, '__pycache__', name)
+    head = os.path.splitdrive(head)[1].lstrip(os.sep + (os.altsep or ''))
+    return os.path.join(sys.pycache_prefix, head, name)
+
+
+TABLES_CACHE = _cache_path()
+
+
+def _build_tables():
+    """Creates all lookup tables, see the module constants below."""
+    return (_build_win_table(),
+            bytes(bin(mask).count('1') for mask in range(FULL_MASK + 1)),
+            _build_base3_table(),
+            _build_empty_cells_table(),
+            _build_symmetry_tables())
+
+
+def _load_tables(path=TABLES_CACHE):
+    """Function to read the lookup tables from the marshal cache file.
+    Building the tables takes several milliseconds, which would be paid by
+    every process start, so they are built once and cached next to the
+    compiled modules. A missing, stale or unreadable cache is rebuilt, a
+    cache that cannot be written is skipped, and like bytecode it is not
+    written if sys.dont_write_bytecode is set (PYTHONDONTWRITEBYTECODE).
+
+    Params: path (str): Default = TABLES_CACHE, path of the cache file.
+
+    Returns: tables (tuple): IS_WIN, STONE_COUNT, BASE3, EMPTY_CELLS and
+             SYMMETRY_TABLES.
+    """
+    key = (TABLES_VERSION, WIN_MASKS, SYMMETRIES)
+    try:
+        with open(path, 'rb') as cache_file:
+            cached_key, tables = marshal.loads(cache_file.read())
+        if cached_key == key:
+            return tables
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    tables = _build_tables()
+    if sys.dont_write_bytecode:
+        return tables
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as cache_file:
+            marshal.dump((key, tables), cache_file)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return tables
+
+
+IS_WIN, STONE_COUNT, BASE3, EMPTY_CELLS, SYMMETRY_TABLES = _load_tables()
+# number of base 3 board indexes, see BitBoard.index
+POSITIONS_COUNT = 3 ** 9
+
+
+class BitBoard:
+    """Compact Tic Tac Toe board stored as two 9 bit integers.
+
+    Attributes:
+        x_mask (int): Mask of cells taken by 'X'.
+        o_mask (int): Mask of cells taken by 'O'.
+        history (list): Stack of played cell indexes used by undo.
+    """
+    __slots__ = ('x_mask', 'o_mask', 'history')
+
+    def __init__(self, x_mask=0, o_mask=0):
+        """The constructor for BitBoard class.
+        Params:
+            x_mask (int): Default = 0, mask of cells taken by 'X'.
+            o_mask (int): Default = 0, mask of cells taken by 'O'.
+        """
+        self.x_mask = x_mask
+        self.o_mask = o_mask
+        self.history = []
+
+    @classmethod
+    def from_rows(cls, board):
+        """Class method to construct BitBoard from list of rows."""
+        x_mask = o_mask = 0
+        for row_no, row in enumerate(board):
+            for cell_no, cell in enumerate(row):
+                if cell == 'X':
+                    x_mask |= CELL_MASKS[row_no * 3 + cell_no]
+                elif cell == 'O':
+                    o_mask |= CELL_MASKS[row_no * 3 + cell_no]
+        return cls(x_mask, o_mask)
+
+    @classmethod
+    def from_string(cls, string):
+        """Class method to construct BitBoard from '___XO_XOO' string."""
+        x_mask = o_mask = 0
+        for index, cell in enumerate(string):
+            if cell == 'X':
+                x_mask |= CELL_MASKS[index]
+            elif cell == 'O':
+                o_mask |= CELL_MASKS[index]
+        return cls(x_mask, o_mask)
+
+    def place(self, index, sign):
+        """Method to put 'X' or 'O' sign into cell of given index."""
+        if sign == 'X':
+            self.x_mask |= CELL_MASKS[index]
+        else:
+            self.o_mask |= CELL_MASKS[index]
+        self.history.append(index)
+
+    def undo(self):
+        """Method to take back the last placed sign."""
+        clear = FULL_MASK ^ CELL_MASKS[self.history.pop()]
+        self.x_mask &= clear
+        self.o_mask &= clear
+
+    def copy(self):
+        """Returns copy of the board without the undo history."""
+        return BitBoard(self.x_mask, self.o_mask)
+
+    def empty_cells(self):
+        """Returns tuple of empty cells indexes."""
+        return EMPTY_CELLS[self.x_mask | self.o_mask]
+
+    def stone_count(self):
+        """Returns number of signs placed on the board."""
+        return STONE_COUNT[self.x_mask | self.o_mask]
+
+    def sign_to_move(self):
+        """Returns sign of the player to move, 'X' always starts."""
+        return 'X' if STONE_COUNT[self.x_mask] == STONE_COUNT[self.o_mask] \
+            else 'O'
+
+    def is_finished(self):
+        """Method to evaluate the board's state.
+
+        Returns:
+            bool (bool): True if game is finished else False
+            winner (str/None): winner of the game if exists else None
+        """
+        if IS_WIN[self.x_mask]:
+            return True, 'X'
+        if IS_WIN[self.o_mask]:
+            return True, 'O'
+        if self.x_mask | self.o_mask == FULL_MASK:
+            return True, None
+        return False, None
+
+    def index(self):
+        """Returns base 3 index of the board, cell number 'i' is digit
+        number 'i' equal to 0 if the cell is empty, 1 for 'X', 2 for 'O'.
+        """
+        return BASE3[self.x_mask] + 2 * BASE3[self.o_mask]
+
+    @classmethod
+    def from_index(cls, index):
+        """Class method to construct BitBoard from base 3 index."""
+        x_mask = o_mask = 0
+        for cell in CELL_MASKS:
+            index, digit = divmod(index, 3)
+            if digit == 1:
+                x_mask |= cell
+            elif digit == 2:
+                o_mask |= cell
+        return cls(x_mask, o_mask)
+
+    def canonical(self):
+        """Returns (x_mask, o_mask) reduced under all 8 board symmetries."""
+        x_mask, o_mask = self.x_mask, self.o_mask
+        return min((table[x_mask], table[o_mask])
+                   for table in SYMMETRY_TABLES)
+
+    def to_string(self):
+        """Returns board in '___X_O_XO' format."""
+        return ''.join([
+            'X' if self.x_mask & mask else 'O' if self.o_mask & mask else '_'
+            for mask in CELL_MASKS])
+
+    def to_rows(self):
+        """Returns board as list of rows."""
+        string = self.to_string().replace('_', ' ')
+        return [list(string[i: i + 3]) for i in range(0, 9, 3)]
+
+
+class BitGameBoard(GameBoard):
+    """GameBoard working on top of BitBoard representation.
+
+    Attributes:
+        bits (BitBoard): Game board state.
+        size (int): Number of board's rows and columns, always 3.
+        win_length (int): Number of signs in a row needed to win, always 3.
+        winner (str): String representing winner if game is not finished
+                      the winner is None
+        moves (list): Cell indexes of the signs put into the board by
+                      input_to_board, in the order of the moves
+    """
+
+    def __init__(self, board=None, size=3, win_length=None):
+        """The constructor for BitGameBoard class
+        Params:
+            board (list): Default = None, used to construct BitGameBoard
+                          object using existing list of rows
+            size (int): Default = 3, only 3 x 3 boards are supported
+            win_length (int): Default = None, only 3 is supported
+        """
+        if size != 3 or win_length not in (None, 3):
+            raise ValueError('BitGameBoard supports only 3 x 3 board')
+        self.bits = BitBoard() if board is None else BitBoard.from_rows(board)
+        self.size = self.win_length = 3
+        self.winner = self.bits.is_finished()[1]
+        self.moves = []
+
+    @property
+    def board(self):
+        """Board as list of rows, rebuilt from the bit masks."""
+        return self.bits.to_rows()
+
+    @property
+    def empty_cells(self):
+        """List of (X,Y) coordinates tuples of board empty cells."""
+        return [divmod(index, 3) for index in self.bits.empty_cells()]
+
+    def input_to_board(self, x, y, sign):
+        """Method to put 'X' or 'O' sign into board's cell.
+
+        Params:
+            x (int): X coordinate - row number.
+            y (int): Y coordinate - column number.
+            sign (str): sign to be inserted into the board's cell.
+        """
+        self.bits.place(x * 3 + y, sign)
+        self.moves.append(x * 3 + y)
+
+    def board_empty_cells(self):
+        """Returns board's object empty cells"""
+        return self.empty_cells
+
+    def is_board_finished(self):
+        """Method to evaluate the game board's state.
+
+        Returns: True, winner if the game board is finished.
+                 False, None if the game is not finished.
+        """
+        _is_finished, self.winner = self.bits.is_finished()
+        return _is_finished, self.winner
+
+    def get_board(self, row_format=False, string_format=False):
+        """Method used to return current board.
+        Params:
+        row_format (bool): if True returns row1, row2, row3
+        string_format(bool): if True returns board in '___X_O_XO' format
+        Returns:
+            board: New list of rows.
+        """
+        if row_format:
+            row1, row2, row3 = self.board
+            return row1, row2, row3
+        elif string_format:
+            return self.bits.to_string()
+        else:
+            return self.board
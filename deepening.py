@@ -0,0 +1,223 @@
+"""Depth limited iterative deepening search for boards of any size.
+
+The search deepens one move at a time until the time or node budget runs
+out and returns the best move of the deepest completed iteration.
+Positions at the depth limit are scored with a pluggable evaluation
+function, see open_lines_heuristic.
+"""
+from time import perf_counter
+
+from game_board import GameBoard, winning_lines
+
+WIN_SCORE = 1_000_000
+SIGNS_DICT = {'O': 'X', 'X': 'O'}
+
+
+def open_lines_heuristic(board, sign, win_length):
+    """Function to evaluate the board by counting open lines.
+    A line is open for a player if the opponent has no sign in it, every
+    open line scores 4 to the power of the player's signs in the line.
+
+    Params:
+        board (list): TicTacToe game board list of rows.
+        sign (str): Sign of the player the score is calculated for.
+        win_length (int): Number of signs in a row needed to win.
+
+    Returns: score (int): Positive if the board is better for the sign.
+    """
+    score = 0
+    for line in winning_lines(len(board), win_length):
+        own = opponents = 0
+        for cord_x, cord_y in line:
+            cell = board[cord_x][cord_y]
+            if cell == sign:
+                own += 1
+            elif cell != ' ':
+                opponents += 1
+        if own and not opponents:
+            score += 4 ** own
+        elif opponents and not own:
+            score -= 4 ** opponents
+    return score
+
+
+class BudgetExceeded(Exception):
+    """Raised inside the search when the time or node budget runs out."""
+
+
+class IterativeDeepeningSearch:
+    """Negamax search with alpha-beta pruning deepened under a budget.
+
+    Attributes:
+        time_budget (float): Seconds per move, None means no time limit.
+        node_budget (int): Positions per move, None means no node limit.
+        evaluate (function): evaluate(board, sign, win_length) scoring
+                             non-terminal positions at the depth limit.
+        max_depth (int): Maximal depth, None means the number of empty cells.
+        nodes (int): Number of positions visited by the last search.
+        terminal_evaluations (int): Number of finished positions scored by
+                                    the last search.
+        depth (int): Depth of the last completed iteration.
+    """
+    # how often (in nodes) the clock is checked
+    CLOCK_INTERVAL = 64
+
+    def __init__(self, time_budget=0.5, node_budget=None,
+                 evaluate=open_lines_heuristic, max_depth=None):
+        """The constructor for IterativeDeepeningSearch class.
+        Params:
+            time_budget (float): Default = 0.5, seconds per move.
+            node_budget (int): Default = None, positions per move.
+            evaluate (function): Default = open_lines_heuristic.
+            max_depth (int): Default = None, maximal search depth.
+        """
+        if time_budget is None and node_budget is None and max_depth is None:
+            raise ValueError('At least one search limit should be given')
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.evaluate = evaluate
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.terminal_evaluations = 0
+        self.depth = 0
+        self._deadline = None
+
+    def search(self, board, sign, win_length=None):
+        """Method to find the best move within the budget.
+
+        Params:
+            board (list): TicTacToe game board list of rows, it is modified
+                          during the search and restored afterwards.
+            sign (str): Sign of the player to move.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
+
+        Returns: best (list): list of [cord_x, cord_y, score] for the best
+                 move of the deepest completed iteration.
+        """
+        win_length = win_length or len(board)
+        empty_count = len(GameBoard.get_empty_cells(board))
+        max_depth = empty_count if self.max_depth is None \
+            else min(self.max_depth, empty_count)
+        self.nodes = 0
+        self.terminal_evaluations = 0
+        self.depth = 0
+        self._deadline = None if self.time_budget is None \
+            else perf_counter() + self.time_budget
+
+        moves = self.candidate_moves(board)
+        # depth 1 is always completed, so there is a move to return
+        best = self._root(board, sign, win_length, 1, moves, budget=False)
+        self.depth = 1
+        for depth in range(2, max_depth + 1):
+            if abs(best[2]) >= WIN_SCORE - max_depth:
+                # the game result is already proven
+                break
+            # the best move of the previous iteration is searched first
+            moves.remove(tuple(best[:2]))
+            moves.insert(0, tuple(best[:2]))
+            try:
+                best = self._root(board, sign, win_length, depth, moves)
+            except BudgetExceeded:
+                break
+            self.depth = depth
+        return best
+
+    def _root(self, board, sign, win_length, depth, moves, budget=True):
+        """Method searching all root moves to the given depth."""
+        best = [-1, -1, -WIN_SCORE - 1]
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        for cord_x, cord_y in moves:
+            board[cord_x][cord_y] = sign
+            try:
+                score = -self._negamax(board, SIGNS_DICT[sign], win_length,
+                                       depth - 1, 1, -beta, -alpha,
+                                       (cord_x, cord_y), budget)
+            finally:
+                board[cord_x][cord_y] = ' '
+            if score > best[2]:
+                best = [cord_x, cord_y, score]
+                alpha = max(alpha, score)
+        return best
+
+    def _negamax(self, board, sign, win_length, depth, ply, alpha, beta,
+                 last_move, budget):
+        """Recursive depth limited negamax with alpha-beta pruning.
+
+        Params:
+            board (list): TicTacToe game board list of rows.
+            sign (str): Sign of the player to move.
+            win_length (int): Number of signs in a row needed to win.
+            depth (int): Remaining depth.
+            ply (int): Distance from the root, faster wins score higher.
+            alpha (int): The score the player to move is already assured of.
+            beta (int): The score the opponent is already assured of.
+            last_move (tuple): (X,Y) coordinates of the opponent's move.
+            budget (bool): Defines if the budget is checked.
+
+        Returns: score (int): Score of the position for the player to move.
+        """
+        self.nodes += 1
+        if budget:
+            self._check_budget()
+        # only the last move could finish the game
+        if GameBoard.is_winning_move(board, *last_move, win_length):
+            self.terminal_evaluations += 1
+            return ply - WIN_SCORE
+        moves = self.candidate_moves(board)
+        if not moves:
+            self.terminal_evaluations += 1
+            return 0
+        if depth == 0:
+            return self.evaluate(board, sign, win_length)
+
+        best = -WIN_SCORE - 1
+        opponents_sign = SIGNS_DICT[sign]
+        for cord_x, cord_y in moves:
+            board[cord_x][cord_y] = sign
+            try:
+                score = -self._negamax(board, opponents_sign, win_length,
+                                       depth - 1, ply + 1, -beta, -alpha,
+                                       (cord_x, cord_y), budget)
+            finally:
+                board[cord_x][cord_y] = ' '
+            if score > best:
+                best = score
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    break
+        return best
+
+    def _check_budget(self):
+        """Method raising BudgetExceeded when the budget runs out."""
+        if self.node_budget is not None and self.nodes > self.node_budget:
+            raise BudgetExceeded
+        if (self._deadline is not None
+                and self.nodes % self.CLOCK_INTERVAL == 0
+                and perf_counter() > self._deadline):
+            raise BudgetExceeded
+
+    @staticmethod
+    def candidate_moves(board):
+        """Static method to create list of moves worth searching.
+        On boards larger than 3 x 3 only empty cells next to already placed
+        signs are searched, the center is the only move on an empty board.
+
+        Params: board (list): TicTacToe game board list of rows.
+
+        Returns: moves (list): List of (X,Y) coordinates tuples.
+        """
+        empty_cells = GameBoard.get_empty_cells(board)
+        size = len(board)
+        if size <= 3 or len(empty_cells) == size * size:
+            if len(empty_cells) == size * size:
+                return [(size // 2, size // 2)]
+            return empty_cells
+        moves = []
+        for cord_x, cord_y in empty_cells:
+            for x in range(max(0, cord_x - 1), min(size, cord_x + 2)):
+                if any(cell != ' ' for cell in
+                       board[x][max(0, cord_y - 1): cord_y + 2]):
+                    moves.append((cord_x, cord_y))
+                    break
+        return moves or empty_cells
@@ -1,33 +1,74 @@
+from functools import lru_cache
+from math import isqrt
+
+# directions of lines: row, column, diagonal, anti-diagonal
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+@lru_cache(maxsize=None)
+def winning_lines(size, win_length):
+    """Function to create all lines of win_length cells on size x size board.
+
+    Params:
+        size (int): Number of board's rows and columns.
+        win_length (int): Number of signs in a row needed to win.
+
+    Returns: lines (tuple): Tuple of lines, every line is a tuple of (x,y)
+             coordinates tuples.
+    """
+    lines = []
+    for x in range(size):
+        for y in range(size):
+            for dx, dy in DIRECTIONS:
+                end_x = x + dx * (win_length - 1)
+                end_y = y + dy * (win_length - 1)
+                if 0 <= end_x < size and 0 <= end_y < size:
+                    lines.append(tuple((x + dx * i, y + dy * i)
+                                       for i in range(win_length)))
+    return tuple(lines)
+
+
 class GameBoard:
     """Class representing game board of Tic Tac Toe game.
 
     Attributes:
         board (list): A list representing lists of TicTacToe game board rows.
+        size (int): Number of board's rows and columns.
+        win_length (int): Number of signs in a row needed to win.
         winner (str): String representing winner if game is not finishedd
         the winner is None
         empty_cells (list): List of tuples representing (x,y) coordinates
                             of empty cells
+        moves (list): Cell indexes (x * size + y) of the signs put into the
+                      board by input_to_board, in the order of the moves
     """
 
-    def __init__(self, board=None):
+    def __init__(self, board=None, size=3, win_length=None):
         """The constructor for GameBoard class
         Params:
             board (list): Default = None, used to construct GameBoard object
                           using existing list of rows
+            size (int): Default = 3, number of rows and columns of a new
+                        board, ignored if board is given
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size
         """
         if board is not None:
             self.board = board
         else:
-            self.board = [
-                [' ', ' ', ' '],
-                [' ', ' ', ' '],
-                [' ', ' ', ' '],
-            ]
-        self.winner = None
+            self.board = [[' '] * size for _ in range(size)]
+        self.size = len(self.board)
+        self.win_length = win_length or self.size
+        if not 1 <= self.win_length <= self.size:
+            raise ValueError('win_length should be from 1 to board size')
+        self.winner = self.is_finished(self.board,
+                                       win_length=self.win_length)[1]
         self.empty_cells = self.get_empty_cells(self.board)
+        self.moves = []
 
     def input_to_board(self, x, y, sign):
         """Method to put 'X' or 'O' sign into board's cell.
+        Only the lines going through the new sign are checked for a win.
 
         Params:
             x (int): X coordinate - row number.
@@ -36,6 +77,10 @@ class GameBoard:
         """
         self.board[x][y] = sign
         self.empty_cells.remove((x, y))
+        self.moves.append(x * self.size + y)
+        if self.winner is None and self.is_winning_move(self.board, x, y,
+                                                        self.win_length):
+            self.winner = sign
 
     def board_empty_cells(self):
         """Returns board's object empty cells"""
@@ -47,20 +92,20 @@ class GameBoard:
         Returns: True, winner if the game board is finished.
                  False, None if the game is not finished.
         """
-        _is_finished, winner = self.is_finished(self.board)
-        return (True, winner) if _is_finished else (False, None)
+        if self.winner is not None:
+            return True, self.winner
+        return (False, None) if self.empty_cells else (True, None)
 
     def get_board(self, row_format=False, string_format=False):
         """Method used to return current board.
         Params:
-        row_format (bool): if True returns row1, row2, row3
+        row_format (bool): if True returns tuple of rows
         string_format(bool): if True returns board in '___X_O_XO' format
         Returns:
             board.copy(): Copy of a board attribute.
         """
         if row_format:
-            row1, row2, row3 = self.board
-            return row1, row2, row3
+            return tuple(self.board)
         elif string_format:
             str_board = ''
             for row in self.board:
@@ -90,12 +135,14 @@ class GameBoard:
         return empty
 
     @staticmethod
-    def is_finished(board, string=False):
+    def is_finished(board, string=False, win_length=None):
         """Static method to evaluate if game board is finished.
 
         Params:
             board (list): TicTacToe game board list of rows.
             string (bool): Shows if the board is in string format.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
 
         Returns:
             bool (bool): True if game is finished else False
@@ -103,45 +150,101 @@ class GameBoard:
         """
         if string:
             board = GameBoard.from_string(board, init=False)
+        size = len(board)
+        if size == 3 and win_length in (None, 3):
+            return GameBoard._is_finished_3x3(board)
+        # look for win in every row, column and diagonal line
+        for line in winning_lines(size, win_length or size):
+            first_x, first_y = line[0]
+            sign = board[first_x][first_y]
+            if sign != ' ' and all(board[x][y] == sign for x, y in line):
+                return True, sign
+        # checks if there is free space
+        for row in board:
+            if ' ' in row:
+                return False, None
+        return True, None
+
+    @staticmethod
+    def _is_finished_3x3(board):
+        """Static method working as is_finished on 3 x 3 board with
+        3 in a row, the lines are compared directly.
+        """
         row1, row2, row3 = board
         for i in range(3):
             # looks for win in column
-            if row1[i] == row2[i] == row3[i] and row1[i] != ' ':
+            if row1[i] == row2[i] == row3[i] != ' ':
                 return True, row1[i]
             # look for win in row
-            elif len(set(board[i])) == 1 and ' ' not in board[i]:
-                return True, board[i][0]
+            row = board[i]
+            if row[0] == row[1] == row[2] != ' ':
+                return True, row[0]
         # look for win in diagonals
         if row1[0] == row2[1] == row3[2] != ' ':
             return True, row1[0]
-        elif row1[-1] == row2[-2] == row3[-3] != ' ':
-            return True, row1[-1]
+        if row1[2] == row2[1] == row3[0] != ' ':
+            return True, row1[2]
         # checks if there is free space
-        elif ' ' not in row1 + row2 + row3:
-            return True, None
-        else:
+        if ' ' in row1 or ' ' in row2 or ' ' in row3:
             return False, None
+        return True, None
+
+    @staticmethod
+    def is_winning_move(board, x, y, win_length):
+        """Static method to check if the sign at (x,y) completes a line.
+        Counts the same signs in both ways of every direction, so only
+        the lines going through (x,y) are checked.
+
+        Params:
+            board (list): TicTacToe game board list of rows.
+            x (int): X coordinate - row number.
+            y (int): Y coordinate - column number.
+            win_length (int): Number of signs in a row needed to win.
+
+        Returns: bool (bool): True if the sign at (x,y) wins.
+        """
+        sign = board[x][y]
+        size = len(board)
+        for dx, dy in DIRECTIONS:
+            count = 1
+            for step_x, step_y in ((dx, dy), (-dx, -dy)):
+                cord_x, cord_y = x + step_x, y + step_y
+                while (0 <= cord_x < size and 0 <= cord_y < size
+                       and board[cord_x][cord_y] == sign):
+                    count += 1
+                    cord_x += step_x
+                    cord_y += step_y
+            if count >= win_length:
+                return True
+        return False
 
     @classmethod
-    def from_string(cls, string, init=True):
+    def from_string(cls, string, init=True, win_length=None):
         """Class method used to construct the GameBoard object from string.
         Params:
             string (str): String representing the TicTacToe board '___XO_XOO'
+                          of any square size
             init (bool): Orders if to construct the GameBoard object or return
                          list of rows
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size
 
         Returns:
             Creating GameBoard object if init is True else returns:
             board (list): List of rows of TicTacToe game board
         """
-        board = [list(string[i: i + 3].replace('_', ' ')) for i in
-                 range(0, 9, 3)]
-        return cls(board) if init else board
+        size = isqrt(len(string))
+        if size * size != len(string):
+            raise ValueError('Board string length should be a square number')
+        board = [list(string[i: i + size].replace('_', ' ')) for i in
+                 range(0, size * size, size)]
+        return cls(board, win_length=win_length) if init else board
 
     def __str__(self):
         """User friendly view of current board state"""
-        board_view = '---------\n'
-        for row in self.get_board(row_format=True):
-            board_view += f'| {" ".join(row)} |\n'
-        board_view += '---------'
-        return board_view
+        frame = '-' * (2 * self.size + 3)
+        lines = [frame]
+        lines.extend([f'| {" ".join(row)} |'
+                      for row in self.get_board(row_format=True)])
+        lines.append(frame)
+        return '\n'.join(lines)
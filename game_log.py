@@ -0,0 +1,415 @@
+"""Append only binary log of finished games.
+
+Games are appended with GameLogWriter, which packs records into a buffer
+and writes it to the file in bulk. read_games memory maps the file and
+yields GameRecord objects one by one, the moves of a record are decoded
+and the boards replayed only when asked for.
+
+File layout (little endian):
+    header: magic b'TTTL', format version (uint16)
+    records, each one:
+        size, win_length, player 1 type, player 2 type, winner, flags
+        (uint8 each), number of moves (uint16), seed (int64), start time
+        (float64, seconds since the epoch), duration (uint32, microseconds,
+        longer games are stored as MAX_DURATION)
+        moves: cell indexes (row * size + column) packed by board size:
+            size <= 3 - two moves per byte, the first one in the high
+                        nibble, 0xF pads odd number of moves,
+            size <= 16 - one byte per move,
+            else - uint16 per move.
+Player types are codes of PLAYER_TYPES, winner is 0 for a draw, 1 for X
+and 2 for O, flags bit 0 is set if the seed is known. A 3 x 3 game takes
+28 bytes of header and 3 to 5 bytes of moves.
+
+Usage:
+    python game_log.py stats FILE
+    python game_log.py show FILE [--game N]
+    python game_log.py verify FILE
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from itertools import islice
+from time import time
+
+from game_board import GameBoard
+
+MAGIC = b'TTTL'
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct('<4sH')
+RECORD_HEADER = struct.Struct('<BBBBBBHqdI')
+# codes are stored in the file, new player types are only appended
+PLAYER_TYPES = ('user', 'easy', 'medium', 'hard', 'timed', 'mcts',
+                'tactical', 'learned')
+PLAYER_CODES = {player: code for code, player in enumerate(PLAYER_TYPES)}
+# moves of users, of time limited searches and of the learned policy (it
+# depends on the trained policy file) do not follow from the seed
+UNSEEDED_PLAYERS = ('user', 'timed', 'learned')
+WINNERS = (None, 'X', 'O')
+WINNER_CODES = {None: 0, 'X': 1, 'O': 2}
+HAS_SEED = 1
+DEFAULT_BUFFER_SIZE = 1 << 20
+MAX_DURATION_US = 0xFFFFFFFF
+# the longest storable duration in seconds, about 71.6 minutes
+MAX_DURATION = MAX_DURATION_US / 1_000_000
+
+
+def moves_size(size, count):
+    """Function to compute number of bytes of packed moves."""
+    if size <= 3:
+        return (count + 1) // 2
+    if size <= 16:
+        return count
+    return 2 * count
+
+
+def pack_moves(size, moves):
+    """Function to pack cell indexes of the moves.
+
+    Params:
+        size (int): Number of board's rows and columns.
+        moves (list): Cell indexes.
+
+    Returns: packed (bytes)
+    """
+    if size <= 3:
+        padded = list(moves) + [0xF] * (len(moves) % 2)
+        return bytes(padded[i] << 4 | padded[i + 1]
+                     for i in range(0, len(padded), 2))
+    if size <= 16:
+        return bytes(moves)
+    return struct.pack(f'<{len(moves)}H', *moves)
+
+
+def unpack_moves(size, count, packed):
+    """Function to unpack cell indexes packed by pack_moves.
+
+    Returns: moves (tuple): Cell indexes.
+    """
+    if size <= 3:
+        moves = []
+        for byte in packed:
+            moves.append(byte >> 4)
+            moves.append(byte & 0xF)
+        return tuple(moves[:count])
+    if size <= 16:
+        return tuple(packed)
+    return struct.unpack(f'<{count}H', packed)
+
+
+def iter_records(data):
+    """Generator of the complete records of a log file's content. It stops
+    at a truncated last record or at a record with an unknown board size,
+    player type or winner code (e.g. garbage after a crash while writing).
+
+    Params: data (bytes/mmap): Content of the log file, with its header.
+
+    Yields: record (tuple): Unpacked RECORD_HEADER fields, offset of the
+            packed moves and their number of bytes.
+    """
+    offset, end = FILE_HEADER.size, len(data)
+    while offset + RECORD_HEADER.size <= end:
+        fields = RECORD_HEADER.unpack_from(data, offset)
+        size, win_length, player_1, player_2, winner = fields[:5]
+        if not 0 < win_length <= size or player_1 >= len(PLAYER_TYPES) \
+                or player_2 >= len(PLAYER_TYPES) or winner >= len(WINNERS):
+            return
+        offset += RECORD_HEADER.size
+        packed_size = moves_size(size, fields[6])
+        if offset + packed_size > end:
+            return
+        yield fields, offset, packed_size
+        offset += packed_size
+
+
+class GameRecord:
+    """One logged game.
+
+    Attributes:
+        size (int): Number of board's rows and columns.
+        win_length (int): Number of signs in a row needed to win.
+        player_1 (str): Player type of 'X', 'user' or bot level.
+        player_2 (str): Player type of 'O', 'user' or bot level.
+        winner (str/None): 'X', 'O' or None for a draw.
+        seed (int): Seed of the game's random generator or None.
+        started (float): Start time in seconds since the epoch.
+        duration (float): Game duration in seconds.
+        move_count (int): Number of moves.
+    """
+    __slots__ = ('size', 'win_length', 'player_1', 'player_2', 'winner',
+                 'seed', 'started', 'duration', 'move_count', '_packed',
+                 '_moves')
+
+    def __init__(self, size, win_length, player_1, player_2, winner, seed,
+                 started, duration, move_count, packed):
+        self.size = size
+        self.win_length = win_length
+        self.player_1 = player_1
+        self.player_2 = player_2
+        self.winner = winner
+        self.seed = seed
+        self.started = started
+        self.duration = duration
+        self.move_count = move_count
+        self._packed = packed
+        self._moves = None
+
+    @property
+    def moves(self):
+        """Tuple of cell indexes of the moves, decoded on first use."""
+        if self._moves is None:
+            self._moves = unpack_moves(self.size, self.move_count,
+                                       self._packed)
+        return self._moves
+
+    def replay(self):
+        """Generator replaying the game on a new GameBoard.
+        Yields the same GameBoard object after every move, copy its board
+        to keep a state.
+        """
+        game_board = GameBoard(size=self.size, win_length=self.win_length)
+        sign = 'X'
+        for cell in self.moves:
+            game_board.input_to_board(*divmod(cell, self.size), sign)
+            sign = 'O' if sign == 'X' else 'X'
+            yield game_board
+
+    def board_at(self, ply):
+        """Method to rebuild the GameBoard after the first ply moves."""
+        if not 0 <= ply <= self.move_count:
+            raise ValueError(f'ply should be from 0 to {self.move_count}')
+        game_board = GameBoard(size=self.size, win_length=self.win_length)
+        for game_board in islice(self.replay(), ply):
+            pass
+        return game_board
+
+
+class GameLogWriter:
+    """Buffered writer appending games to a log file.
+
+    Attributes:
+        path (str): Path of the log file.
+        buffer_size (int): Number of bytes collected before a write.
+        games (int): Number of games appended by the writer.
+    """
+
+    def __init__(self, path, buffer_size=DEFAULT_BUFFER_SIZE):
+        """The constructor for GameLogWriter class.
+        Params:
+            path (str): Path of the log file, created if missing.
+            buffer_size (int): Default = 1 MiB, bytes buffered per write.
+
+        Raises: ValueError if the file is not a game log of the current
+                format version.
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.games = 0
+        self._buffer = bytearray()
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._buffer += FILE_HEADER.pack(MAGIC, FORMAT_VERSION)
+            return
+        try:
+            self._truncate_partial()
+        except ValueError:
+            self._file.close()
+            raise
+
+    def _truncate_partial(self):
+        """Method to cut the file back to its last complete record, so games
+        appended after a crash while writing are read again.
+        """
+        with open(self.path, 'r+b') as log_file:
+            with mmap.mmap(log_file.fileno(), 0,
+                           access=mmap.ACCESS_READ) as log_map:
+                if log_map[:FILE_HEADER.size] != FILE_HEADER.pack(
+                        MAGIC, FORMAT_VERSION):
+                    raise ValueError(f'{self.path} is not a game log of '
+                                     f'version {FORMAT_VERSION}')
+                end = FILE_HEADER.size
+                for _fields, offset, packed_size in iter_records(log_map):
+                    end = offset + packed_size
+                file_size = len(log_map)
+            if end < file_size:
+                log_file.truncate(end)
+
+    def append(self, moves, player_1, player_2, winner, size=3,
+               win_length=None, seed=None, started=None, duration=0.0):
+        """Method to append one game.
+
+        Params:
+            moves (list): Cell indexes (row * size + column) of the moves.
+            player_1 (str): Player type of 'X', 'user' or bot level.
+            player_2 (str): Player type of 'O', 'user' or bot level.
+            winner (str/None): 'X', 'O' or None for a draw.
+            size (int): Default = 3, number of board's rows and columns.
+            win_length (int): Default = None, signs in a row needed to win,
+                              None means the board size.
+            seed (int): Default = None, seed of the game's random generator.
+            started (float): Default = None, start time, None means now.
+            duration (float): Default = 0, game duration in seconds,
+                              clamped to MAX_DURATION.
+        """
+        flags = 0 if seed is None else HAS_SEED
+        self._buffer += RECORD_HEADER.pack(
+            size, win_length or size, PLAYER_CODES[player_1],
+            PLAYER_CODES[player_2], WINNER_CODES[winner], flags, len(moves),
+            seed or 0, time() if started is None else started,
+            min(max(round(duration * 1_000_000), 0), MAX_DURATION_US))
+        self._buffer += pack_moves(size, moves)
+        self.games += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def append_game(self, game, started, duration, seed=None):
+        """Method to append a finished TicTacToe game.
+
+        Params:
+            game (TicTacToe): Finished game.
+            started (float): Start time in seconds since the epoch.
+            duration (float): Game duration in seconds.
+            seed (int): Default = None, seed of the game, None means the
+                        game's seed attribute.
+        """
+        if seed is None:
+            seed = getattr(game, 'seed', None)
+        game_board = game.game_board
+        self.append(game_board.moves,
+                    getattr(game.player1, 'bot_level', 'user'),
+                    getattr(game.player2, 'bot_level', 'user'),
+                    game_board.is_board_finished()[1], game_board.size,
+                    game_board.win_length, seed, started, duration)
+
+    def flush(self):
+        """Method to write the buffered games to the file."""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+
+    def close(self):
+        """Method to flush the buffer and close the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_games(path):
+    """Generator of the games of a log file. The file is memory mapped,
+    reading stops at a truncated or invalid record (see iter_records).
+
+    Params: path (str): Path of the log file.
+
+    Yields: record (GameRecord)
+
+    Raises: ValueError if the file is not a game log of the current format
+            version.
+    """
+    with open(path, 'rb') as log_file:
+        if os.fstat(log_file.fileno()).st_size == 0:
+            return
+        log_map = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+    with log_map:
+        if log_map[:FILE_HEADER.size] != FILE_HEADER.pack(MAGIC,
+                                                          FORMAT_VERSION):
+            raise ValueError(f'{path} is not a game log of version '
+                             f'{FORMAT_VERSION}')
+        for fields, offset, packed_size in iter_records(log_map):
+            (size, win_length, player_1, player_2, winner, flags,
+             move_count, seed, started, duration) = fields
+            yield GameRecord(size, win_length, PLAYER_TYPES[player_1],
+                             PLAYER_TYPES[player_2], WINNERS[winner],
+                             seed if flags & HAS_SEED else None, started,
+                             duration / 1_000_000, move_count,
+                             log_map[offset: offset + packed_size])
+
+
+def replay_from_seed(record):
+    """Function to play the record's game again from its seed.
+
+    Params: record (GameRecord): Game of two bots with a known seed.
+
+    Returns: moves (tuple): Cell indexes of the moves of the new game.
+    """
+    from main import TicTacToe
+    game = TicTacToe(record.player_1, record.player_2, render=False,
+                     size=record.size, win_length=record.win_length,
+                     seed=record.seed)
+    game_finished = False
+    while game_finished is False:
+        game_finished = game.play_turn()[0]
+    return tuple(game.game_board.moves)
+
+
+def verify(path):
+    """Function to replay the seeded bot games of a log file from their
+    seeds and compare the moves.
+
+    Returns: stats (dict): replayed, matching and skipped (no seed, user or
+             time limited bot) games.
+    """
+    counts = {'replayed': 0, 'matching': 0, 'skipped': 0}
+    for record in read_games(path):
+        if record.seed is None or record.player_1 in UNSEEDED_PLAYERS \
+                or record.player_2 in UNSEEDED_PLAYERS:
+            counts['skipped'] += 1
+            continue
+        counts['replayed'] += 1
+        counts['matching'] += replay_from_seed(record) == record.moves
+    return counts
+
+
+def stats(path):
+    """Function to count games and results by players of a log file.
+
+    Returns: stats (dict): {'games': N, 'pairings': {'P1-P2': results}}
+    """
+    pairings, games = {}, 0
+    for record in read_games(path):
+        games += 1
+        results = pairings.setdefault(
+            f'{record.player_1}-{record.player_2}',
+            {'X': 0, 'O': 0, 'draw': 0})
+        results[record.winner or 'draw'] += 1
+    return {'games': games, 'pairings': pairings}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Read a game log file.')
+    parser.add_argument('command', choices=('stats', 'show', 'verify'))
+    parser.add_argument('path')
+    parser.add_argument('--game', type=int, default=1,
+                        help='show: number of the game, counted from 1')
+    args = parser.parse_args(argv)
+    if args.command == 'stats':
+        for key, value in stats(args.path).items():
+            print(f'{key}: {value}')
+        return 0
+    if args.command == 'verify':
+        counts = verify(args.path)
+        for key, value in counts.items():
+            print(f'{key}: {value}')
+        return 0 if counts['matching'] == counts['replayed'] else 1
+    for game_no, record in enumerate(read_games(args.path), 1):
+        if game_no == args.game:
+            print(f'{record.player_1} (X) vs {record.player_2} (O), '
+                  f'{record.size} x {record.size}, seed {record.seed}')
+            for game_board in record.replay():
+                print(game_board)
+            print(f'{record.winner} wins' if record.winner else 'Draw')
+            return 0
+    print(f'No game {args.game} in {args.path}')
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""Policy of the 'learned' bot trained by self-play with TD(0).
+
+The bot learns the value of afterstates - positions right after a move -
+for the player who made the move, from -1 (lost) to 1 (won). Boards equal
+under rotation or reflection share one value, stored at the base 3 index
+(see BitBoard.index) of the board reduced under the 8 symmetries, so the
+values are a compact float32 array of 3 ** 9 entries. After every move of
+a training game the value of the previous afterstate, the one the opponent
+answered, is moved towards the negated value of the new one:
+
+    V(previous) += alpha * (-V(new) - V(previous))
+
+where a won afterstate is worth 1 and a drawn full board 0. The learner
+plays the move of the best afterstate, or a random move with probability
+epsilon, an exploring move does not update the afterstate before it.
+Some self play games start from a random reachable position, so the
+positions good play never reaches get values as well.
+Training games are played on bit masks without any board objects, against
+the learner itself ('self') or against Bot levels as sparring partners.
+
+After training, the best move of every reachable position is stored in a
+int8 array indexed by the position's base 3 index, so the bot picks its
+move with a single array lookup and no search.
+
+File layout (little endian):
+    header: magic b'TTTQ', format version (uint16), number of positions
+            (uint32), number of training games (uint64), CRC32 of the
+            arrays (uint32)
+    values: float32 value of every base 3 index of a canonical afterstate
+    moves: int8 best move cell of every base 3 index, -1 for finished or
+           unreachable positions
+
+Usage:
+    python learned.py train [--games N] [--opponents LEVEL ...]
+                            [--alpha A] [--epsilon E]
+                            [--random-starts P] [--seed N]
+                            [--resume] [--output FILE]
+    python learned.py stats [FILE]
+"""
+import argparse
+import os
+import struct
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+
+from bitboard import (BASE3, CELL_MASKS, EMPTY_CELLS, FULL_MASK, IS_WIN,
+                      POSITIONS_COUNT, STONE_COUNT, BitBoard)
+import position_index
+from rng import RandomStream, derive_seed, new_seed
+
+MAGIC = b'TTTQ'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHIQI')
+DEFAULT_PATH = os.environ.get(
+    'TICTACTOE_LEARNED_POLICY',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 'learned_policy.bin'))
+NO_MOVE = -1
+POWERS = tuple(3 ** cell for cell in range(9))
+# best move ties are broken by: center, corners, edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+SELF = 'self'
+DEFAULT_OPPONENTS = (SELF,)
+DEFAULT_ALPHA = 0.1
+DEFAULT_EPSILON = 0.2
+DEFAULT_RANDOM_STARTS = 0.5
+
+
+@lru_cache(maxsize=None)
+def playable_positions():
+    """Function to index the reachable not finished positions, the ones a
+    player moves from, numbered by position_index.positions.
+
+    Returns:
+        positions (dict): (x_mask, o_mask) by base 3 index of every
+                          reachable not finished position.
+        canonical (array): uint16 base 3 index of the position's board
+                           reduced under the 8 symmetries by base 3 index,
+                           0 for finished or unreachable positions.
+    """
+    slots, boards = position_index.positions()
+    slot_indexes = [board.index() for board in boards]
+    positions = {}
+    canonical = array('H', bytes(2 * POSITIONS_COUNT))
+    for key, (slot, _cells) in slots.items():
+        x_mask, o_mask = key & FULL_MASK, key >> 9
+        index = BASE3[x_mask] + 2 * BASE3[o_mask]
+        positions[index] = x_mask, o_mask
+        canonical[index] = slot_indexes[slot]
+    return positions, canonical
+
+
+class LearnedPolicy:
+    """Values and moves of the 'learned' bot.
+
+    Attributes:
+        values (array): float32 value of every canonical afterstate for the
+                        player who moved into it.
+        moves (array): int8 best move cell by base 3 index of position,
+                       NO_MOVE for finished or unreachable positions.
+        games (int): Number of training games played.
+    """
+
+    def __init__(self, values=None, moves=None, games=0):
+        """The constructor for LearnedPolicy class.
+        Params:
+            values (array): Default = None, float32 values, None means all
+                            values 0.
+            moves (array): Default = None, int8 moves, None means the moves
+                           are built from the values.
+            games (int): Default = 0, number of training games played.
+        """
+        if values is None:
+            values = array('f', bytes(4 * POSITIONS_COUNT))
+        self.values = values
+        self.games = games
+        self.moves = moves
+        if moves is None:
+            self.build_moves()
+
+    def move(self, index):
+        """Returns best move cell of base 3 index or NO_MOVE."""
+        return self.moves[index]
+
+    def build_moves(self):
+        """Method to store the best move of every reachable position."""
+        positions, canonical = playable_positions()
+        values = self.values
+        moves = array('b', bytes(POSITIONS_COUNT))
+        for index in range(POSITIONS_COUNT):
+            moves[index] = NO_MOVE
+        for index, (x_mask, o_mask) in positions.items():
+            occupied = x_mask | o_mask
+            if STONE_COUNT[occupied] % 2 == 0:
+                own, digit = x_mask, 1
+            else:
+                own, digit = o_mask, 2
+            best_cell, best_value = NO_MOVE, -2.0
+            for cell in MOVE_ORDER:
+                if occupied & CELL_MASKS[cell]:
+                    continue
+                if IS_WIN[own | CELL_MASKS[cell]]:
+                    best_cell = cell
+                    break
+                if occupied | CELL_MASKS[cell] == FULL_MASK:
+                    value = 0.0
+                else:
+                    value = values[canonical[index + digit * POWERS[cell]]]
+                if value > best_value:
+                    best_cell, best_value = cell, value
+            moves[index] = best_cell
+        self.moves = moves
+
+    def save(self, path=DEFAULT_PATH):
+        """Method to write the policy file.
+
+        Params: path (str): Path of the created file.
+
+        Returns: path (str)
+        """
+        values = array('f', self.values)
+        if sys.byteorder != 'little':
+            values.byteswap()
+        data = values.tobytes() + self.moves.tobytes()
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, POSITIONS_COUNT,
+                             self.games, zlib.crc32(data))
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as policy_file:
+            policy_file.write(header)
+            policy_file.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Class method to read the policy file.
+
+        Raises: ValueError if the file is not a valid policy of the current
+                format version.
+        """
+        with open(path, 'rb') as policy_file:
+            content = policy_file.read()
+        if len(content) != HEADER.size + 5 * POSITIONS_COUNT:
+            raise ValueError(f'{path} has invalid size')
+        magic, version, count, games, checksum = HEADER.unpack_from(content)
+        if (magic, version, count) != (MAGIC, FORMAT_VERSION,
+                                       POSITIONS_COUNT):
+            raise ValueError(f'{path} is stale or not a learned policy')
+        data = content[HEADER.size:]
+        if zlib.crc32(data) != checksum:
+            raise ValueError(f'{path} is corrupted')
+        values = array('f', data[:4 * POSITIONS_COUNT])
+        if sys.byteorder != 'little':
+            values.byteswap()
+        moves = array('b', data[4 * POSITIONS_COUNT:])
+        return cls(values, moves, games)
+
+
+class SelfPlayTrainer:
+    """Headless TD(0) training of LearnedPolicy.
+
+    Attributes:
+        policy (LearnedPolicy): Trained policy, its moves are rebuilt after
+                                every train call.
+        alpha (float): Learning rate.
+        epsilon (float): Probability of a random exploring move.
+        opponents (tuple): Sparring partners played in turn, SELF or Bot
+                           levels.
+        random_starts (float): Probability of a self play game starting
+                               from a random position.
+        seed (int): Seed of the training run.
+        rng (RandomStream): Generator of exploring moves.
+    """
+
+    def __init__(self, policy=None, alpha=DEFAULT_ALPHA,
+                 epsilon=DEFAULT_EPSILON, opponents=DEFAULT_OPPONENTS,
+                 random_starts=DEFAULT_RANDOM_STARTS, seed=None):
+        """The constructor for SelfPlayTrainer class.
+        Params:
+            policy (LearnedPolicy): Default = None, policy to train further,
+                                    None means a new policy.
+            alpha (float): Default = 0.1, learning rate.
+            epsilon (float): Default = 0.2, probability of a random move.
+            opponents (tuple): Default = (SELF,), SELF or Bot levels,
+                               game number N is played against
+                               opponents[N % len(opponents)].
+            random_starts (float): Default = 0.5, probability that a self
+                                   play game starts from a random
+                                   reachable position, so that positions
+                                   the learner avoids are valued too.
+            seed (int): Default = None, seed of the training run, None
+                        means a seed drawn from random.
+        """
+        # imported here, player imports this module for the 'learned' bot
+        from player import Bot
+        self.policy = LearnedPolicy() if policy is None else policy
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.opponents = tuple(opponents)
+        self.random_starts = random_starts
+        for opponent in self.opponents:
+            if opponent != SELF and opponent not in Bot.LEVELS:
+                raise ValueError(f'Unknown opponent: {opponent}')
+        self.seed = new_seed() if seed is None else seed
+        self.rng = RandomStream(self.seed)
+        self._positions, self._canonical = playable_positions()
+        self._starts = array('H', self._positions)
+        # one sparring bot per level and sign, kept between games
+        self._bots = {}
+        for number, opponent in enumerate(self.opponents):
+            if opponent == SELF:
+                continue
+            for sign in 'XO':
+                self._bots[opponent, sign] = Bot(
+                    opponent, verbose=False, sign=sign,
+                    seed=derive_seed(self.seed, number, ord(sign)))
+
+    def train(self, games):
+        """Method to play training games and rebuild the policy's moves.
+
+        Params: games (int): Number of training games.
+
+        Returns: results (dict): Learner's 'wins', 'draws' and 'losses'
+                 against sparring bots and number of 'self' play games.
+        """
+        results = {'wins': 0, 'draws': 0, 'losses': 0, 'self': 0}
+        for _ in range(games):
+            number = self.policy.games
+            opponent = self.opponents[number % len(self.opponents)]
+            # the learner plays X and O in turn
+            learner = 'X' if number // len(self.opponents) % 2 == 0 else 'O'
+            bot = None
+            if opponent != SELF:
+                bot = self._bots[opponent, 'O' if learner == 'X' else 'X']
+            start = 0
+            if bot is None and self.rng.random() < self.random_starts:
+                start = self.rng.pick(self._starts)
+            winner = self.play_game(bot, start)
+            if bot is None:
+                results['self'] += 1
+            elif winner is None:
+                results['draws'] += 1
+            elif winner == learner:
+                results['wins'] += 1
+            else:
+                results['losses'] += 1
+            self.policy.games += 1
+        self.policy.build_moves()
+        return results
+
+    def play_game(self, bot=None, start=0):
+        """Method to play one training game and update the values.
+
+        Params:
+            bot (Bot): Default = None, sparring partner playing its sign,
+                       None means the learner plays both signs.
+            start (int): Default = 0, base 3 index of the not finished
+                         position the game starts from.
+
+        Returns: winner (str): 'X', 'O' or None for a draw.
+        """
+        values = self.policy.values
+        canonical = self._canonical
+        rng = self.rng
+        alpha, epsilon = self.alpha, self.epsilon
+        bot_sign = None if bot is None else bot.sign
+        masks = list(self._positions[start])
+        index = start
+        previous = -1
+        for ply in range(STONE_COUNT[masks[0] | masks[1]], 9):
+            side = ply % 2
+            own = masks[side]
+            occupied = masks[0] | masks[1]
+            digit = side + 1
+            explored = False
+            if bot_sign == 'XO'[side]:
+                cord_x, cord_y = bot.get_cords(
+                    BitBoard(masks[0], masks[1]).to_rows())
+                cell = cord_x * 3 + cord_y
+            elif rng.random() < epsilon:
+                cell = rng.pick(EMPTY_CELLS[occupied])
+                explored = True
+            else:
+                cell, best_value = -1, -2.0
+                for empty in EMPTY_CELLS[occupied]:
+                    if IS_WIN[own | CELL_MASKS[empty]]:
+                        cell = empty
+                        break
+                    if ply == 8:
+                        value = 0.0
+                    else:
+                        value = values[canonical[index
+                                                 + digit * POWERS[empty]]]
+                    if value > best_value:
+                        cell, best_value = empty, value
+            own |= CELL_MASKS[cell]
+            masks[side] = own
+            index += digit * POWERS[cell]
+            if IS_WIN[own]:
+                value, afterstate = 1.0, -1
+            elif ply == 8:
+                value, afterstate = 0.0, -1
+            else:
+                afterstate = canonical[index]
+                value = values[afterstate]
+            if previous >= 0 and not explored:
+                values[previous] += alpha * (-value - values[previous])
+            if afterstate < 0:
+                return 'XO'[side] if value else None
+            previous = afterstate
+        return None
+
+
+_default_policy = None
+_default_loaded = False
+
+
+def load_default():
+    """Function to lazily read the default policy once per process.
+
+    Returns: LearnedPolicy or None if the file is missing or stale.
+    """
+    global _default_policy, _default_loaded
+    if not _default_loaded:
+        _default_loaded = True
+        try:
+            _default_policy = LearnedPolicy.load(DEFAULT_PATH)
+        except (OSError, ValueError):
+            _default_policy = None
+    return _default_policy
+
+
+def main(argv=None):
+    from player import Bot
+
+    parser = argparse.ArgumentParser(
+        description="Train the 'learned' bot by self-play.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    train = commands.add_parser('train', help='play training games')
+    train.add_argument('--games', type=int, default=200000)
+    train.add_argument('--opponents', nargs='+', default=DEFAULT_OPPONENTS,
+                       choices=(SELF,) + Bot.LEVELS)
+    train.add_argument('--alpha', type=float, default=DEFAULT_ALPHA)
+    train.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON)
+    train.add_argument('--random-starts', type=float,
+                       default=DEFAULT_RANDOM_STARTS)
+    train.add_argument('--seed', type=int, default=None)
+    train.add_argument('--resume', action='store_true',
+                       help='train the saved policy further')
+    train.add_argument('--output', default=DEFAULT_PATH)
+    stats = commands.add_parser('stats', help='describe a saved policy')
+    stats.add_argument('path', nargs='?', default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'stats':
+        policy = LearnedPolicy.load(args.path)
+        positions = sum(move != NO_MOVE for move in policy.moves)
+        visited = sum(value != 0.0 for value in policy.values)
+        print(f'training games: {policy.games}')
+        print(f'positions with a move: {positions}')
+        print(f'afterstates with a non zero value: {visited}')
+        return 0
+    policy = LearnedPolicy.load(args.output) if args.resume else None
+    trainer = SelfPlayTrainer(policy, args.alpha, args.epsilon,
+                              args.opponents, args.random_starts, args.seed)
+    results = trainer.train(args.games)
+    print(', '.join(f'{name}: {count}' for name, count in results.items()))
+    print(f'Learned policy written to {trainer.policy.save(args.output)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
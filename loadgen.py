@@ -0,0 +1,101 @@
+"""Load generator for the game server.
+
+Usage:
+    python loadgen.py [--host HOST] [--port PORT | --unix PATH]
+                      [--connections C] [--games G] [--opponent LEVEL]
+                      [--seed S]
+
+Every connection plays G games as 'user' against the opponent bot, the
+user's moves are random empty cells. The report is printed as JSON.
+"""
+import argparse
+import asyncio
+import json
+import random
+from time import perf_counter
+
+from player import Bot
+from simulate import latency_report
+
+
+async def request(reader, writer, line):
+    """Coroutine sending one command and returning the reply words."""
+    writer.write(line.encode() + b'\n')
+    await writer.drain()
+    reply = (await reader.readline()).decode().split()
+    if not reply:
+        raise ConnectionError('connection closed by the server')
+    return reply
+
+
+async def run_client(args, rng, stats):
+    """Coroutine playing games over one connection."""
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        for game_no in range(args.games):
+            players = ('user', args.opponent) if game_no % 2 == 0 \
+                else (args.opponent, 'user')
+            start = perf_counter()
+            reply = await request(reader, writer, 'NEW ' + ' '.join(players))
+            stats['latencies'].append(perf_counter() - start)
+            while reply[0] == 'STATE' and reply[3] == 'TURN':
+                session_id, board = reply[1], reply[2]
+                cell = rng.choice([index for index, sign in enumerate(board)
+                                   if sign == '_'])
+                start = perf_counter()
+                reply = await request(
+                    reader, writer,
+                    f'MOVE {session_id} {cell // 3 + 1} {cell % 3 + 1}')
+                stats['latencies'].append(perf_counter() - start)
+            if reply[0] == 'ERR':
+                stats['errors'] += 1
+                continue
+            stats['games'] += 1
+            await request(reader, writer, f'QUIT {reply[1]}')
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run(args):
+    """Coroutine running all client connections."""
+    stats = {'games': 0, 'errors': 0, 'latencies': []}
+    master = random.Random(args.seed)
+    start = perf_counter()
+    await asyncio.gather(*(
+        run_client(args, random.Random(master.getrandbits(64)), stats)
+        for _ in range(args.connections)))
+    elapsed = perf_counter() - start
+    return {
+        'connections': args.connections,
+        'opponent': args.opponent,
+        'games': stats['games'],
+        'errors': stats['errors'],
+        'requests': len(stats['latencies']),
+        'elapsed_s': elapsed,
+        'games_per_second': stats['games'] / elapsed if elapsed else None,
+        'requests_per_second': (len(stats['latencies']) / elapsed
+                                if elapsed else None),
+        'latency': latency_report(stats['latencies']),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='connect to Unix socket path instead')
+    parser.add_argument('--connections', type=int, default=100)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--opponent', choices=Bot.LEVELS, default='hard')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,23 @@
+import os
+import sys
+from contextlib import nullcontext
+from time import perf_counter, time
+
 from game_board import GameBoard
-from player import Player, HumanPlayer, Bot
+from player import HumanPlayer, Bot
+from render import FLUSH_POLICIES, RENDERERS, make_renderer
+from rng import new_seed, player_seed
+
+USAGE = """usage: main.py [COMMAND] [ARGS ...]
+
+commands:
+    play        game menu, or one game with: play PLAYER_1 PLAYER_2
+    simulate    headless bot versus bot games
+    tournament  bot versus bot games on a pool of workers
+    bench       benchmark suite, only in a source checkout
+    serve       game server
+Without a command the game menu is started, COMMAND --help describes
+the command's arguments."""
 
 
 class TicTacToe:
@@ -11,25 +29,63 @@ class TicTacToe:
         current_player (Player object): A player1 or player2 playing current
                                         game's turn
         game_board (GameBoard object): The game board of Tic Tac Toe game
+        render (bool): Defines if the game prints the board and bots' moves
+        renderer (Renderer object): Buffered output of the game, see
+                                    render.py
+        metrics (Metrics object): Instrumentation of the game or None
+        seed (int): Seed of the game, the bots' random generators are
+                    seeded from it, so the game can be replayed
 
     """
 
-    def __init__(self, player_1, player_2):
+    def __init__(self, player_1, player_2, board_class=GameBoard,
+                 render=True, size=3, win_length=None, metrics=None,
+                 seed=None, renderer=None):
         """The constructor for TicTacToe class.
         Parameters:
             player_1 (str): String defining the type of the player used for
                             constructing Player object('user' - Human Player
-                            or 'easy', 'medium', 'hard' - Bot Player)
+                            or 'easy', 'medium', 'hard', 'timed' - Bot
+                            Player)
             player_2 (str): String defining the type of the player used for
                             constructing Player object('user' - Human Player
-                            or 'easy', 'medium', 'hard' - Bot Player)
+                            or 'easy', 'medium', 'hard', 'timed' - Bot
+                            Player)
+            board_class (class): Default = GameBoard, class of the game board
+                                 e.g. BitGameBoard
+            render (bool): Default = True, if False the game runs headless
+                           without printing anything
+            size (int): Default = 3, number of board's rows and columns
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size
+            metrics (Metrics object): Default = None, measures moves and
+                                      rendering, see metrics.py
+            seed (int): Default = None, seed of the game, None means a
+                        seed drawn from random (see rng.py)
+            renderer (Renderer object): Default = None, output backend,
+                                        None means 'full' renderer flushed
+                                        every turn if render is True else
+                                        'silent' renderer
 
         """
-        self.player1 = self.set_up_player(player_1)
-        self.player2 = self.set_up_player(player_2)
+        if renderer is None:
+            renderer = make_renderer('full' if render else 'silent')
+        self.renderer = renderer
+        self.render = not renderer.silent
+        self.metrics = metrics
+        self.seed = new_seed() if seed is None else seed
+        self.game_board = board_class(size=size, win_length=win_length)
+        # signs are assigned per game, so many games can run at once
+        # bots' moves are announced by the renderer
+        self.player1 = self.set_up_player(
+            player_1, False, sign='X', win_length=win_length,
+            seed=player_seed(self.seed, 'X'), size=size)
+        self.player2 = self.set_up_player(
+            player_2, False, sign='O', win_length=win_length,
+            seed=player_seed(self.seed, 'O'), size=size)
         self.current_player = self.player1
-        self.game_board = GameBoard()
-        print(self.game_board)
+        if self.render:
+            self.print_board()
 
     def make_move(self):
         """Method responsible for making current player's move
@@ -37,6 +93,15 @@ class TicTacToe:
         Invoking GameBoard.input_to_board - inputting current player's sign
         into the game board on X and Y coordinates
         """
+        if self.render:
+            if self.current_player.is_bot:
+                self.renderer.bot_move(self.current_player)
+            else:
+                # the user has to see the board before typing a move
+                self.renderer.flush()
+        if self.metrics is not None:
+            self.metrics.make_move(self.current_player, self.game_board)
+            return
         game_board = self.game_board.get_board()
         cord_x, cord_y = self.current_player.get_cords(game_board)
         self.game_board.input_to_board(cord_x, cord_y,
@@ -49,23 +114,43 @@ class TicTacToe:
         Returns if the game is finished.
         """
         self.make_move()
-        print(self.game_board)
+        if self.render:
+            self.print_board()
         self.change_current_player()
         return self.game_board.is_board_finished()
 
+    def print_board(self):
+        """Method rendering the game board and ending the turn's output,
+        measured if the game has metrics.
+        """
+        if self.metrics is not None:
+            self.metrics.render(self.renderer, self.game_board)
+        else:
+            self.renderer.board(self.game_board)
+            self.renderer.end_turn()
+
     @staticmethod
-    def set_up_player(player):
+    def set_up_player(player, verbose=True, sign=None, win_length=None,
+                      seed=None, size=None):
         """Static method to set up the players.
          Params:
             player (str): The string describing the player user or bot.
+            verbose (bool): Default = True, defines if bot prints its moves.
+            sign (str): Default = None, player's sign X or O.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
+            seed (int): Default = None, seed of the bot's random generator.
+            size (int): Default = None, number of board's rows and columns,
+                        see Bot.check_board.
 
         Returns:
             Player object: HumanPlayer or Bot object.
          """
         if player == 'user':
-            return HumanPlayer()
+            return HumanPlayer(sign=sign)
         else:
-            return Bot(bot_level=player)
+            return Bot(bot_level=player, verbose=verbose, sign=sign,
+                       win_length=win_length, seed=seed, size=size)
 
     @staticmethod
     def print_winner(winner):
@@ -87,47 +172,179 @@ class TicTacToe:
             self.current_player = self.player1
 
 
-def play_game(p1, p2):
+def check_game(player_1, player_2, size=3, win_length=None):
+    """Function to check game parameters before the game is set up.
+
+    Raises: ValueError with the reason if the board size or win length is
+            invalid or a bot level cannot play the board.
+    """
+    if size < 1 or not 1 <= (win_length or size) <= size:
+        raise ValueError('win length should be from 1 to the board size')
+    for player in (player_1, player_2):
+        if player != 'user':
+            Bot.check_board(player, size)
+
+
+def play_game(p1, p2, render=True, size=3, win_length=None, metrics=None,
+              game_log=None, seed=None, renderer=None):
     """Function to play Tic Tac Toe game.
     Creates Tic Tac Toe game object.
     Loops TicTacToe.play_turn() until the game is finished.
+    The game is measured and profiled if metrics (Metrics object) are given
+    and appended to game_log (GameLogWriter object) if it is given.
+    Bot versus bot games with the same seed are played the same way.
+    The output goes through renderer (Renderer object) if it is given.
     Returns: winner (str)
     """
     game_finished, winner = False, None
+    started, start = time(), perf_counter()
 
-    game_instance = TicTacToe(p1, p2)
-    while game_finished is False:
-        game_finished, winner = game_instance.play_turn()
+    game_instance = TicTacToe(p1, p2, render=render, size=size,
+                              win_length=win_length, metrics=metrics,
+                              seed=seed, renderer=renderer)
+    with nullcontext() if metrics is None else metrics.profile():
+        while game_finished is False:
+            game_finished, winner = game_instance.play_turn()
+    game_instance.renderer.end_game()
+    if game_log is not None:
+        game_log.append_game(game_instance, started, perf_counter() - start)
     return winner
 
 
-def main():
+def play_menu():
     """The function to set up a TicTacToe game, get user input and validate it.
     Creates an infinite loop until the user decide to break it with exit command
     """
     _actions = ('start', 'exit')
-    _players = ('hard', 'medium', 'easy', 'user')
+    _players = Bot.LEVELS + ('user',)
     while True:
         menu_input = input('Input command:')
         if menu_input == 'exit':
-            exit()
+            return 0
         else:
             command = menu_input.split()
-            if len(command) != 3:
+            if len(command) not in (3, 4, 5):
                 print('Bad parameters!')
                 continue
+            # optional board size and number of signs in a row to win
+            dimensions = command[3:]
             valid = bool(command[0] in _actions
                          and command[1] in _players
-                         and command[2] in _players)
+                         and command[2] in _players
+                         and all(value.isdigit() for value in dimensions))
             if valid:
-                winner = play_game(command[1], command[2])
+                size = int(dimensions[0]) if dimensions else 3
+                win_length = int(dimensions[1]) if len(dimensions) > 1 \
+                    else None
+                try:
+                    check_game(command[1], command[2], size, win_length)
+                except ValueError as error:
+                    print(f'Bad parameters! {error}')
+                    continue
+                winner = play_game(command[1], command[2], size=size,
+                                   win_length=win_length)
                 TicTacToe.print_winner(winner)
-                Player.reset_signs()
                 continue
             else:
                 print('Bad parameters!')
                 continue
 
 
+def play(argv):
+    """The function running play subcommand. Without arguments it starts
+    the interactive game menu, otherwise it plays one game between the
+    given players and prints the winner.
+    """
+    if not argv:
+        return play_menu()
+    import argparse
+    players = Bot.LEVELS + ('user',)
+    parser = argparse.ArgumentParser(
+        prog='main.py play',
+        description='Play one game, or start the game menu without '
+                    'arguments.')
+    parser.add_argument('player_1', choices=players)
+    parser.add_argument('player_2', choices=players)
+    parser.add_argument('--size', type=int, default=3,
+                        help='number of board rows and columns')
+    parser.add_argument('--win-length', type=int, default=None,
+                        help='signs in a row needed to win, default: size')
+    parser.add_argument('--renderer', choices=tuple(RENDERERS),
+                        default='full',
+                        help='full boards, changed cells only or nothing')
+    parser.add_argument('--flush', choices=FLUSH_POLICIES, default='turn',
+                        help='write the output after every turn or after '
+                             'the game')
+    parser.add_argument('--quiet', action='store_true',
+                        help='print only the winner, same as --renderer '
+                             'silent')
+    args = parser.parse_args(argv)
+    try:
+        check_game(args.player_1, args.player_2, args.size, args.win_length)
+    except ValueError as error:
+        parser.error(str(error))
+    renderer = make_renderer('silent' if args.quiet else args.renderer,
+                             flush_policy=args.flush)
+    winner = play_game(args.player_1, args.player_2, size=args.size,
+                       win_length=args.win_length, renderer=renderer)
+    TicTacToe.print_winner(winner)
+    return 0
+
+
+def bench(argv):
+    """The function running bench subcommand, see benchmarks/suite.py.
+    The suite is not a module of the game and is not installed by pip, it
+    is loaded from the source tree, so the command works only in a source
+    checkout.
+    """
+    import importlib.util
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'benchmarks', 'suite.py')
+    if not os.path.exists(path):
+        print(f'Benchmark suite not found: {path}, bench runs only in a '
+              f'source checkout, the benchmarks are not installed')
+        return 2
+    spec = importlib.util.spec_from_file_location('suite', path)
+    suite = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(suite)
+    return suite.main(argv)
+
+
+def main(argv=None):
+    """The entry point of the tictactoe command, runs a subcommand:
+        play - game menu or one game, the default without a command
+        simulate - headless bot versus bot games, see simulate.py
+        tournament - parallel bot versus bot games, see tournament.py
+        bench - benchmark suite, see benchmarks/suite.py, source checkout
+                only
+        serve - asyncio game server, see server.py
+    Subcommand modules are imported only when the subcommand runs, so a
+    short lived process pays just for what it uses.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        return play_menu()
+    command, args = argv[0], argv[1:]
+    if command == 'play':
+        return play(args)
+    if command == 'simulate':
+        import simulate
+        return simulate.main(args)
+    if command == 'tournament':
+        import tournament
+        return tournament.main(args)
+    if command == 'bench':
+        return bench(args)
+    if command == 'serve':
+        import server
+        return server.main(args)
+    if command in ('-h', '--help'):
+        print(USAGE)
+        return 0
+    print(f'Unknown command: {command}')
+    print(USAGE)
+    return 2
+
+
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""Monte Carlo Tree Search (UCT) for boards of any size.
+
+Strength of the search grows with its budget: a number of random playouts
+(rollouts) or seconds per move. For UCT see:
+https://en.wikipedia.org/wiki/Monte_Carlo_tree_search
+"""
+import random
+from math import log, sqrt
+from time import perf_counter
+
+from game_board import GameBoard
+
+SIGNS_DICT = {'O': 'X', 'X': 'O'}
+
+
+class Node:
+    """Node of the search tree.
+
+    Attributes:
+        move (tuple): (X,Y) coordinates of the move leading to the node.
+        sign (str): Sign of the player who made the move.
+        parent (Node): Parent node, None for the root.
+        children (list): Expanded child nodes.
+        untried (list): Moves not expanded yet.
+        winner (str/None): Winner if the move finished the game.
+        terminal (bool): True if the move finished the game.
+        visits (int): Number of rollouts through the node.
+        wins (float): Rollouts won by the sign, draws count as half.
+    """
+    __slots__ = ('move', 'sign', 'parent', 'children', 'untried', 'winner',
+                 'terminal', 'visits', 'wins')
+
+    def __init__(self, move, sign, parent, untried, terminal=False,
+                 winner=None):
+        self.move = move
+        self.sign = sign
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.terminal = terminal
+        self.winner = winner
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration):
+        """Method to return child with the highest UCT value."""
+        log_visits = log(self.visits)
+        return max(self.children,
+                   key=lambda child: child.wins / child.visits
+                   + exploration * sqrt(log_visits / child.visits))
+
+
+class MonteCarloTreeSearch:
+    """UCT search with a rollout or time budget per move.
+
+    Attributes:
+        rollouts (int): Rollouts per move, None means no rollout limit.
+        time_budget (float): Seconds per move, None means no time limit.
+        exploration (float): UCT exploration constant.
+        reuse_tree (bool): Defines if the subtree of the position reached
+                           after both players' moves is kept for the next
+                           search.
+        rng (random.Random): Random generator of the search, the rollouts
+                             of every search draw from a Mersenne Twister
+                             seeded from it once.
+        rollouts_done (int): Rollouts of the last search.
+        elapsed (float): Seconds spent by the last search.
+    """
+
+    def __init__(self, rollouts=1000, time_budget=None, exploration=sqrt(2),
+                 reuse_tree=False, rng=None):
+        """The constructor for MonteCarloTreeSearch class.
+        Params:
+            rollouts (int): Default = 1000, rollouts per move.
+            time_budget (float): Default = None, seconds per move.
+            exploration (float): Default = sqrt(2), UCT exploration constant.
+            reuse_tree (bool): Default = False, keep the tree between moves.
+            rng (random.Random): Default = None, random generator, None means
+                                 the module level generator of random.
+        """
+        if rollouts is None and time_budget is None:
+            raise ValueError('Rollouts or time budget should be given')
+        if rollouts is not None and rollouts < 1:
+            raise ValueError('rollouts should be a positive number')
+        self.rollouts = rollouts
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.reuse_tree = reuse_tree
+        self.rng = random if rng is None else rng
+        self.rollouts_done = 0
+        self.elapsed = 0.0
+        self._root = None
+        self._root_board = None
+        self._draw = None
+
+    def search(self, board, sign, win_length=None):
+        """Method to find the move with the most visited child.
+
+        Params:
+            board (list): TicTacToe game board list of rows, it is modified
+                          during the search and restored afterwards.
+            sign (str): Sign of the player to move.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
+
+        Returns: move (tuple): (X,Y) coordinates of the best move.
+        """
+        win_length = win_length or len(board)
+        start = perf_counter()
+        deadline = None if self.time_budget is None \
+            else start + self.time_budget
+        self._draw = random.Random(self.rng.getrandbits(64)).random
+        root = self._reused_root(board, sign)
+        if root is None:
+            # every empty cell is expanded, pruning to the cells next to
+            # the signs would bias the visit counts on larger boards
+            root = Node(None, SIGNS_DICT[sign], None,
+                        GameBoard.get_empty_cells(board))
+
+        rollouts = 0
+        while True:
+            if self.rollouts is not None and rollouts >= self.rollouts:
+                break
+            # at least one rollout is needed to pick a move
+            if deadline is not None and rollouts \
+                    and perf_counter() > deadline:
+                break
+            self._rollout(root, board, win_length)
+            rollouts += 1
+
+        self.rollouts_done = rollouts
+        self.elapsed = perf_counter() - start
+        best = max(root.children, key=lambda child: child.visits)
+        if self.reuse_tree:
+            self._root = best
+            self._root_board = [row.copy() for row in board]
+            self._root_board[best.move[0]][best.move[1]] = sign
+        return best.move
+
+    def _reused_root(self, board, sign):
+        """Method to find the subtree of the current position in the tree
+        kept from the previous search.
+
+        Returns: node (Node) or None if the tree cannot be reused.
+        """
+        previous, previous_board = self._root, self._root_board
+        self._root = self._root_board = None
+        if not self.reuse_tree or previous is None \
+                or len(previous_board) != len(board):
+            return None
+        # only the opponent's move should differ from the kept position
+        new_cells = [(cord_x, cord_y)
+                     for cord_x, row in enumerate(board)
+                     for cord_y, cell in enumerate(row)
+                     if cell != previous_board[cord_x][cord_y]]
+        if len(new_cells) != 1:
+            return None
+        opponents_move = new_cells[0]
+        if board[opponents_move[0]][opponents_move[1]] != SIGNS_DICT[sign]:
+            return None
+        for child in previous.children:
+            if child.move == opponents_move:
+                child.parent = None
+                return child
+        return None
+
+    def _rollout(self, root, board, win_length):
+        """Method making one selection, expansion, playout and
+        backpropagation pass. The board is restored afterwards."""
+        placed = []
+        node = root
+        try:
+            # selection
+            while not node.terminal and not node.untried and node.children:
+                node = node.select_child(self.exploration)
+                board[node.move[0]][node.move[1]] = node.sign
+                placed.append(node.move)
+            # expansion
+            if not node.terminal and node.untried:
+                untried = node.untried
+                index = int(self._draw() * len(untried))
+                untried[index], untried[-1] = untried[-1], untried[index]
+                move = untried.pop()
+                sign = SIGNS_DICT[node.sign]
+                board[move[0]][move[1]] = sign
+                placed.append(move)
+                is_win = GameBoard.is_winning_move(board, *move, win_length)
+                moves = [] if is_win else GameBoard.get_empty_cells(board)
+                child = Node(move, sign, node, moves,
+                             terminal=is_win or not moves,
+                             winner=sign if is_win else None)
+                node.children.append(child)
+                node = child
+            # playout
+            if node.terminal:
+                winner = node.winner
+            else:
+                winner = self._playout(board, SIGNS_DICT[node.sign],
+                                       win_length, placed)
+        finally:
+            for cord_x, cord_y in placed:
+                board[cord_x][cord_y] = ' '
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.sign:
+                node.wins += 1
+            node = node.parent
+
+    def _playout(self, board, sign, win_length, placed):
+        """Method playing random moves until the game is finished.
+        Moves are chosen like Bot.random_move, uniformly from empty cells.
+
+        Returns: winner (str/None): winner of the playout or None for draw.
+        """
+        empty_cells = GameBoard.get_empty_cells(board)
+        draw = self._draw
+        while empty_cells:
+            # a scaled float is faster than choice, the order of the
+            # remaining cells does not matter, so the last one fills the gap
+            index = int(draw() * len(empty_cells))
+            move = empty_cells[index]
+            empty_cells[index] = empty_cells[-1]
+            empty_cells.pop()
+            board[move[0]][move[1]] = sign
+            placed.append(move)
+            if GameBoard.is_winning_move(board, *move, win_length):
+                return sign
+            sign = SIGNS_DICT[sign]
+        return None
@@ -0,0 +1,235 @@
+"""Opt-in instrumentation of games and bot searches.
+
+A TicTacToe game created with metrics=Metrics() records:
+    - latency histogram of moves per player level,
+    - search nodes, transposition table hits and misses and terminal
+      evaluations of every bot move,
+    - time spent choosing moves, putting signs on the board (with the
+      incremental win check) and rendering the board,
+    - optionally a cProfile capture of every game, see Metrics.profile.
+Games without metrics check a single attribute per move, bots count
+their nodes and terminal evaluations in plain integer attributes anyway.
+
+Metrics are exported as JSON or Prometheus text format, e.g.:
+    python main.py simulate hard easy --metrics metrics.prom
+"""
+import cProfile
+import json
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+
+# upper bounds of latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNTERS = ('moves', 'search_nodes', 'cache_hits', 'cache_misses',
+            'terminal_evaluations')
+PHASES = ('move', 'win_check', 'render')
+FORMATS = ('json', 'prometheus')
+PREFIX = 'tictactoe'
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets.
+        counts (list): Number of observations of every bucket, the last
+                       item counts observations above all bounds.
+        total (float): Sum of observations.
+        count (int): Number of observations.
+    """
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Method to add one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        """Method to return list of (upper bound, observations up to the
+        bound) pairs, the last bound is float('inf')."""
+        pairs, running = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),),
+                                self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+class Metrics:
+    """Registry of game and search measurements.
+
+    Attributes:
+        profile_dir (str): Directory of per game cProfile stats files,
+                           None means the games are not profiled.
+        games (int): Number of games played within profile().
+        latency (dict): Move latency Histogram by player level.
+        counters (dict): Dicts of COUNTERS values by player level.
+        phase_seconds (dict): Seconds spent in every one of PHASES.
+    """
+
+    def __init__(self, profile_dir=None):
+        """The constructor for Metrics class.
+        Params:
+            profile_dir (str): Default = None, write cProfile stats of every
+                               game to the directory.
+        """
+        self.profile_dir = profile_dir
+        self.games = 0
+        self.latency = {}
+        self.counters = {}
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        if profile_dir is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    def make_move(self, player, game_board):
+        """Method making the player's move on the game board and measuring
+        it, used by TicTacToe.make_move.
+
+        Params:
+            player (Player): Player to move.
+            game_board (GameBoard): The game board.
+        """
+        level = getattr(player, 'bot_level', 'user')
+        table = getattr(player, 'transposition_table', None)
+        nodes = getattr(player, 'search_nodes', 0)
+        terminals = getattr(player, 'terminal_evaluations', 0)
+        hits, misses = (table.hits, table.misses) if table else (0, 0)
+
+        start = perf_counter()
+        cord_x, cord_y = player.get_cords(game_board.get_board())
+        chosen = perf_counter()
+        game_board.input_to_board(cord_x, cord_y, player.sign)
+        finished = perf_counter()
+
+        self.phase_seconds['move'] += chosen - start
+        self.phase_seconds['win_check'] += finished - chosen
+        histogram = self.latency.get(level)
+        if histogram is None:
+            histogram = self.latency[level] = Histogram()
+        histogram.observe(chosen - start)
+        counters = self.counters.get(level)
+        if counters is None:
+            counters = self.counters[level] = dict.fromkeys(COUNTERS, 0)
+        counters['moves'] += 1
+        counters['search_nodes'] += getattr(player, 'search_nodes', 0) \
+            - nodes
+        counters['terminal_evaluations'] += \
+            getattr(player, 'terminal_evaluations', 0) - terminals
+        if table:
+            counters['cache_hits'] += table.hits - hits
+            counters['cache_misses'] += table.misses - misses
+
+    def render(self, renderer, game_board):
+        """Method rendering the game board, ending the turn's output (see
+        render.py) and measuring it."""
+        start = perf_counter()
+        renderer.board(game_board)
+        renderer.end_turn()
+        self.phase_seconds['render'] += perf_counter() - start
+
+    @contextmanager
+    def profile(self):
+        """Context manager around one game. Counts the game and, if
+        profile_dir is set, writes its cProfile stats to
+        'game-<number>.pstats' file readable by pstats.Stats."""
+        self.games += 1
+        if self.profile_dir is None:
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(self.profile_dir,
+                                             f'game-{self.games}.pstats'))
+
+    def to_dict(self):
+        """Method to return JSON serializable metrics."""
+        return {
+            'games': self.games,
+            'phase_seconds': dict(self.phase_seconds),
+            'levels': {
+                level: {
+                    **self.counters[level],
+                    'latency': {
+                        'count': histogram.count,
+                        'sum_s': histogram.total,
+                        'buckets': [[bound if bound != float('inf')
+                                     else '+Inf', count]
+                                    for bound, count
+                                    in histogram.cumulative()],
+                    },
+                }
+                for level, histogram in sorted(self.latency.items())
+            },
+        }
+
+    def to_prometheus(self):
+        """Method to return metrics in Prometheus text exposition format."""
+        lines = [
+            f'# HELP {PREFIX}_games_total Finished games.',
+            f'# TYPE {PREFIX}_games_total counter',
+            f'{PREFIX}_games_total {self.games}',
+            f'# HELP {PREFIX}_phase_seconds_total Time spent per game phase.',
+            f'# TYPE {PREFIX}_phase_seconds_total counter',
+        ]
+        for phase, seconds in self.phase_seconds.items():
+            lines.append(f'{PREFIX}_phase_seconds_total{{phase="{phase}"}} '
+                         f'{seconds!r}')
+
+        name = f'{PREFIX}_move_seconds'
+        lines += [f'# HELP {name} Move latency per player level.',
+                  f'# TYPE {name} histogram']
+        for level, histogram in sorted(self.latency.items()):
+            for bound, count in histogram.cumulative():
+                bound = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{level="{level}",le="{bound}"}}'
+                             f' {count}')
+            lines.append(f'{name}_sum{{level="{level}"}} '
+                         f'{histogram.total!r}')
+            lines.append(f'{name}_count{{level="{level}"}} '
+                         f'{histogram.count}')
+
+        for counter in COUNTERS:
+            name = f'{PREFIX}_{counter}_total'
+            lines += [f'# HELP {name} {counter.replace("_", " ").capitalize()}'
+                      ' per player level.',
+                      f'# TYPE {name} counter']
+            for level, counters in sorted(self.counters.items()):
+                lines.append(f'{name}{{level="{level}"}} {counters[counter]}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, fmt=None):
+        """Method to write metrics to a local file. The file is replaced
+        at once, so scrapers never read a partly written file.
+
+        Params:
+            path (str): Output file path.
+            fmt (str): Default = None, 'json' or 'prometheus', None means
+                       'prometheus' for '.prom' files and 'json' otherwise.
+        """
+        if fmt is None:
+            fmt = 'prometheus' if path.endswith('.prom') else 'json'
+        if fmt not in FORMATS:
+            raise ValueError(f'Unknown metrics format: {fmt}')
+        text = self.to_prometheus() if fmt == 'prometheus' \
+            else json.dumps(self.to_dict(), indent=2) + '\n'
+        # the name is unique per process and thread, so concurrent writers
+        # of the same path never share the temporary file
+        temporary_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary_path, 'w') as metrics_file:
+            metrics_file.write(text)
+        os.replace(temporary_path, path)
@@ -1,5 +1,11 @@
-from random import choice
-from game_board import GameBoard
+from bitboard import BitBoard, CELL_MASKS, IS_WIN
+from deepening import IterativeDeepeningSearch, open_lines_heuristic
+from game_board import GameBoard, winning_lines
+from rng import RandomStream, new_seed
+from search_state import SearchState, SIGN_CODES
+from symmetry import canonical_string
+from threats import RULES, ThreatBoard
+from transposition import TranspositionTable
 
 
 class Player:
@@ -9,24 +15,25 @@ class Player:
         sign (str): Player's instance sign X or O
         opponents_sign (str): Player's instance opponent's sign X or O
         is_bot (bool): Bool defining if the player is Human or AI player
+        signs (list): Class attribute - shared pool of signs used by players
+                      created without a sign, allows maximum of two players
+                      until reset_signs is called
     """
     signs = ['O', 'X']
     SIGNS_DICT = {'O': 'X', 'X': 'O'}
 
-    def __new__(cls, *args, **kwargs):
-        """Dunder method to control the number of instances of Player class
-        to maximum of two per game
-        """
-        if len(cls.signs) == 0:
-            raise TypeError('Too many players')
-        return super(Player, cls).__new__(cls)
-
-    def __init__(self, is_bot=None):
+    def __init__(self, is_bot=None, sign=None):
         """The constructor of Player class.
         Parameters:
             is_bot (bool): defining if the player is human or AI player.
+            sign (str): Default = None, player's sign X or O, if None the
+                        sign is taken from the shared signs pool.
         """
-        self.sign = self.get_sign()
+        if sign is None:
+            sign = self.get_sign()
+        elif sign not in self.SIGNS_DICT:
+            raise ValueError(f'Unknown sign: {sign}')
+        self.sign = sign
         self.opponents_sign = self.SIGNS_DICT[self.sign]
         self.is_bot = is_bot
 
@@ -37,6 +44,8 @@ class Player:
     @classmethod
     def get_sign(cls):
         """Class method to remove used sign for the signs class variable"""
+        if len(cls.signs) == 0:
+            raise TypeError('Too many players')
         return cls.signs.pop()
 
     @classmethod
@@ -53,9 +62,11 @@ class HumanPlayer(Player):
         is_bot (bool): Bool defining if the player is Human or AI player
     """
 
-    def __init__(self):
-        """The constructor of HumanPlayer class."""
-        super().__init__(is_bot=False)
+    def __init__(self, sign=None):
+        """The constructor of HumanPlayer class.
+        Params: sign (str): Default = None, player's sign X or O.
+        """
+        super().__init__(is_bot=False, sign=sign)
 
     def get_cords(self, game_board):
         """Method to get X, Y cords from Human player's input.
@@ -71,16 +82,18 @@ class HumanPlayer(Player):
         cord_x, cord_y = None, None
         while cord_x is None and cord_y is None:
             user_input = input('Enter the coordinates:')
-            cord_x, cord_y = self.validate_input(user_input, empty_cells)
+            cord_x, cord_y = self.validate_input(user_input, empty_cells,
+                                                 len(game_board))
         return cord_x, cord_y
 
     @staticmethod
-    def validate_input(user_input, empty_cells):
+    def validate_input(user_input, empty_cells, size=3):
         """Static method to validate user's input.
 
         Params:
             user_input (str): String input from the user.
             empty_cells (list): List of empty cell's (X,Y) coordinates.
+            size (int): Default = 3, number of board's rows and columns.
 
         Returns:
             If user input is valid:
@@ -89,7 +102,7 @@ class HumanPlayer(Player):
             If user input is invalid:
                 None, None
         """
-        valid_cords = [0, 1, 2]
+        valid_cords = range(size)
         try:
             x, y = user_input.split()
             cord_x = int(x) - 1
@@ -101,7 +114,7 @@ class HumanPlayer(Player):
                     print('This cell is occupied! Choose another one!')
                     return None, None
                 else:
-                    print('Coordinates should be from 1 to 3!')
+                    print(f'Coordinates should be from 1 to {size}!')
                     return None, None
         except ValueError:
             print('You should enter numbers!')
@@ -114,15 +127,123 @@ class Bot(Player):
         sign (str): Bot's instance sign X or O.
         opponents_sign (str): Bot's instance opponent's sign X or O.
         is_bot (bool): Bool defining if the player is Human or AI player.
-        bot_level (str): Representing bot difficulty level(easy, medium, hard).
+        bot_level (str): Representing bot difficulty level(easy, medium, hard,
+                         timed, mcts, tactical).
+        search (str): 'hard' bot search algorithm (minimax, bitboard,
+                      alphabeta, table, state).
+        use_cache (bool): Defines if the search uses transposition table.
+        stop_on_win (bool): Defines if alphabeta search stops at the first
+                            forced win instead of looking for the fastest.
+        search_nodes (int): Number of positions visited by the searches.
+        terminal_evaluations (int): Number of finished positions scored by
+                                    the searches.
+        verbose (bool): Defines if the bot prints its moves.
+        win_length (int): Number of signs in a row needed to win, None means
+                          the board size.
+        deepening (IterativeDeepeningSearch): 'timed' bot search, None for
+                          other levels.
+        tree_search (MonteCarloTreeSearch): 'mcts' bot search, None for
+                          other levels.
+        threat_board (ThreatBoard): 'tactical' bot board reset for every
+                          move, None until the first move.
+        strength (int): Number of threats.RULES used by 'tactical' bot.
+        seed (int): Seed of the bot's random generator.
+        rng (RandomStream): The bot's random generator, used for random
+                            moves and 'mcts' bot rollouts.
+        transposition_table (TranspositionTable): Class attribute - cache of
+                        searched positions shared by all bots in the process.
     """
-
-    def __init__(self, bot_level):
+    LEVELS = ('easy', 'medium', 'hard', 'timed', 'mcts', 'tactical',
+              'learned')
+    SEARCHES = ('minimax', 'bitboard', 'alphabeta', 'table', 'state')
+    # alphabeta move ordering after winning and blocking moves:
+    # center, corners, edges
+    MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+    # flags of alphabeta transposition table entries
+    EXACT, LOWER, UPPER = 0, 1, 2
+    # 'hard' bot searches the whole game tree, which is tractable only up
+    # to 9 empty cells, the empty 4 x 4 board takes hours
+    MAX_SEARCH_CELLS = 9
+    transposition_table = TranspositionTable()
+
+    def __init__(self, bot_level, search='table', use_cache=True,
+                 stop_on_win=False, verbose=True, sign=None,
+                 win_length=None, time_budget=None, node_budget=None,
+                 evaluate=open_lines_heuristic, rollouts=1000,
+                 reuse_tree=False, strength=len(RULES), seed=None,
+                 size=None):
         """The constructor of Bot class.
-        Params: bot_level (str): Bot difficulty level (easy, medium, hard)
+        Params:
+            bot_level (str): Bot difficulty level (easy, medium, hard, timed,
+                             mcts, tactical, learned)
+            search (str): Default = 'table', 'hard' bot search algorithm
+                          'minimax' - list based minimax,
+                          'bitboard' - minimax on BitBoard,
+                          'alphabeta' - negamax with alpha-beta pruning,
+                          'table' - solution table lookup, alphabeta if
+                          the table file is missing or stale,
+                          'state' - negamax with make/unmake moves on
+                          SearchState, boards of any size, no cache.
+            use_cache (bool): Default = True, use transposition table.
+            stop_on_win (bool): Default = False, alphabeta search accepts
+                                the first forced win it finds.
+            verbose (bool): Default = True, print bot's moves.
+            sign (str): Default = None, bot's sign X or O.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
+            time_budget (float): Default = None, 'timed' and 'mcts' bots
+                                 seconds per move, None means 0.5 s for
+                                 'timed' bot and no time limit for 'mcts'.
+            node_budget (int): Default = None, 'timed' bot positions per move.
+            evaluate (function): Default = open_lines_heuristic, 'timed' bot
+                                 evaluation of positions at the depth limit.
+            rollouts (int): Default = 1000, 'mcts' bot rollouts per move,
+                            None means no rollout limit.
+            reuse_tree (bool): Default = False, 'mcts' bot keeps its search
+                               tree between moves.
+            strength (int): Default = len(threats.RULES), number of rules
+                            used by 'tactical' bot: win, block, fork, block
+                            fork, center, opposite corner, corner, side.
+            seed (int): Default = None, seed of the bot's random generator,
+                        None means a seed drawn from the module level
+                        generator of random (see rng.py).
+            size (int): Default = None, number of board's rows and columns
+                        the bot plays, checked by check_board, None means
+                        not checked.
         """
-        super().__init__(is_bot=True)
+        if bot_level not in self.LEVELS:
+            raise ValueError(f'Unknown bot level: {bot_level}')
+        if size is not None:
+            self.check_board(bot_level, size)
+        if search not in self.SEARCHES:
+            raise ValueError(f'Unknown search: {search}')
+        if not 0 <= strength <= len(RULES):
+            raise ValueError(f'strength should be from 0 to {len(RULES)}')
+        super().__init__(is_bot=True, sign=sign)
         self.bot_level = bot_level
+        self.search = search
+        self.use_cache = use_cache
+        self.stop_on_win = stop_on_win
+        self.search_nodes = 0
+        self.terminal_evaluations = 0
+        self.verbose = verbose
+        self.win_length = win_length
+        self.deepening = None
+        self.tree_search = None
+        self.threat_board = None
+        self.strength = strength
+        self.seed = new_seed() if seed is None else seed
+        self.rng = RandomStream(self.seed)
+        if bot_level == 'timed':
+            self.deepening = IterativeDeepeningSearch(
+                time_budget=0.5 if time_budget is None else time_budget,
+                node_budget=node_budget, evaluate=evaluate)
+        elif bot_level == 'mcts':
+            # imported on first use to keep the process start cheap
+            from mcts import MonteCarloTreeSearch
+            self.tree_search = MonteCarloTreeSearch(
+                rollouts=rollouts, time_budget=time_budget,
+                reuse_tree=reuse_tree, rng=self.rng)
 
     def get_cords(self, game_board):
         """Method to return get_cords method according to bot difficulty."""
@@ -132,6 +253,29 @@ class Bot(Player):
             return self.ai_get_cords_medium(game_board)
         if self.bot_level == "hard":
             return self.ai_get_cord_hard(game_board)
+        if self.bot_level == 'timed':
+            return self.ai_get_cords_timed(game_board)
+        if self.bot_level == 'mcts':
+            return self.ai_get_cords_mcts(game_board)
+        if self.bot_level == 'tactical':
+            return self.ai_get_cords_tactical(game_board)
+        if self.bot_level == 'learned':
+            return self.ai_get_cords_learned(game_board)
+
+    @classmethod
+    def check_board(cls, bot_level, size):
+        """Class method to check that the bot level can play the board.
+        Params:
+            bot_level (str): Bot difficulty level.
+            size (int): Number of board's rows and columns.
+
+        Raises: ValueError if the level would search the whole game tree of
+                a board where the search never ends.
+        """
+        if bot_level == 'hard' and size * size > cls.MAX_SEARCH_CELLS:
+            raise ValueError(f"'hard' bot searches the whole game tree, "
+                             f"{size} x {size} board is too large for it, "
+                             f"use 'timed', 'mcts' or 'tactical' bot")
 
     def ai_get_cords_easy(self, game_board):
         """Method to return 'easy' bot move.
@@ -139,7 +283,8 @@ class Bot(Player):
         Returns: move (tuple): tuple of (X,Y) coordinates."""
         # Easy bot returns a random move from available moves.
         empty_cells = GameBoard.get_empty_cells(game_board)
-        print('Making move level "easy"')
+        if self.verbose:
+            print('Making move level "easy"')
         return self.random_move(empty_cells)
 
     def ai_get_cords_medium(self, game_board):
@@ -149,8 +294,9 @@ class Bot(Player):
         # Medium bot returns a winning move if it's available.
         # If there is no winning move it returns a blocking move.
         # If neither of both is available it returns a random move.
-        print('Making move level "medium"')
-        win_moves = self.get_winning_moves(game_board)
+        if self.verbose:
+            print('Making move level "medium"')
+        win_moves = self.get_winning_moves(game_board, self.win_length)
         if win_moves[self.sign]:
             return self.random_move(win_moves[self.sign])
         elif win_moves[self.opponents_sign]:
@@ -164,14 +310,112 @@ class Bot(Player):
         Params: game_board(list) TicTacToe game board list of rows.
         Returns: move (tuple): tuple of (X,Y) coordinates."""
         # 'hard' Bot returns the best move possible.
-        # The best move is calculated by minimax algorithm.
-        board = game_board.copy()
-        best_move = self.minimax(board, 0, True)[:2]
+        # The best move is calculated by the search algorithm chosen for
+        # the bot, 'bitboard' and 'alphabeta' work on a BitBoard copy
+        # of the game board. BitBoard is 3 x 3 only, other boards are
+        # searched with list based minimax. 'state' search allocates
+        # nothing per position, so it does not count search_nodes.
+        empty_cells = sum(row.count(' ') for row in game_board)
+        if empty_cells > self.MAX_SEARCH_CELLS:
+            raise ValueError(f"'hard' bot cannot search {empty_cells} "
+                             f"empty cells, see Bot.check_board")
+        if self.search == 'state':
+            state = SearchState.from_rows(game_board, self.win_length)
+            best_move = state.best_move(SIGN_CODES[self.sign])[:2]
+        elif self.search == 'minimax' \
+                or not self.is_classic_board(game_board):
+            # minimax writes into the rows, the game board stays intact
+            board = [row.copy() for row in game_board]
+            best_move = self.minimax(board, 0, True)[:2]
+        elif self.search == 'bitboard':
+            board = BitBoard.from_rows(game_board)
+            best_move = self.bitboard_minimax(board, True)[:2]
+        else:
+            board = BitBoard.from_rows(game_board)
+            best_move = None
+            if self.search == 'table':
+                best_move = self.table_move(board)
+            if best_move is None:
+                best_move = self.alphabeta_root(board)[:2]
+
+        if self.verbose:
+            print('Making move level "hard"')
+        return best_move
 
-        print('Making move level "hard"')
+    def ai_get_cords_timed(self, game_board):
+        """Method to return 'timed' bot move.
+        Params: game_board(list) TicTacToe game board list of rows.
+        Returns: move (tuple): tuple of (X,Y) coordinates."""
+        # 'timed' Bot searches deeper and deeper until the time or node
+        # budget runs out, the best move of the deepest completed search
+        # is returned.
+        board = [row.copy() for row in game_board]
+        best_move = self.deepening.search(board, self.sign,
+                                          self.win_length)[:2]
+        self.search_nodes += self.deepening.nodes
+        self.terminal_evaluations += self.deepening.terminal_evaluations
+
+        if self.verbose:
+            print('Making move level "timed"')
+        return tuple(best_move)
+
+    def ai_get_cords_mcts(self, game_board):
+        """Method to return 'mcts' bot move.
+        Params: game_board(list) TicTacToe game board list of rows.
+        Returns: move (tuple): tuple of (X,Y) coordinates."""
+        # 'mcts' Bot plays random games from the current position and
+        # returns the move explored the most by Monte Carlo Tree Search.
+        board = [row.copy() for row in game_board]
+        best_move = self.tree_search.search(board, self.sign,
+                                            self.win_length)
+
+        if self.verbose:
+            print('Making move level "mcts"')
         return best_move
 
-    def minimax(self, board, depth, is_maximizer):
+    def ai_get_cords_tactical(self, game_board):
+        """Method to return 'tactical' bot move.
+        Params: game_board(list) TicTacToe game board list of rows.
+        Returns: move (tuple): tuple of (X,Y) coordinates."""
+        # 'tactical' Bot plays by the first of its rules matching the
+        # board: win, block, fork, block fork, center, opposite corner,
+        # corner, side. Weaker bots use fewer rules and then move at
+        # random, there is no search.
+        if self.verbose:
+            print('Making move level "tactical"')
+        return self.tactical_move(game_board)
+
+    def tactical_move(self, game_board):
+        """Returns (X,Y) coordinates of the first matching tactical rule."""
+        # the bot keeps one ThreatBoard and resets it for every move
+        state = self.threat_board
+        if state is None or state.size != len(game_board):
+            state = self.threat_board = ThreatBoard(len(game_board),
+                                                    self.win_length)
+        state.set_rows(game_board)
+        count = state.candidates(SIGN_CODES[self.sign], self.strength)
+        return divmod(state.moves[self.rng.below(count)], state.size)
+
+    def ai_get_cords_learned(self, game_board):
+        """Method to return 'learned' bot move.
+        Params: game_board(list) TicTacToe game board list of rows.
+        Returns: move (tuple): tuple of (X,Y) coordinates."""
+        # 'learned' Bot looks up the move of the policy trained by
+        # self-play (see learned.py), a single array lookup. Without the
+        # policy file and on boards other than 3 x 3 it plays the
+        # 'tactical' rules.
+        import learned
+        policy = learned.load_default()
+        if self.verbose:
+            print('Making move level "learned"')
+        if policy is not None and len(game_board) == 3 \
+                and self.win_length in (None, 3):
+            cell = policy.move(BitBoard.from_rows(game_board).index())
+            if cell != learned.NO_MOVE:
+                return divmod(cell, 3)
+        return self.tactical_move(game_board)
+
+    def minimax(self, board, depth, is_maximizer, last_move=None):
         """Recursive method implementing Minimax algorithm.
         For Minimax see:
         https://en.wikipedia.org/wiki/Minimax
@@ -179,17 +423,30 @@ class Bot(Player):
             board (list): TicTacToe game board list of rows.
             depth (int): Depth of the current node.
             is_maximizer (bool): bool defining if the player is maximizing.
+            last_move (tuple): Default = None, (X,Y) coordinates of the move
+                               leading to the node, only the lines through
+                               it are checked for a win, None means the
+                               whole board is checked.
 
         Returns:
             best (list): list of [cord_x, cord_y, score] for the best move
                          possible.
         """
+        self.search_nodes += 1
         score_dict = {self.sign: 10, self.opponents_sign: -10}
         empty_cells = GameBoard.get_empty_cells(board)
-        is_finished, winner = GameBoard.is_finished(board)
+        if last_move is None:
+            is_finished, winner = GameBoard.is_finished(
+                board, win_length=self.win_length)
+        elif GameBoard.is_winning_move(board, *last_move,
+                                       self.win_length or len(board)):
+            is_finished, winner = True, board[last_move[0]][last_move[1]]
+        else:
+            is_finished, winner = not empty_cells, None
         # base condition  of minimax method
         # if the game is finished, returns score of the move based on winner
         if is_finished:
+            self.terminal_evaluations += 1
             return [-1, -1, score_dict.get(winner, 0)]
         # condition for maximizing player
         if is_maximizer:
@@ -205,8 +462,23 @@ class Bot(Player):
             # for every possible move we perform it, and call minimax for it
             # to score it, then we un-do the move and return it as best_move
             # if the score is greater than best score
+            # positions already searched are taken from transposition table
             board[cord_x][cord_y] = sign
-            score = self.minimax(board, depth + 1, not is_maximizer)
+            # cached value is stored from the perspective of the player
+            # to move, so it is independent of the bot's own sign
+            mover_factor = -1 if is_maximizer else 1
+            value = None
+            if self.use_cache:
+                key = self.position_key(board, self.SIGNS_DICT[sign],
+                                        self.win_length)
+                value = self.transposition_table.get(key)
+            if value is None:
+                score = self.minimax(board, depth + 1, not is_maximizer,
+                                     (cord_x, cord_y))
+                if self.use_cache:
+                    self.transposition_table.put(key, score[2] * mover_factor)
+            else:
+                score = [-1, -1, value * mover_factor]
             board[cord_x][cord_y] = ' '
             score[0], score[1] = cord_x, cord_y
 
@@ -219,56 +491,249 @@ class Bot(Player):
 
         return best
 
+    def bitboard_minimax(self, board, is_maximizer):
+        """Recursive method implementing Minimax algorithm on BitBoard.
+        Works as minimax method, but the moves are made and taken back
+        in place, so no lists are created for the searched positions.
+        Params:
+            board (BitBoard): TicTacToe game board.
+            is_maximizer (bool): bool defining if the player is maximizing.
+
+        Returns:
+            best (list): list of [cord_x, cord_y, score] for the best move
+                         possible.
+        """
+        self.search_nodes += 1
+        is_finished, winner = board.is_finished()
+        if is_finished:
+            self.terminal_evaluations += 1
+            if winner is None:
+                return [-1, -1, 0]
+            return [-1, -1, 10 if winner == self.sign else -10]
+        if is_maximizer:
+            best = [-1, -1, -1000]
+            sign = self.sign
+            mover_factor = -1
+        else:
+            best = [-1, -1, +1000]
+            sign = self.opponents_sign
+            mover_factor = 1
+
+        for index in board.empty_cells():
+            board.place(index, sign)
+            value = None
+            if self.use_cache:
+                # BitBoard's canonical masks also define the player to move
+                key = board.canonical()
+                value = self.transposition_table.get(key)
+            if value is None:
+                score = self.bitboard_minimax(board, not is_maximizer)
+                if self.use_cache:
+                    self.transposition_table.put(key, score[2] * mover_factor)
+            else:
+                score = [-1, -1, value * mover_factor]
+            board.undo()
+            score[0], score[1] = divmod(index, 3)
+
+            if is_maximizer:
+                if score[2] > best[2]:
+                    best = score
+            else:
+                if score[2] < best[2]:
+                    best = score
+
+        return best
+
+    def table_move(self, board):
+        """Method to look up the best move in the solution table.
+        Params: board (BitBoard): TicTacToe game board, bot's sign to move.
+
+        Returns: move (tuple): (X,Y) coordinates or None if the table is
+                 not available.
+        """
+        import solution_table
+        table = solution_table.load_default()
+        if table is None:
+            return None
+        best_moves = table.best_moves(board)
+        for index in self.MOVE_ORDER:
+            if index in best_moves:
+                return divmod(index, 3)
+        return None
+
+    def alphabeta_root(self, board):
+        """Method to find the best move with alphabeta search.
+        Params: board (BitBoard): TicTacToe game board, bot's sign to move.
+
+        Returns:
+            best (list): list of [cord_x, cord_y, score] for the best move
+                         possible, score is positive if the bot wins.
+        """
+        self.search_nodes += 1
+        best = [-1, -1, -1000]
+        alpha, beta = -1000, 1000
+        sign = self.sign
+        for index in self.order_moves(board, sign):
+            board.place(index, sign)
+            score = -self.alphabeta(board, self.SIGNS_DICT[sign],
+                                    -beta, -alpha)
+            board.undo()
+            if score > best[2]:
+                best = [*divmod(index, 3), score]
+                alpha = max(alpha, score)
+                if self.stop_on_win and score > 0:
+                    break
+        return best
+
+    def alphabeta(self, board, sign, alpha, beta):
+        """Recursive method implementing Negamax algorithm with alpha-beta
+        pruning. For Negamax and alpha-beta pruning see:
+        https://en.wikipedia.org/wiki/Negamax
+        Scores are depth aware, winning with fewer signs on the board scores
+        higher, so the bot prefers faster wins and slower losses.
+        Params:
+            board (BitBoard): TicTacToe game board.
+            sign (str): Sign of the player to move.
+            alpha (int): The score the player to move is already assured of.
+            beta (int): The score the opponent is already assured of.
+
+        Returns:
+            score (int): Score of the position for the player to move.
+        """
+        self.search_nodes += 1
+        stones = board.stone_count()
+        # only the player who made the last move could win
+        if IS_WIN[board.x_mask] or IS_WIN[board.o_mask]:
+            self.terminal_evaluations += 1
+            return stones - 10
+        if stones == 9:
+            self.terminal_evaluations += 1
+            return 0
+        # the best score possible is winning with the next move
+        if alpha >= 10 - (stones + 1):
+            return alpha
+
+        key = None
+        if self.use_cache:
+            # first win scores are not exact, so they are kept apart
+            key = ('alphabeta', self.stop_on_win, board.canonical())
+            entry = self.transposition_table.get(key)
+            if entry is not None:
+                flag, value = entry
+                if flag == self.EXACT:
+                    return value
+                if flag == self.LOWER and value >= beta:
+                    return value
+                if flag == self.UPPER and value <= alpha:
+                    return value
+
+        alpha_start = alpha
+        best = -1000
+        opponents_sign = self.SIGNS_DICT[sign]
+        for index in self.order_moves(board, sign):
+            board.place(index, sign)
+            score = -self.alphabeta(board, opponents_sign, -beta, -alpha)
+            board.undo()
+            if score > best:
+                best = score
+                alpha = max(alpha, score)
+                if alpha >= beta or (self.stop_on_win and score > 0):
+                    break
+
+        if key is not None:
+            if best <= alpha_start:
+                flag = self.UPPER
+            elif best >= beta or (self.stop_on_win and best > 0):
+                flag = self.LOWER
+            else:
+                flag = self.EXACT
+            self.transposition_table.put(key, (flag, best))
+        return best
+
+    def order_moves(self, board, sign):
+        """Method to order empty cells for alphabeta search:
+        winning moves, blocking moves, center, corners, edges.
+        Params:
+            board (BitBoard): TicTacToe game board.
+            sign (str): Sign of the player to move.
+
+        Returns: moves (list): List of empty cells indexes.
+        """
+        if sign == 'X':
+            own, opponents = board.x_mask, board.o_mask
+        else:
+            own, opponents = board.o_mask, board.x_mask
+        occupied = own | opponents
+        wins, blocks, others = [], [], []
+        for index in self.MOVE_ORDER:
+            cell = CELL_MASKS[index]
+            if occupied & cell:
+                continue
+            if IS_WIN[own | cell]:
+                wins.append(index)
+            elif IS_WIN[opponents | cell]:
+                blocks.append(index)
+            else:
+                others.append(index)
+        return wins + blocks + others
+
+    def is_classic_board(self, board):
+        """Method to check if the game is played on 3 x 3 board with
+        3 signs in a row needed to win."""
+        return len(board) == 3 and self.win_length in (None, 3)
+
     @staticmethod
-    def get_winning_moves(board):
+    def position_key(board, sign_to_move, win_length=None):
+        """Static method to create transposition table key of a position.
+        All 8 rotations and reflections of 3 x 3 board share the same key.
+
+        Params:
+            board (list): TicTacToe game board list of rows.
+            sign_to_move (str): Sign of the player to move.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
+
+        Returns: key (tuple): (canonical board string, sign_to_move) or
+                 (board string, sign_to_move, win_length) for other boards
+        """
+        board_string = ''.join([''.join(row) for row in board])
+        if len(board) == 3 and win_length in (None, 3):
+            return canonical_string(board_string), sign_to_move
+        return board_string, sign_to_move, win_length or len(board)
+
+    @staticmethod
+    def get_winning_moves(board, win_length=None):
         """Static method to evaluate the game board and create a dictionary
         of winning moves for 'X' sign and 'O' sign.
 
-        Params: board (list): TicTacToe game board list of rows
+        Params:
+            board (list): TicTacToe game board list of rows
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
 
         Returns: win_moves (dict): Dictionary of 'X', 'O' keys storing list
                  of (cord_x, cord_y) coordinates tuples of winning moves.
         """
         win_moves = {'X': [], 'O': []}
-
-        def check_cells(cells):
-            if len(set(cells)) == 2 and cells.count(' ') == 1:
-                index = cells.index(' ')
-                cells.remove(' ')
-                return True, cells[0], index
-            return False, None, None
-
-        # Loop through rows an columns
-        for i in range(3):
-            row = board[i].copy()
-            column = [board[0][i], board[1][i], board[2][i]]
-
-            # Check rows for possible winning move
-            is_row_win, row_sign, row_y = check_cells(row)
-            if is_row_win:
-                win_moves[row_sign].append((i, row_y))
-
-            # Check columns for possible winning move
-            is_col_win, col_sign, col_x = check_cells(column)
-            if is_col_win:
-                win_moves[col_sign].append((col_x, i))
-
-        # Check for diagonals
-        diagonal1 = [board[0][0], board[1][1], board[2][2]]
-        diagonal2 = [board[0][2], board[1][1], board[2][0]]
-
-        is_diag1_win, diag1_sign, diag1_xy = check_cells(diagonal1)
-        if is_diag1_win:
-            win_moves[diag1_sign].append((diag1_xy, diag1_xy))
-
-        is_diag2_win, diag2_sign, diag2_x = check_cells(diagonal2)
-        if is_diag2_win:
-            y = {0: 2, 1: 1, 2: 0}
-            win_moves[diag2_sign].append((diag2_x, y[diag2_x]))
-
+        # a line with one empty cell and all other cells of the same sign
+        # is won by putting the sign into the empty cell
+        for line in winning_lines(len(board), win_length or len(board)):
+            empty, sign = None, None
+            for cord_x, cord_y in line:
+                cell = board[cord_x][cord_y]
+                if cell == ' ':
+                    if empty is not None:
+                        break
+                    empty = (cord_x, cord_y)
+                elif sign is None:
+                    sign = cell
+                elif cell != sign:
+                    break
+            else:
+                if empty is not None and sign is not None:
+                    win_moves[sign].append(empty)
         return win_moves
 
-    @staticmethod
-    def random_move(move_list):
-        """Static method that returns random chosen move from move_list."""
-        return choice(move_list)
+    def random_move(self, move_list):
+        """Method that returns random chosen move from move_list."""
+        return self.rng.pick(move_list)
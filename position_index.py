@@ -0,0 +1,332 @@
+"""Statistics of 3 x 3 positions of logged games.
+
+The index is built in one streaming pass over game logs (see game_log.py).
+Positions equal under rotation or reflection share one entry, so every
+reachable position where a player is to move has a slot. For every player
+type and slot the index counts the games the player to move won, drew and
+lost from the position, and the moves played from it. Moves are counted
+in the canonical orientation of the position, moves equal under the
+position's own symmetries share one counter.
+
+Queries read the counters of single positions, so they never rescan the
+logs. The index is saved as a compact array file (little endian):
+    header: magic b'TTTP', format version (uint16), number of player types
+            (uint16), number of slots (uint64), number of games (uint64)
+    counters: uint64 array [player type][slot][wins, draws, losses,
+              moves of cells 0-8]
+
+Usage:
+    python position_index.py build INDEX LOG [LOG ...]
+    python position_index.py losing INDEX PLAYER [--limit N]
+    python position_index.py forks INDEX PLAYER
+"""
+import argparse
+import os
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+from bitboard import (BASE3, BitBoard, CELL_MASKS, EMPTY_CELLS, IS_WIN,
+                      SYMMETRY_TABLES)
+from game_log import PLAYER_CODES, PLAYER_TYPES, read_games
+
+MAGIC = b'TTTP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHQQ')
+WINS, DRAWS, LOSSES, MOVES = 0, 1, 2, 3
+OUTCOMES = {'win': WINS, 'draw': DRAWS, 'loss': LOSSES}
+FIELDS = MOVES + 9
+
+
+@lru_cache(maxsize=None)
+def positions():
+    """Function to number the canonical positions where a player is to move.
+
+    Returns:
+        slots (dict): (slot, canonical cells) by x_mask | o_mask << 9 of
+                      every reachable not finished position, canonical
+                      cells tuple maps the position's cells to the
+                      canonical orientation.
+        boards (tuple): Canonical BitBoard of every slot.
+    """
+    slots, boards, canonical_slots = {}, [], {}
+    stack, seen = [(0, 0)], set()
+    while stack:
+        x_mask, o_mask = stack.pop()
+        key = x_mask | o_mask << 9
+        if key in seen or IS_WIN[x_mask] or IS_WIN[o_mask] \
+                or not EMPTY_CELLS[x_mask | o_mask]:
+            continue
+        seen.add(key)
+        masks = [(table[x_mask], table[o_mask]) for table in SYMMETRY_TABLES]
+        canonical = min(masks)
+        index = BASE3[canonical[0]] + 2 * BASE3[canonical[1]]
+        if index not in canonical_slots:
+            canonical_slots[index] = len(boards)
+            boards.append(BitBoard(*canonical))
+        # equal moves of symmetric positions get the lowest canonical cell
+        tables = [table for table, mask in zip(SYMMETRY_TABLES, masks)
+                  if mask == canonical]
+        cells = tuple(min(table[CELL_MASKS[cell]].bit_length() - 1
+                          for table in tables)
+                      for cell in range(9))
+        slots[key] = (canonical_slots[index], cells)
+        x_to_move = bin(x_mask).count('1') == bin(o_mask).count('1')
+        for cell in EMPTY_CELLS[x_mask | o_mask]:
+            if x_to_move:
+                stack.append((x_mask | CELL_MASKS[cell], o_mask))
+            else:
+                stack.append((x_mask, o_mask | CELL_MASKS[cell]))
+    return slots, tuple(boards)
+
+
+def winning_cells(own_mask, occupied):
+    """Function to list empty cells completing a line of own_mask."""
+    return [cell for cell in EMPTY_CELLS[occupied]
+            if IS_WIN[own_mask | CELL_MASKS[cell]]]
+
+
+def fork_cells(own_mask, opponents_mask):
+    """Function to list empty cells creating two winning cells at once."""
+    occupied = own_mask | opponents_mask
+    return [cell for cell in EMPTY_CELLS[occupied]
+            if len(winning_cells(own_mask | CELL_MASKS[cell],
+                                 occupied | CELL_MASKS[cell])) >= 2]
+
+
+class PositionIndex:
+    """Counters of outcomes and moves per player type and position.
+
+    Attributes:
+        player_types (tuple): Player types, see game_log.PLAYER_TYPES.
+        games (int): Number of indexed games.
+        skipped (int): Number of skipped games of other board sizes.
+        counters (array): uint64 counters, see the module description.
+    """
+
+    def __init__(self, counters=None, games=0):
+        """The constructor for PositionIndex class.
+        Params:
+            counters (array): Default = None, counters of a saved index,
+                              None means an empty index.
+            games (int): Default = 0, number of games of the counters.
+        """
+        self.player_types = PLAYER_TYPES
+        self.games = games
+        self.skipped = 0
+        size = len(PLAYER_TYPES) * len(positions()[1]) * FIELDS
+        if counters is None:
+            counters = array('Q', bytes(8 * size))
+        elif len(counters) < size:
+            # player types added after the index was saved
+            counters.extend(array('Q', bytes(8 * (size - len(counters)))))
+        self.counters = counters
+
+    def add_log(self, path):
+        """Method to count the games of a log file in one streaming pass.
+
+        Params: path (str): Path of the game log.
+
+        Returns: games (int): Number of indexed games of the file.
+        """
+        slots = positions()[0]
+        counters = self.counters
+        player_size = len(positions()[1]) * FIELDS
+        indexed = 0
+        for record in read_games(path):
+            if record.size != 3 or record.win_length != 3:
+                self.skipped += 1
+                continue
+            offsets = (PLAYER_CODES[record.player_1] * player_size,
+                       PLAYER_CODES[record.player_2] * player_size)
+            outcomes = (WINS, LOSSES) if record.winner == 'X' else \
+                (LOSSES, WINS) if record.winner == 'O' else (DRAWS, DRAWS)
+            x_mask = o_mask = 0
+            for ply, cell in enumerate(record.moves):
+                slot, cells = slots[x_mask | o_mask << 9]
+                mover = ply % 2
+                base = offsets[mover] + slot * FIELDS
+                counters[base + outcomes[mover]] += 1
+                counters[base + MOVES + cells[cell]] += 1
+                if mover == 0:
+                    x_mask |= CELL_MASKS[cell]
+                else:
+                    o_mask |= CELL_MASKS[cell]
+            indexed += 1
+        self.games += indexed
+        return indexed
+
+    def _fields(self, player, slot):
+        """Returns the counters of the player type's slot."""
+        start = (PLAYER_CODES[player] * len(positions()[1]) + slot) * FIELDS
+        return self.counters[start: start + FIELDS]
+
+    def position_stats(self, board, player):
+        """Method to read the statistics of one position.
+
+        Params:
+            board (BitBoard): Position, the player type is to move.
+            player (str): Player type, 'user' or bot level.
+
+        Returns: stats (dict): visits, wins, draws and losses of the player
+                 to move and moves - dict of counts by cell index in the
+                 canonical orientation, or None if the position is finished
+                 or unreachable.
+        """
+        found = positions()[0].get(board.x_mask | board.o_mask << 9)
+        if found is None:
+            return None
+        fields = self._fields(player, found[0])
+        return {
+            'visits': fields[WINS] + fields[DRAWS] + fields[LOSSES],
+            'wins': fields[WINS],
+            'draws': fields[DRAWS],
+            'losses': fields[LOSSES],
+            'moves': {cell: count
+                      for cell, count in enumerate(fields[MOVES:]) if count},
+        }
+
+    def most_common(self, player, outcome='loss', limit=10):
+        """Method to find positions the player type most often reached
+        with the given outcome.
+
+        Params:
+            player (str): Player type, 'user' or bot level.
+            outcome (str): Default = 'loss', 'win', 'draw' or 'loss'.
+            limit (int): Default = 10, number of positions.
+
+        Returns: positions (list): (board string in canonical orientation,
+                 outcome count, visits) tuples, the most common first.
+        """
+        field = OUTCOMES[outcome]
+        found = []
+        for slot, board in enumerate(positions()[1]):
+            fields = self._fields(player, slot)
+            if fields[field]:
+                found.append((board.to_string(), fields[field],
+                              fields[WINS] + fields[DRAWS] + fields[LOSSES]))
+        found.sort(key=lambda item: (-item[1], item[0]))
+        return found[:limit]
+
+    def fork_misses(self, player):
+        """Method to count moves that missed a fork. Only positions without
+        a winning or blocking move are counted, in them 'medium' bot moves
+        at random because Bot.get_winning_moves does not look for forks.
+
+        Params: player (str): Player type, 'user' or bot level.
+
+        Returns: stats (dict): positions - number of visited positions with
+                 a fork, moves - moves played in them, missed - moves not
+                 creating a fork.
+        """
+        stats = {'positions': 0, 'moves': 0, 'missed': 0}
+        for slot, board in enumerate(positions()[1]):
+            fields = self._fields(player, slot)
+            moves = fields[MOVES:]
+            if not any(moves):
+                continue
+            if board.sign_to_move() == 'X':
+                own, opponents = board.x_mask, board.o_mask
+            else:
+                own, opponents = board.o_mask, board.x_mask
+            occupied = own | opponents
+            if winning_cells(own, occupied) \
+                    or winning_cells(opponents, occupied):
+                continue
+            forks = fork_cells(own, opponents)
+            if not forks:
+                continue
+            played = sum(moves)
+            stats['positions'] += 1
+            stats['moves'] += played
+            stats['missed'] += played - sum(moves[cell] for cell in forks)
+        return stats
+
+    def save(self, path):
+        """Method to write the index file.
+
+        Params: path (str): Path of the created file.
+        """
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, len(self.player_types),
+                             len(positions()[1]), self.games)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as index_file:
+            index_file.write(header)
+            counters = self.counters
+            if sys.byteorder != 'little':
+                counters = array('Q', counters)
+                counters.byteswap()
+            counters.tofile(index_file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Class method to read the index file.
+
+        Raises: ValueError if the file is not an index of the current
+                format version.
+        """
+        with open(path, 'rb') as index_file:
+            header = index_file.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError(f'{path} is not a position index')
+            magic, version, player_count, slot_count, games = \
+                HEADER.unpack(header)
+            if (magic, version, slot_count) != (MAGIC, FORMAT_VERSION,
+                                                len(positions()[1])) \
+                    or player_count > len(PLAYER_TYPES):
+                raise ValueError(f'{path} is stale or not a position index')
+            counters = array('Q')
+            try:
+                counters.fromfile(index_file,
+                                  player_count * slot_count * FIELDS)
+            except EOFError:
+                raise ValueError(f'{path} is truncated') from None
+        if sys.byteorder != 'little':
+            counters.byteswap()
+        return cls(counters, games)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Build and query position statistics of game logs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='index game logs')
+    build.add_argument('index')
+    build.add_argument('logs', nargs='+')
+    losing = commands.add_parser('losing',
+                                 help='most common losing positions')
+    losing.add_argument('index')
+    losing.add_argument('player', choices=PLAYER_TYPES)
+    losing.add_argument('--limit', type=int, default=10)
+    forks = commands.add_parser('forks', help='missed forks')
+    forks.add_argument('index')
+    forks.add_argument('player', choices=PLAYER_TYPES)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        index = PositionIndex()
+        for path in args.logs:
+            index.add_log(path)
+        index.save(args.index)
+        print(f'{index.games} games indexed, {index.skipped} games of other '
+              f'board sizes skipped')
+        return 0
+    index = PositionIndex.load(args.index)
+    if args.command == 'losing':
+        for board_string, losses, visits in index.most_common(
+                args.player, 'loss', args.limit):
+            print(f'{board_string} {losses:>10} losses '
+                  f'of {visits:>10} visits')
+    else:
+        stats = index.fork_misses(args.player)
+        rate = stats['missed'] / stats['moves'] if stats['moves'] else 0.0
+        print(f'{stats["missed"]} of {stats["moves"]} moves in '
+              f'{stats["positions"]} positions with a fork missed it '
+              f'({rate:.1%})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
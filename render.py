@@ -0,0 +1,137 @@
+"""Renderers of the terminal game loop.
+
+A renderer collects the output of a game in a buffer and writes it to its
+stream at once, after every turn or after the whole game, instead of one
+unbuffered line after another. Backends:
+    full - the whole board after every move and a line per bot move,
+    diff - the whole board once, then only the changed cell of every move
+           as 'SIGN ROW COLUMN' (counted from 1 as in the user input),
+    silent - nothing, for headless games.
+"""
+import sys
+
+FLUSH_POLICIES = ('turn', 'game')
+
+
+class Renderer:
+    """Base renderer buffering the output of a game.
+
+    Attributes:
+        stream (file): Text stream written by flush.
+        flush_policy (str): 'turn' - flush after every turn, 'game' - flush
+                            after the game.
+        silent (bool): Class attribute - True if nothing is rendered, the
+                       game loop skips rendering altogether.
+    """
+    silent = False
+
+    def __init__(self, stream=None, flush_policy='turn'):
+        """The constructor for Renderer class.
+        Params:
+            stream (file): Default = None, output stream, None means
+                           sys.stdout.
+            flush_policy (str): Default = 'turn', 'turn' or 'game'.
+        """
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError(f'Unknown flush policy: {flush_policy}')
+        self.stream = sys.stdout if stream is None else stream
+        self.flush_policy = flush_policy
+        self._buffer = []
+
+    def write(self, text):
+        """Method to add text to the buffer."""
+        self._buffer.append(text)
+
+    def board(self, game_board):
+        """Method to render the board after a move."""
+        raise NotImplementedError
+
+    def bot_move(self, bot):
+        """Method to announce a bot's move before it is made."""
+
+    def end_turn(self):
+        """Method called after every turn, flushes for 'turn' policy."""
+        if self.flush_policy == 'turn':
+            self.flush()
+
+    def end_game(self):
+        """Method called after the game, flushes the rest of the buffer."""
+        self.flush()
+
+    def flush(self):
+        """Method to write the buffer to the stream in one write."""
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer.clear()
+            self.stream.flush()
+
+
+class FullRenderer(Renderer):
+    """Renderer of the whole board after every move."""
+
+    def board(self, game_board):
+        """Method to render the whole board."""
+        self._buffer.append(f'{game_board}\n')
+
+    def bot_move(self, bot):
+        """Method to write the bot's level line."""
+        self._buffer.append(f'Making move level "{bot.bot_level}"\n')
+
+
+class DiffRenderer(Renderer):
+    """Renderer of the whole board once and then just the changed cells."""
+
+    def __init__(self, stream=None, flush_policy='turn'):
+        super().__init__(stream, flush_policy)
+        self._game_board = None
+        self._shown = 0
+
+    def board(self, game_board):
+        """Method to render the moves made since the last call, the whole
+        board on the first call of the game."""
+        moves = game_board.moves
+        if game_board is not self._game_board:
+            self._game_board = game_board
+            self._shown = len(moves)
+            self._buffer.append(f'{game_board}\n')
+            return
+        board = game_board.board
+        size = game_board.size
+        for cell in moves[self._shown:]:
+            cord_x, cord_y = divmod(cell, size)
+            self._buffer.append(
+                f'{board[cord_x][cord_y]} {cord_x + 1} {cord_y + 1}\n')
+        self._shown = len(moves)
+
+
+class SilentRenderer(Renderer):
+    """Renderer discarding everything."""
+    silent = True
+
+    def write(self, text):
+        pass
+
+    def board(self, game_board):
+        pass
+
+    def flush(self):
+        pass
+
+
+RENDERERS = {'full': FullRenderer, 'diff': DiffRenderer,
+             'silent': SilentRenderer}
+
+
+def make_renderer(name='full', stream=None, flush_policy='turn'):
+    """Function to create renderer by backend name.
+
+    Params:
+        name (str): Default = 'full', 'full', 'diff' or 'silent'.
+        stream (file): Default = None, output stream, None means sys.stdout.
+        flush_policy (str): Default = 'turn', 'turn' or 'game'.
+
+    Returns: renderer (Renderer)
+    """
+    if name not in RENDERERS:
+        raise ValueError(f'Unknown renderer: {name}')
+    return RENDERERS[name](stream, flush_policy)
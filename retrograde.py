@@ -0,0 +1,358 @@
+"""Retrograde solver of N x N boards where K signs in a row win.
+
+The solver enumerates every reachable position once, going forward ply by
+ply from the empty board, and marks finished positions with the same rules
+as GameBoard: a sign completing a line of win_length cells wins, a full
+board without a win is a draw. Then it labels the positions backwards,
+from the last ply to the empty board, so every position is valued once from
+the already labelled positions after it. The work is linear in the number
+of positions and moves, no position is searched twice.
+
+Every position gets the outcome for the player to move (LOSS, DRAW or WIN,
+the codes of solution_table.py) and the distance to mate: the number of
+moves left until the end of the game when the winner wins as fast and the
+loser loses as slow as possible (for a draw the number of empty cells).
+Finished positions have distance 0.
+
+Positions are keyed by base 3 index, cell number 'i' (row * size + column)
+is digit number 'i' equal to 0 if the cell is empty, 1 for 'X', 2 for 'O',
+so 3 x 3 keys equal BitBoard.index. Every position takes a dict entry, the
+3 x 3 board has 5478 positions and the 4 x 4 boards millions, larger boards
+do not fit in memory.
+
+The solved graph is saved as a compact file (little endian):
+    header: magic b'TTTR', format version (uint16), size (uint16),
+            win_length (uint16), number of positions (uint64)
+    keys: uint64 array of base 3 indexes of all positions
+    values: uint8 array, distance to mate << 2 | outcome of every key
+
+Usage:
+    python retrograde.py solve [--size N] [--win-length K] [--output FILE]
+    python retrograde.py query BOARD [--win-length K] [--graph FILE]
+"""
+import argparse
+import os
+import struct
+import sys
+from array import array
+
+from game_board import winning_lines
+from solution_table import DRAW, LOSS, OUTCOMES, WIN
+
+MAGIC = b'TTTR'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHHQ')
+EMPTY, X, O = 0, 1, 2
+SIGN_CODES = {' ': EMPTY, '_': EMPTY, 'X': X, 'O': O}
+# placeholder of enumerated positions not labelled yet
+PENDING = 0
+
+
+def move_score(outcome, distance):
+    """Function to order the values for the player to move: wins first,
+    the fastest win first and the slowest loss first among losses.
+    """
+    if outcome == WIN:
+        return 1000 - distance
+    if outcome == LOSS:
+        return distance - 1000
+    return 0
+
+
+class RetrogradeSolver:
+    """Solved game graph of N x N board where K signs in a row win.
+
+    Attributes:
+        size (int): Number of board's rows and columns.
+        win_length (int): Number of signs in a row needed to win.
+        values (dict): distance << 2 | outcome by base 3 key of every
+                       reachable position, filled by solve.
+        layer_sizes (list): Number of positions after every ply.
+        edges (int): Number of moves between the positions.
+    """
+
+    def __init__(self, size=3, win_length=None):
+        """The constructor for RetrogradeSolver class.
+        Params:
+            size (int): Default = 3, number of board's rows and columns.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
+        """
+        self.size = size
+        self.win_length = win_length or size
+        if not 1 <= self.win_length <= size:
+            raise ValueError('win_length should be from 1 to board size')
+        self.values = {}
+        self.layer_sizes = []
+        self.edges = 0
+        cells_count = size * size
+        self._powers = tuple(3 ** cell for cell in range(cells_count))
+        lines = [[] for _ in range(cells_count)]
+        for line in winning_lines(size, self.win_length):
+            line_cells = tuple(x * size + y for x, y in line)
+            for cell in line_cells:
+                lines[cell].append(line_cells)
+        self._cell_lines = tuple(tuple(cell_lines) for cell_lines in lines)
+
+    def digits(self, key):
+        """Returns list of cell codes (EMPTY, X, O) of base 3 key."""
+        cells = []
+        for _ in self._powers:
+            key, digit = divmod(key, 3)
+            cells.append(digit)
+        return cells
+
+    def key(self, board):
+        """Method to compute base 3 key of a board.
+
+        Params: board (str/list): Board in '___X_O_XO' format or list of
+                rows of the solver's size.
+
+        Returns: key (int)
+        """
+        if isinstance(board, str):
+            cells = board
+        else:
+            cells = [cell for row in board for cell in row]
+        if len(cells) != len(self._powers):
+            raise ValueError(f'board should have {len(self._powers)} cells')
+        return sum(SIGN_CODES[cell] * power
+                   for cell, power in zip(cells, self._powers))
+
+    @staticmethod
+    def player_to_move(cells):
+        """Returns X or O, the code of the player to move, 'X' starts."""
+        return X if cells.count(X) == cells.count(O) else O
+
+    def solve(self):
+        """Method to enumerate and label every reachable position.
+
+        Returns: self (RetrogradeSolver)
+        """
+        powers = self._powers
+        cell_lines = self._cell_lines
+        cells_count = len(powers)
+        values = {0: PENDING}
+        layers = []
+        layer = [0]
+        ply = edges = 0
+        # forward: enumerate positions, finished ones are labelled at once
+        while layer:
+            layers.append(array('Q', layer))
+            sign = X if ply % 2 == 0 else O
+            next_layer = []
+            for key in layer:
+                cells = self.digits(key)
+                for cell in range(cells_count):
+                    if cells[cell] != EMPTY:
+                        continue
+                    edges += 1
+                    child = key + sign * powers[cell]
+                    if child in values:
+                        continue
+                    cells[cell] = sign
+                    if any(all(cells[other] == sign for other in line)
+                           for line in cell_lines[cell]):
+                        # the player to move lost
+                        values[child] = LOSS
+                    elif ply + 1 == cells_count:
+                        values[child] = DRAW
+                    else:
+                        values[child] = PENDING
+                        next_layer.append(child)
+                    cells[cell] = EMPTY
+            layer = next_layer
+            ply += 1
+        self.layer_sizes = [0] * (ply + 1)
+        for key, value in values.items():
+            cells = self.digits(key)
+            self.layer_sizes[cells_count - cells.count(EMPTY)] += 1
+
+        # backward: label every position from the positions after it
+        for ply in range(len(layers) - 1, -1, -1):
+            sign = X if ply % 2 == 0 else O
+            for key in layers[ply]:
+                cells = self.digits(key)
+                best_score, best_value = None, PENDING
+                for cell in range(cells_count):
+                    if cells[cell] != EMPTY:
+                        continue
+                    child = values[key + sign * powers[cell]]
+                    # the outcome of the opponent reversed
+                    outcome, distance = 4 - (child & 3), (child >> 2) + 1
+                    score = move_score(outcome, distance)
+                    if best_score is None or score > best_score:
+                        best_score = score
+                        best_value = distance << 2 | outcome
+                values[key] = best_value
+        self.values = values
+        self.edges = edges
+        return self
+
+    def lookup(self, board):
+        """Method to read the value of a position.
+
+        Params: board (str/list): Board, see key method.
+
+        Returns: None if the position is unreachable, else (outcome,
+                 distance) tuple where outcome is LOSS, DRAW or WIN for the
+                 player to move and distance is the number of moves left,
+                 0 if the game is finished.
+        """
+        value = self.values.get(self.key(board))
+        if value is None:
+            return None
+        return value & 3, value >> 2
+
+    def moves(self, board):
+        """Method to value every move of a position.
+
+        Params: board (str/list): Board, see key method.
+
+        Returns: moves (list): ((X,Y), outcome, distance) tuples of every
+                 move, outcome and distance for the player making the move,
+                 empty list if the position is finished or unreachable.
+        """
+        key = self.key(board)
+        value = self.values.get(key)
+        if value is None or value >> 2 == 0:
+            return []
+        cells = self.digits(key)
+        sign = self.player_to_move(cells)
+        moves = []
+        for cell, code in enumerate(cells):
+            if code == EMPTY:
+                child = self.values[key + sign * self._powers[cell]]
+                moves.append((divmod(cell, self.size), 4 - (child & 3),
+                              (child >> 2) + 1))
+        return moves
+
+    def best_moves(self, board):
+        """Method to find the moves keeping the position's value.
+
+        Params: board (str/list): Board, see key method.
+
+        Returns: moves (list): (X,Y) coordinates of the moves reaching the
+                 best outcome in the best number of moves.
+        """
+        solved = self.lookup(board)
+        if solved is None:
+            return []
+        return [cords for cords, outcome, distance in self.moves(board)
+                if (outcome, distance) == solved]
+
+    def stats(self):
+        """Method to count the solved positions.
+
+        Returns: stats (dict): positions, finished positions, moves,
+                 positions by outcome for the player to move and the
+                 outcome and distance of the empty board.
+        """
+        outcomes = {name: 0 for name in OUTCOMES.values()}
+        finished = 0
+        for value in self.values.values():
+            outcomes[OUTCOMES[value & 3]] += 1
+            finished += value >> 2 == 0
+        root = self.values[0]
+        return {
+            'size': self.size,
+            'win_length': self.win_length,
+            'positions': len(self.values),
+            'finished': finished,
+            'moves': self.edges,
+            'positions_by_ply': self.layer_sizes,
+            'outcomes': outcomes,
+            'root': {'outcome': OUTCOMES[root & 3], 'distance': root >> 2},
+        }
+
+    def save(self, path):
+        """Method to write the solved graph file.
+
+        Params: path (str): Path of the created file.
+        """
+        keys = array('Q', self.values.keys())
+        values = bytes(self.values.values())
+        if sys.byteorder != 'little':
+            keys.byteswap()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as graph_file:
+            graph_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.size,
+                                         self.win_length, len(keys)))
+            keys.tofile(graph_file)
+            graph_file.write(values)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Class method to read the solved graph file.
+
+        Raises: ValueError if the file is not a graph of the current format
+                version.
+        """
+        with open(path, 'rb') as graph_file:
+            header = graph_file.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError(f'{path} is not a solved game graph')
+            magic, version, size, win_length, count = HEADER.unpack(header)
+            if (magic, version) != (MAGIC, FORMAT_VERSION):
+                raise ValueError(f'{path} is stale or not a solved game '
+                                 f'graph')
+            keys = array('Q')
+            try:
+                keys.fromfile(graph_file, count)
+            except EOFError:
+                raise ValueError(f'{path} is truncated') from None
+            values = graph_file.read(count)
+            if len(values) != count:
+                raise ValueError(f'{path} is truncated')
+        if sys.byteorder != 'little':
+            keys.byteswap()
+        solver = cls(size, win_length)
+        solver.values = dict(zip(keys, values))
+        solver.edges = None
+        solver.layer_sizes = None
+        return solver
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Solve N x N boards by retrograde analysis.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    solve = commands.add_parser('solve', help='solve and count positions')
+    solve.add_argument('--size', type=int, default=3)
+    solve.add_argument('--win-length', type=int, default=None)
+    solve.add_argument('--output', help='save the solved graph to the file')
+    query = commands.add_parser('query', help='value a position')
+    query.add_argument('board', help="board in '___X_O_XO' format")
+    query.add_argument('--win-length', type=int, default=None)
+    query.add_argument('--graph', help='saved graph, solved if not given')
+    args = parser.parse_args(argv)
+
+    if args.command == 'solve':
+        solver = RetrogradeSolver(args.size, args.win_length).solve()
+        for key, value in solver.stats().items():
+            print(f'{key}: {value}')
+        if args.output:
+            solver.save(args.output)
+        return 0
+    size = int(len(args.board) ** 0.5)
+    if args.graph:
+        solver = RetrogradeSolver.load(args.graph)
+        if solver.size != size:
+            parser.error(f'the graph is solved for {solver.size} x '
+                         f'{solver.size} boards')
+    else:
+        solver = RetrogradeSolver(size, args.win_length).solve()
+    solved = solver.lookup(args.board)
+    if solved is None:
+        print(f'{args.board} is not reachable')
+        return 1
+    print(f'{OUTCOMES[solved[0]]} in {solved[1]} moves for the player '
+          f'to move')
+    for (cord_x, cord_y), outcome, distance in solver.moves(args.board):
+        print(f'{cord_x} {cord_y}: {OUTCOMES[outcome]} in {distance}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Seeded random streams of games and bots.
+
+Every game has a seed and every bot of the game draws from its own
+generator seeded from the game's seed and the bot's sign, so a game does
+not share random state with other games of the process and can be
+replayed from its seed alone, whichever thread, process or server session
+played it. Seeds of many games are derived from a master seed and the
+game number:
+
+    game_seed = derive_seed(master_seed, game_number)
+    bot_seed = player_seed(game_seed, 'X')
+
+Seeds are 63 bit numbers, so they fit the int64 seed field of game logs.
+Seeds not given are drawn from the module level generator of random, so
+random.seed still makes a whole run reproducible.
+"""
+import random
+
+MASK_64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+# 2 ** -53, scales 53 random bits to a float in [0, 1)
+FLOAT_UNIT = 1.0 / (1 << 53)
+# substream numbers of the players of a game
+PLAYER_STREAMS = {'X': 1, 'O': 2}
+
+
+def mix(value):
+    """Function scrambling 64 bit number (SplitMix64 finalizer)."""
+    value = (value ^ value >> 30) * 0xBF58476D1CE4E5B9 & MASK_64
+    value = (value ^ value >> 27) * 0x94D049BB133111EB & MASK_64
+    return value ^ value >> 31
+
+
+def derive_seed(seed, *keys):
+    """Function to derive seed of a substream, e.g. of one game.
+    The same seed and keys give the same result in every process.
+
+    Params:
+        seed (int): Master seed.
+        keys (int): Substream numbers, e.g. the game number.
+
+    Returns: seed (int): 63 bit seed.
+    """
+    value = seed & MASK_64
+    for key in keys:
+        value = mix((value + GOLDEN_GAMMA * (key + 1)) & MASK_64)
+    return value >> 1
+
+
+def new_seed():
+    """Returns 63 bit seed drawn from the module level generator."""
+    return random.getrandbits(63)
+
+
+def player_seed(game_seed, sign):
+    """Returns seed of the player's generator derived from game's seed."""
+    return derive_seed(game_seed, PLAYER_STREAMS[sign])
+
+
+class RandomStream(random.Random):
+    """SplitMix64 random generator of one bot.
+
+    Seeding Mersenne Twister of random.Random takes about 10 microseconds,
+    as long as a whole easy bot game, the SplitMix64 state is a single 64
+    bit number, so a generator per bot and game costs nothing to seed and
+    its state is cheap to send to a worker process. All the methods of
+    random.Random work on top of random and getrandbits, long runs of
+    draws (e.g. mcts rollouts) should seed a Mersenne Twister substream
+    once instead, see substream.
+    """
+
+    def seed(self, a=None, version=2):
+        """Method to start the stream, None means a seed from random."""
+        self._state = (new_seed() if a is None else a) & MASK_64
+        self.gauss_next = None
+
+    def getstate(self):
+        """Returns state of the generator, a 64 bit number."""
+        return self._state
+
+    def setstate(self, state):
+        """Method to restore state returned by getstate."""
+        self._state = state
+
+    def next64(self):
+        """Returns the next random 64 bit number."""
+        state = self._state = (self._state + GOLDEN_GAMMA) & MASK_64
+        return mix(state)
+
+    def random(self):
+        """Returns the next random float in [0, 1)."""
+        state = self._state = (self._state + GOLDEN_GAMMA) & MASK_64
+        value = (state ^ state >> 30) * 0xBF58476D1CE4E5B9 & MASK_64
+        value = (value ^ value >> 27) * 0x94D049BB133111EB & MASK_64
+        return ((value ^ value >> 31) >> 11) * FLOAT_UNIT
+
+    def getrandbits(self, k):
+        """Returns non negative number of k random bits."""
+        bits = count = 0
+        while count < k:
+            bits = bits << 64 | self.next64()
+            count += 64
+        return bits >> (count - k)
+
+    def pick(self, seq):
+        """Returns random element of non empty sequence, faster than
+        choice for the short move lists of the bots: the index is the high
+        part of 64 random bits times the length (bias below 2 ** -58).
+        """
+        state = self._state = (self._state + GOLDEN_GAMMA) & MASK_64
+        value = (state ^ state >> 30) * 0xBF58476D1CE4E5B9 & MASK_64
+        value = (value ^ value >> 27) * 0x94D049BB133111EB & MASK_64
+        return seq[(value ^ value >> 31) * len(seq) >> 64]
+
+    def below(self, count):
+        """Returns random integer from 0 to count - 1, drawn as the index
+        of pick, so pick(seq) and seq[below(len(seq))] give the same item.
+        """
+        state = self._state = (self._state + GOLDEN_GAMMA) & MASK_64
+        value = (state ^ state >> 30) * 0xBF58476D1CE4E5B9 & MASK_64
+        value = (value ^ value >> 27) * 0x94D049BB133111EB & MASK_64
+        return (value ^ value >> 31) * count >> 64
+
+    def substream(self):
+        """Returns Mersenne Twister generator seeded from the stream."""
+        return random.Random(self.next64())
@@ -0,0 +1,272 @@
+"""Search state with in place make/unmake moves for the search hot path.
+
+SearchState keeps the board as a list of cell values and numbers of each
+player's signs in every winning line. Moves are made and taken back in
+place, so after the state is created the search does not
+allocate any objects per visited position. The empty cells are kept in a
+preallocated array updated by make and unmake (swap with the last empty
+cell, undone in reverse), so the search loops visit only empty cells. The
+search loops use while loops over precomputed tuples and lists because
+for loops create iterator objects.
+"""
+from functools import lru_cache
+
+from game_board import winning_lines
+
+EMPTY, X, O = 0, 1, 2
+SIGN_CODES = {' ': EMPTY, 'X': X, 'O': O}
+SIGNS = {X: 'X', O: 'O'}
+
+
+@lru_cache(maxsize=None)
+def _cell_lines(size, win_length):
+    """Creates tuple of winning lines numbers of every cell, built once
+    per board size and win length."""
+    cell_lines = [[] for _ in range(size * size)]
+    for line_no, line in enumerate(winning_lines(size, win_length)):
+        for cord_x, cord_y in line:
+            cell_lines[cord_x * size + cord_y].append(line_no)
+    return tuple(tuple(lines) for lines in cell_lines)
+
+
+@lru_cache(maxsize=None)
+def _move_order(size):
+    """Creates tuple of cells sorted from the center to the edges."""
+    center = (size - 1) / 2
+    return tuple(sorted(range(size * size),
+                        key=lambda cell: (abs(cell // size - center)
+                                          + abs(cell % size - center),
+                                          cell)))
+
+
+class SearchState:
+    """Mutable board state for make/unmake searches.
+
+    Attributes:
+        size (int): Number of board's rows and columns.
+        win_length (int): Number of signs in a row needed to win.
+        cells (list): Cell values EMPTY, X or O, index is row * size + column.
+        counts (list): [None, X counts, O counts] - number of the player's
+                       signs in every winning line.
+        winner (int): X or O if the last move won, else EMPTY.
+        move_count (int): Number of signs on the board.
+        empty (list): Empty cells first, then the made moves, the first
+                      size * size - move_count items are the empty cells,
+                      starting in center to edges order.
+        count_nodes (bool): Defines if the searches count visited positions.
+        nodes (int): Number of positions visited by the searches.
+    """
+    __slots__ = ('size', 'win_length', 'cells', 'counts', 'winner',
+                 'move_count', 'count_nodes', 'nodes', 'empty',
+                 '_cell_lines', '_empty_index', '_history')
+
+    def __init__(self, size=3, win_length=None, count_nodes=False):
+        """The constructor for SearchState class.
+        Params:
+            size (int): Default = 3, number of board's rows and columns.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
+            count_nodes (bool): Default = False, count visited positions.
+                                Integers above 256 are new objects, so
+                                counting allocates once the count gets big.
+        """
+        self.size = size
+        self.win_length = win_length or size
+        cells_count = size * size
+        self.cells = [EMPTY] * cells_count
+        lines_count = len(winning_lines(size, self.win_length))
+        self.counts = [None, [0] * lines_count, [0] * lines_count]
+        self.winner = EMPTY
+        self.move_count = 0
+        self.count_nodes = count_nodes
+        self.nodes = 0
+        self._cell_lines = _cell_lines(size, self.win_length)
+        self.empty = list(_move_order(size))
+        # position of every cell in empty, kept for made moves so unmake
+        # can put the cell back
+        self._empty_index = [0] * cells_count
+        for index, cell in enumerate(self.empty):
+            self._empty_index[cell] = index
+        # made moves, preallocated so make/unmake only assign items
+        self._history = [0] * cells_count
+
+    @classmethod
+    def from_rows(cls, board, win_length=None, count_nodes=False):
+        """Class method to create SearchState from list of rows.
+        The rows are only read, the state never changes the given board.
+        """
+        state = cls(len(board), win_length, count_nodes)
+        state.set_rows(board)
+        return state
+
+    def set_rows(self, board):
+        """Method to reset the state in place to the position of list of
+        rows, so one state serves many positions without allocations.
+
+        Params: board (list): TicTacToe game board list of rows of the
+                state's size, only read.
+
+        Raises: ValueError if the board size differs from the state's.
+        """
+        size = self.size
+        if len(board) != size:
+            raise ValueError(f'board should have {size} rows')
+        # taking back the moves of the previous position empties the board
+        # and zeroes the line counters
+        while self.move_count:
+            self.unmake()
+        cells, empty, empty_index = self.cells, self.empty, self._empty_index
+        order = _move_order(size)
+        cells_count = size * size
+        cord_x = 0
+        while cord_x < size:
+            row = board[cord_x]
+            cord_y = 0
+            while cord_y < size:
+                if row[cord_y] != ' ':
+                    self.make(cord_x * size + cord_y, SIGN_CODES[row[cord_y]])
+                cord_y += 1
+            cord_x += 1
+        # the moves reordered the empty cells, searches try them from the
+        # center to the edges
+        index = empty_count = 0
+        while index < cells_count:
+            cell = order[index]
+            if cells[cell] == EMPTY:
+                empty[empty_count] = cell
+                empty_index[cell] = empty_count
+                empty_count += 1
+            index += 1
+
+    def make(self, cell, player):
+        """Method to put player's sign (X or O) into the cell."""
+        self.cells[cell] = player
+        self._history[self.move_count] = cell
+        self.move_count += 1
+        # swap the cell with the last empty cell
+        empty, empty_index = self.empty, self._empty_index
+        last = len(empty) - self.move_count
+        index = empty_index[cell]
+        moved = empty[last]
+        empty[index] = moved
+        empty_index[moved] = index
+        empty[last] = cell
+        counts = self.counts[player]
+        lines = self._cell_lines[cell]
+        index, lines_count = 0, len(lines)
+        while index < lines_count:
+            line = lines[index]
+            counts[line] += 1
+            if counts[line] == self.win_length:
+                self.winner = player
+            index += 1
+
+    def unmake(self):
+        """Method to take back the last made move."""
+        self.move_count -= 1
+        cell = self._history[self.move_count]
+        player = self.cells[cell]
+        self.cells[cell] = EMPTY
+        # reverse swap of make, the empty cells get their order back
+        empty, empty_index = self.empty, self._empty_index
+        last = len(empty) - self.move_count - 1
+        index = empty_index[cell]
+        moved = empty[index]
+        empty[last] = moved
+        empty_index[moved] = last
+        empty[index] = cell
+        # only the last move of a game could win
+        self.winner = EMPTY
+        counts = self.counts[player]
+        lines = self._cell_lines[cell]
+        index, lines_count = 0, len(lines)
+        while index < lines_count:
+            counts[lines[index]] -= 1
+            index += 1
+
+    def wins_with(self, cell, player):
+        """Method to check if player's sign in the empty cell would win."""
+        counts = self.counts[player]
+        lines = self._cell_lines[cell]
+        needed = self.win_length - 1
+        index, lines_count = 0, len(lines)
+        while index < lines_count:
+            if counts[lines[index]] == needed:
+                return True
+            index += 1
+        return False
+
+    def negamax(self, player, alpha, beta):
+        """Recursive negamax with alpha-beta pruning.
+        Scores are the Bot.alphabeta scores shifted up by size * size + 1,
+        so they stay in 0..2 * (size * size + 1) and the negated score is
+        2 * (size * size + 1) - score. CPython caches integers from -5 to
+        256, so on boards up to 11 x 11 no score is a new object.
+
+        Params:
+            player (int): X or O, the player to move.
+            alpha (int): The shifted score the player to move is already
+                         assured of.
+            beta (int): The shifted score the opponent is already assured of.
+
+        Returns: score (int): Shifted score of the position for the player
+                 to move.
+        """
+        if self.count_nodes:
+            self.nodes += 1
+        cells_count = self.size * self.size
+        if self.winner != EMPTY:
+            # the opponent has won, sooner losses score lower
+            return self.move_count
+        if self.move_count == cells_count:
+            return cells_count + 1
+        empty = self.empty
+        empty_count = cells_count - self.move_count
+        # a winning move is the best possible move
+        index = 0
+        while index < empty_count:
+            if self.wins_with(empty[index], player):
+                return 2 * cells_count + 1 - self.move_count
+            index += 1
+
+        opponent = 3 - player
+        top = 2 * cells_count + 2
+        best = -1
+        index = 0
+        while index < empty_count:
+            cell = empty[index]
+            index += 1
+            self.make(cell, player)
+            score = top - self.negamax(opponent, top - beta, top - alpha)
+            self.unmake()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def best_move(self, player):
+        """Method to find the best move of the player to move.
+
+        Params: player (int): X or O.
+
+        Returns:
+            best (list): list of [cord_x, cord_y, score] for the best move
+                         possible, score is positive if the player wins.
+        """
+        shift = self.size * self.size + 1
+        top = 2 * shift
+        best = [-1, -1, -1]
+        alpha, beta = -1, top + 1
+        # iterated over a copy, the made moves follow the empty cells
+        for cell in self.empty[:self.size * self.size - self.move_count]:
+            self.make(cell, player)
+            score = top - self.negamax(3 - player, top - beta, top - alpha)
+            self.unmake()
+            if score > best[2]:
+                best = [*divmod(cell, self.size), score]
+                alpha = max(alpha, score)
+        best[2] -= shift
+        return best
@@ -0,0 +1,390 @@
+"""Asyncio game server hosting many concurrent TicTacToe sessions.
+
+Usage:
+    python main.py serve [--host HOST] [--port PORT | --unix PATH]
+                         [--executor process|thread] [--workers W]
+                         [--max-sessions S] [--max-pending P]
+                         [--session-timeout T] [--move-timeout T]
+                         [--seed S]
+
+Line based protocol, one command per line, one reply line per command:
+    NEW PLAYER_1 PLAYER_2 [N [K]] -> STATE ID BOARD STATUS
+    MOVE ID ROW COLUMN            -> STATE ID BOARD STATUS
+    SHOW ID                       -> STATE ID BOARD STATUS
+    SEED ID                       -> SEED ID GAME_SEED
+    QUIT ID                       -> BYE ID
+    errors                        -> ERR MESSAGE
+Players are 'user' or bot levels, ROW and COLUMN are counted from 1 as in
+the command line game. BOARD is in '___X_O_XO' format and STATUS is
+'TURN X', 'TURN O', 'WIN X', 'WIN O' or 'DRAW'. Bot moves are made right
+after NEW and MOVE, until a user is to move or the game is finished. A
+bot move taking longer than the move timeout closes the session.
+Sessions belong to the connection that created them. Session number N
+plays with game seed rng.derive_seed(S, N), the bots' random state travels
+with the session to the worker making the move, so bot versus bot games
+are played the same way as play_game(..., seed=GAME_SEED).
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from main import TicTacToe, check_game
+from player import Bot
+from rng import derive_seed, new_seed
+
+EXECUTORS = ('process', 'thread')
+PLAYERS = Bot.LEVELS + ('user',)
+MAX_LINE = 1024
+
+_worker_state = threading.local()
+
+
+def compute_bot_move(bot_level, sign, win_length, board, rng_state):
+    """Function computing bot move in an executor worker.
+    Bots are cached per worker thread or process, so the transposition
+    table and solution table are shared by all sessions of the worker.
+    The random state belongs to the session's bot, it is loaded into the
+    cached bot before the move and returned after it.
+
+    Params:
+        bot_level (str): Bot difficulty level.
+        sign (str): Bot's sign X or O.
+        win_length (int): Number of signs in a row needed to win or None.
+        board (list): TicTacToe game board list of rows.
+        rng_state (tuple): State of the session bot's random generator.
+
+    Returns: move (tuple): (X,Y) coordinates and the random generator's
+             state (tuple) after the move.
+    """
+    bots = getattr(_worker_state, 'bots', None)
+    if bots is None:
+        bots = _worker_state.bots = {}
+    key = (bot_level, sign, win_length)
+    bot = bots.get(key)
+    if bot is None:
+        bot = bots[key] = Bot(bot_level, verbose=False, sign=sign,
+                              win_length=win_length)
+    bot.rng.setstate(rng_state)
+    return tuple(bot.get_cords(board)), bot.rng.getstate()
+
+
+class ProtocolError(Exception):
+    """Raised for invalid client commands, the message is sent to client."""
+
+
+class Session:
+    """One game hosted by the server.
+
+    Attributes:
+        session_id (int): Session number.
+        game (TicTacToe): Headless game.
+        finished (bool): True if the game is finished.
+        winner (str/None): Winner of the finished game.
+        last_active (float): Event loop time of the last command.
+    """
+
+    def __init__(self, session_id, game, now):
+        self.session_id = session_id
+        self.game = game
+        self.finished = False
+        self.winner = None
+        self.last_active = now
+
+    def play(self, cord_x, cord_y):
+        """Method to put current player's sign into the board."""
+        game = self.game
+        game.game_board.input_to_board(cord_x, cord_y,
+                                       game.current_player.sign)
+        game.change_current_player()
+        self.finished, self.winner = game.game_board.is_board_finished()
+
+    def state(self):
+        """Returns STATE reply line of the session."""
+        if not self.finished:
+            status = f'TURN {self.game.current_player.sign}'
+        elif self.winner is None:
+            status = 'DRAW'
+        else:
+            status = f'WIN {self.winner}'
+        board = self.game.game_board.get_board(string_format=True)
+        return f'STATE {self.session_id} {board} {status}'
+
+
+class GameServer:
+    """Asyncio server of TicTacToe sessions with a bounded bot worker pool.
+
+    Attributes:
+        max_sessions (int): Maximal number of sessions of all connections.
+        session_timeout (float): Seconds after which idle session is closed.
+        move_timeout (float): Seconds allowed for one bot move.
+        sessions (dict): Hosted sessions by their numbers.
+        seed (int): Master seed of the sessions' game seeds.
+    """
+
+    def __init__(self, executor='process', workers=None, max_sessions=10000,
+                 max_pending=None, session_timeout=300.0, move_timeout=10.0,
+                 seed=None):
+        """The constructor for GameServer class.
+        Params:
+            executor (str): Default = 'process', bot moves executor
+                            'process' or 'thread'.
+            workers (int): Default = None, number of executor workers, None
+                           means the number of processors.
+            max_sessions (int): Default = 10000, sessions limit.
+            max_pending (int): Default = None, maximal number of bot moves
+                               submitted to the executor at once, None means
+                               twice the number of workers.
+            session_timeout (float): Default = 300, idle session timeout.
+            move_timeout (float): Default = 10, bot move timeout.
+            seed (int): Default = None, master seed, None means a seed
+                        drawn from random.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f'Unknown executor: {executor}')
+        workers = workers or os.cpu_count() or 1
+        pool_class = ProcessPoolExecutor if executor == 'process' \
+            else ThreadPoolExecutor
+        self.executor = pool_class(workers)
+        self.max_sessions = max_sessions
+        self.session_timeout = session_timeout
+        self.move_timeout = move_timeout
+        self.sessions = {}
+        self.seed = new_seed() if seed is None else seed
+        # commands waiting for a free slot are not read further, so slow
+        # bot pool pushes back on the clients
+        self._pending = asyncio.Semaphore(max_pending or 2 * workers)
+        self._ids = itertools.count(1)
+        self._server = None
+        self._reaper = None
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        """Method to start listening on TCP or Unix socket."""
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(
+                self.handle_connection, path=unix_path, limit=MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(
+                self.handle_connection, host, port, limit=MAX_LINE)
+        self._reaper = asyncio.create_task(self.reap_sessions())
+        return self._server
+
+    async def serve_forever(self):
+        """Method to serve until cancelled."""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Method to stop the server and the executor."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def reap_sessions(self):
+        """Task closing sessions idle longer than session_timeout."""
+        loop = asyncio.get_running_loop()
+        interval = min(self.session_timeout / 2, 5.0)
+        while True:
+            await asyncio.sleep(interval)
+            deadline = loop.time() - self.session_timeout
+            for session_id, session in list(self.sessions.items()):
+                if session.last_active < deadline:
+                    del self.sessions[session_id]
+
+    async def handle_connection(self, reader, writer):
+        """Method serving one client connection."""
+        owned = set()
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(),
+                                                  self.session_timeout)
+                except (asyncio.TimeoutError, ValueError):
+                    break
+                if not line:
+                    break
+                try:
+                    reply = await self.handle_command(line.decode().split(),
+                                                      owned)
+                except UnicodeDecodeError:
+                    reply = 'ERR command is not valid UTF-8'
+                except ProtocolError as error:
+                    reply = f'ERR {error}'
+                writer.write(reply.encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            writer.close()
+
+    async def handle_command(self, command, owned):
+        """Method executing one command.
+
+        Params:
+            command (list): Command words.
+            owned (set): Numbers of sessions of the connection.
+
+        Returns: reply (str): Reply line.
+        """
+        if not command:
+            raise ProtocolError('empty command')
+        name, args = command[0].upper(), command[1:]
+        if name == 'NEW':
+            session = self.new_session(args)
+            owned.add(session.session_id)
+            await self.play_bots(session)
+            return session.state()
+        session = self.get_session(args, owned)
+        if name == 'SHOW' and len(args) == 1:
+            return session.state()
+        if name == 'SEED' and len(args) == 1:
+            return f'SEED {session.session_id} {session.game.seed}'
+        if name == 'QUIT' and len(args) == 1:
+            owned.discard(session.session_id)
+            del self.sessions[session.session_id]
+            return f'BYE {session.session_id}'
+        if name == 'MOVE' and len(args) == 3:
+            self.play_user(session, args[1:])
+            await self.play_bots(session)
+            return session.state()
+        raise ProtocolError('unknown command')
+
+    def new_session(self, args):
+        """Method to create session from NEW command arguments."""
+        if len(args) not in (2, 3, 4) or args[0] not in PLAYERS \
+                or args[1] not in PLAYERS \
+                or not all(value.isdigit() for value in args[2:]):
+            raise ProtocolError('usage: NEW PLAYER_1 PLAYER_2 [N [K]]')
+        if len(self.sessions) >= self.max_sessions:
+            raise ProtocolError('server full')
+        size = int(args[2]) if len(args) > 2 else 3
+        win_length = int(args[3]) if len(args) > 3 else None
+        try:
+            check_game(args[0], args[1], size, win_length)
+        except ValueError as error:
+            raise ProtocolError(f'invalid board size: {error}') from None
+        session_id = next(self._ids)
+        game = TicTacToe(args[0], args[1], render=False, size=size,
+                         win_length=win_length,
+                         seed=derive_seed(self.seed, session_id))
+        session = Session(session_id, game,
+                          asyncio.get_running_loop().time())
+        self.sessions[session.session_id] = session
+        return session
+
+    def get_session(self, args, owned):
+        """Method to find the connection's session of the command."""
+        if not args or not args[0].isdigit():
+            raise ProtocolError('session number expected')
+        session_id = int(args[0])
+        session = self.sessions.get(session_id)
+        if session is None or session_id not in owned:
+            raise ProtocolError(f'unknown session {session_id}')
+        session.last_active = asyncio.get_running_loop().time()
+        return session
+
+    @staticmethod
+    def play_user(session, args):
+        """Method making user's move from MOVE command arguments."""
+        if session.finished:
+            raise ProtocolError('game is finished')
+        if session.game.current_player.is_bot:
+            raise ProtocolError('not your turn')
+        try:
+            cord_x, cord_y = int(args[0]) - 1, int(args[1]) - 1
+        except ValueError:
+            raise ProtocolError('You should enter numbers!') from None
+        if (cord_x, cord_y) not in session.game.game_board.empty_cells:
+            raise ProtocolError('invalid move')
+        session.play(cord_x, cord_y)
+
+    async def play_bots(self, session):
+        """Method making bot moves until a user is to move or the game
+        is finished. Searches run in the executor. A move not made within
+        move_timeout closes the session.
+        """
+        loop = asyncio.get_running_loop()
+        while not session.finished and session.game.current_player.is_bot:
+            player = session.game.current_player
+            board = [row.copy() for row in session.game.game_board.board]
+            await self._pending.acquire()
+            job = self.executor.submit(
+                compute_bot_move, player.bot_level, player.sign,
+                player.win_length, board, player.rng.getstate())
+            # a timed out job keeps its worker busy, so its slot is
+            # released only when the job ends
+            job.add_done_callback(
+                lambda _job: self._release_pending(loop))
+            try:
+                move, rng_state = await asyncio.wait_for(
+                    asyncio.wrap_future(job), self.move_timeout)
+            except asyncio.TimeoutError:
+                self.sessions.pop(session.session_id, None)
+                raise ProtocolError(f'bot move timeout, session '
+                                    f'{session.session_id} closed') from None
+            if session.session_id not in self.sessions:
+                raise ProtocolError(f'unknown session {session.session_id}')
+            player.rng.setstate(rng_state)
+            session.play(*move)
+
+    def _release_pending(self, loop):
+        """Method to free an executor slot from any thread."""
+        try:
+            loop.call_soon_threadsafe(self._pending.release)
+        except RuntimeError:
+            # the event loop is closed, nobody waits for the slot
+            pass
+
+
+def build_parser():
+    """Function to create serve subcommand arguments parser."""
+    parser = argparse.ArgumentParser(
+        prog='main.py serve',
+        description='Host TicTacToe sessions over a line based protocol.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on Unix socket path instead')
+    parser.add_argument('--executor', choices=EXECUTORS, default='process')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-sessions', type=int, default=10000)
+    parser.add_argument('--max-pending', type=int, default=None)
+    parser.add_argument('--session-timeout', type=float, default=300.0)
+    parser.add_argument('--move-timeout', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=None,
+                        help='master seed of the games')
+    return parser
+
+
+async def serve(args):
+    """Coroutine running the server until cancelled."""
+    server = GameServer(args.executor, args.workers, args.max_sessions,
+                        args.max_pending, args.session_timeout,
+                        args.move_timeout, args.seed)
+    await server.start(args.host, args.port, args.unix)
+    address = args.unix or f'{args.host}:{args.port}'
+    print(f'Serving on {address}')
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    """The function running serve subcommand."""
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""Headless bot versus bot simulation.
+
+Usage:
+    python main.py simulate PLAYER_1 PLAYER_2 [--games N] [--seed S]
+                            [--size N] [--win-length K] [--output FILE]
+                            [--metrics FILE] [--metrics-format FORMAT]
+                            [--profile-dir DIR] [--log FILE]
+
+The report is printed (or written to FILE) as JSON. --metrics writes
+instrumentation of the games (see metrics.py) as JSON or Prometheus text,
+--profile-dir writes cProfile stats of every game and --log appends every
+game to a binary game log (see game_log.py).
+"""
+import argparse
+import json
+from contextlib import nullcontext
+from time import perf_counter, time
+
+from game_log import GameLogWriter
+from main import TicTacToe, check_game
+from metrics import FORMATS, Metrics
+from player import Bot
+from rng import derive_seed, new_seed
+
+BOT_LEVELS = Bot.LEVELS
+
+
+def percentile(values, percent):
+    """Function to compute nearest rank percentile.
+
+    Params:
+        values (list): Sorted list of numbers.
+        percent (float): Percentile from 0 to 100.
+
+    Returns: value (float) or None if values are empty.
+    """
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+def latency_report(latencies):
+    """Function to summarize per move latencies given in seconds.
+
+    Returns: report (dict): Latency percentiles in milliseconds.
+    """
+    latencies = sorted(latencies)
+    report = {'moves': len(latencies)}
+    for name, percent in (('p50', 50), ('p90', 90), ('p99', 99),
+                          ('max', 100)):
+        value = percentile(latencies, percent)
+        report[f'{name}_ms'] = None if value is None else value * 1000
+    return report
+
+
+def play_headless(game):
+    """Function to play the game without rendering, timing every move.
+
+    Params: game (TicTacToe): Game created with render=False.
+
+    Returns:
+        winner (str/None): 'X', 'O' or None for a draw.
+        latencies (tuple): Two lists of player1 and player2 move times.
+    """
+    latencies = ([], [])
+    game_finished, winner = False, None
+    while game_finished is False:
+        slot = 0 if game.current_player is game.player1 else 1
+        start = perf_counter()
+        game.make_move()
+        latencies[slot].append(perf_counter() - start)
+        game.change_current_player()
+        game_finished, winner = game.game_board.is_board_finished()
+    return winner, latencies
+
+
+def simulate(player_1, player_2, games, seed=None, size=3, win_length=None,
+             metrics=None, game_log=None):
+    """Function to play many headless games between two bots.
+
+    Params:
+        player_1 (str): Bot level playing 'X' sign.
+        player_2 (str): Bot level playing 'O' sign.
+        games (int): Number of games.
+        seed (int): Default = None, master seed, game number N is played
+                    with seed rng.derive_seed(seed, N), None means a seed
+                    drawn from random.
+        size (int): Default = 3, number of board's rows and columns.
+        win_length (int): Default = None, number of signs in a row needed
+                          to win, None means the board size.
+        metrics (Metrics): Default = None, instrumentation of the games.
+        game_log (GameLogWriter): Default = None, log of the games.
+
+    Returns: report (dict): JSON serializable simulation results.
+    """
+    for player in (player_1, player_2):
+        if player not in BOT_LEVELS:
+            raise ValueError(f'Unknown bot level: {player}')
+    if seed is None:
+        seed = new_seed()
+    results = {'player_1': 0, 'player_2': 0, 'draw': 0}
+    latencies = ([], [])
+    start = perf_counter()
+    for game_number in range(games):
+        game = TicTacToe(player_1, player_2, render=False, size=size,
+                         win_length=win_length, metrics=metrics,
+                         seed=derive_seed(seed, game_number))
+        started, game_start = time(), perf_counter()
+        with nullcontext() if metrics is None else metrics.profile():
+            winner, game_latencies = play_headless(game)
+        if game_log is not None:
+            game_log.append_game(game, started, perf_counter() - game_start)
+        if winner is None:
+            results['draw'] += 1
+        elif winner == game.player1.sign:
+            results['player_1'] += 1
+        else:
+            results['player_2'] += 1
+        latencies[0].extend(game_latencies[0])
+        latencies[1].extend(game_latencies[1])
+    elapsed = perf_counter() - start
+
+    moves = len(latencies[0]) + len(latencies[1])
+    return {
+        'player_1': player_1,
+        'player_2': player_2,
+        'games': games,
+        'seed': seed,
+        'size': size,
+        'win_length': win_length or size,
+        'results': results,
+        'rates': {key: value / games if games else 0.0
+                  for key, value in results.items()},
+        'moves': moves,
+        'elapsed_s': elapsed,
+        'games_per_second': games / elapsed if elapsed else None,
+        'moves_per_second': moves / elapsed if elapsed else None,
+        'latency': {
+            'player_1': latency_report(latencies[0]),
+            'player_2': latency_report(latencies[1]),
+            'all': latency_report(latencies[0] + latencies[1]),
+        },
+    }
+
+
+def build_parser():
+    """Function to create simulate subcommand arguments parser."""
+    parser = argparse.ArgumentParser(
+        prog='main.py simulate',
+        description='Play headless games between two bots.')
+    parser.add_argument('player_1', choices=BOT_LEVELS)
+    parser.add_argument('player_2', choices=BOT_LEVELS)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--size', type=int, default=3,
+                        help='number of board rows and columns')
+    parser.add_argument('--win-length', type=int, default=None,
+                        help='signs in a row needed to win, default: size')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help='write JSON report to the file')
+    parser.add_argument('--metrics',
+                        help='write metrics to the file, Prometheus text '
+                             'for .prom files and JSON otherwise')
+    parser.add_argument('--metrics-format', choices=FORMATS, default=None)
+    parser.add_argument('--profile-dir',
+                        help='write cProfile stats of every game to the '
+                             'directory')
+    parser.add_argument('--log', help='append the games to the game log file')
+    return parser
+
+
+def main(argv=None):
+    """The function running simulate subcommand."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        check_game(args.player_1, args.player_2, args.size, args.win_length)
+    except ValueError as error:
+        parser.error(str(error))
+    metrics = None
+    if args.metrics or args.profile_dir:
+        metrics = Metrics(profile_dir=args.profile_dir)
+    game_log = GameLogWriter(args.log) if args.log else None
+    try:
+        report = simulate(args.player_1, args.player_2, args.games,
+                          args.seed, args.size, args.win_length, metrics,
+                          game_log)
+    finally:
+        if game_log is not None:
+            game_log.close()
+    if args.metrics:
+        metrics.write(args.metrics, args.metrics_format)
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(report_json + '\n')
+    else:
+        print(report_json)
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""Perfect play table of every reachable Tic Tac Toe position.
+
+The table is built once with:
+    python solution_table.py build [path]
+
+File layout (little endian):
+    header: magic b'TTTS', format version (uint16), number of records
+            (uint32), CRC32 of the records (uint32)
+    records: one uint16 per base 3 board index (see BitBoard.index)
+        bits 0-8: mask of the best moves cells
+        bits 9-10: outcome for the player to move (see OUTCOMES)
+        bits 11-14: number of moves left until the end of the game
+A record equal to 0 marks unreachable or finished positions.
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from bitboard import BitBoard, CELL_MASKS, IS_WIN, POSITIONS_COUNT
+
+MAGIC = b'TTTS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHII')
+RECORD = struct.Struct('<H')
+DEFAULT_PATH = os.environ.get(
+    'TICTACTOE_SOLUTION_TABLE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 'solution_table.bin'))
+# outcome codes for the player to move
+LOSS, DRAW, WIN = 1, 2, 3
+OUTCOMES = {LOSS: 'loss', DRAW: 'draw', WIN: 'win'}
+
+
+def solve(board, sign, solution):
+    """Recursive function solving the position with depth aware negamax.
+    The same scores as Bot.alphabeta are used: winning with fewer signs
+    on the board scores higher.
+
+    Params:
+        board (BitBoard): TicTacToe game board.
+        sign (str): Sign of the player to move.
+        solution (dict): Solved positions, base 3 index: (score, best moves
+                         mask), filled by the function.
+
+    Returns: score (int): Score of the position for the player to move.
+    """
+    index = board.index()
+    if index in solution:
+        return solution[index][0]
+    stones = board.stone_count()
+    if IS_WIN[board.x_mask] or IS_WIN[board.o_mask]:
+        return stones - 10
+    if stones == 9:
+        return 0
+
+    best, best_mask = -1000, 0
+    opponents_sign = 'O' if sign == 'X' else 'X'
+    for cell in board.empty_cells():
+        board.place(cell, sign)
+        score = -solve(board, opponents_sign, solution)
+        board.undo()
+        if score > best:
+            best, best_mask = score, CELL_MASKS[cell]
+        elif score == best:
+            best_mask |= CELL_MASKS[cell]
+    solution[index] = (best, best_mask)
+    return best
+
+
+def encode_record(score, best_mask, stones):
+    """Function to pack solved position into uint16 record."""
+    if score > 0:
+        outcome, moves_left = WIN, 10 - score - stones
+    elif score < 0:
+        outcome, moves_left = LOSS, 10 + score - stones
+    else:
+        outcome, moves_left = DRAW, 9 - stones
+    return best_mask | outcome << 9 | moves_left << 11
+
+
+def build_records():
+    """Function to solve every reachable position.
+
+    Returns: records (bytes): Packed records of all base 3 board indexes.
+    """
+    solution = {}
+    solve(BitBoard(), 'X', solution)
+    records = bytearray(RECORD.size * POSITIONS_COUNT)
+    for index, (score, best_mask) in solution.items():
+        stones = BitBoard.from_index(index).stone_count()
+        RECORD.pack_into(records, index * RECORD.size,
+                         encode_record(score, best_mask, stones))
+    return bytes(records)
+
+
+def build(path=DEFAULT_PATH):
+    """Function to build the table file.
+
+    Params: path (str): Path of the created file.
+
+    Returns: path (str)
+    """
+    records = build_records()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, POSITIONS_COUNT,
+                         zlib.crc32(records))
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as table_file:
+        table_file.write(header)
+        table_file.write(records)
+    os.replace(tmp_path, path)
+    return path
+
+
+class SolutionTable:
+    """Read only, memory mapped perfect play table.
+
+    Attributes:
+        path (str): Path of the table file.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """The constructor for SolutionTable class.
+        Params: path (str): Path of the table file.
+
+        Raises: ValueError if the file is not a valid table of the current
+                format version.
+        """
+        self.path = path
+        with open(path, 'rb') as table_file:
+            self._map = mmap.mmap(table_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        expected_size = HEADER.size + RECORD.size * POSITIONS_COUNT
+        if len(self._map) != expected_size:
+            self.close()
+            raise ValueError(f'{path} has invalid size')
+        magic, version, count, checksum = HEADER.unpack_from(self._map)
+        if (magic, version, count) != (MAGIC, FORMAT_VERSION,
+                                       POSITIONS_COUNT):
+            self.close()
+            raise ValueError(f'{path} is stale or not a solution table')
+        if zlib.crc32(self._map[HEADER.size:]) != checksum:
+            self.close()
+            raise ValueError(f'{path} is corrupted')
+
+    def record(self, index):
+        """Returns uint16 record of base 3 board index."""
+        return RECORD.unpack_from(self._map,
+                                  HEADER.size + index * RECORD.size)[0]
+
+    def lookup(self, board):
+        """Method to look up solved position.
+
+        Params: board (BitBoard): TicTacToe game board.
+
+        Returns:
+            None if the position is finished or unreachable, else
+            (best_moves_mask, outcome, moves_left) tuple where outcome is
+            LOSS, DRAW or WIN for the player to move.
+        """
+        record = self.record(board.index())
+        if record == 0:
+            return None
+        return record & 0b111111111, record >> 9 & 0b11, record >> 11
+
+    def best_moves(self, board):
+        """Returns tuple of best moves cells indexes or empty tuple."""
+        solved = self.lookup(board)
+        if solved is None:
+            return ()
+        return tuple(index for index in range(9)
+                     if solved[0] & CELL_MASKS[index])
+
+    def close(self):
+        """Method to close memory map of the table."""
+        self._map.close()
+
+
+_default_table = None
+_default_loaded = False
+
+
+def load_default():
+    """Function to lazily open the default table once per process.
+
+    Returns: SolutionTable or None if the file is missing or stale.
+    """
+    global _default_table, _default_loaded
+    if not _default_loaded:
+        _default_loaded = True
+        try:
+            _default_table = SolutionTable(DEFAULT_PATH)
+        except (OSError, ValueError):
+            _default_table = None
+    return _default_table
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3) or sys.argv[1] != 'build':
+        print('Usage: python solution_table.py build [path]')
+        sys.exit(2)
+    print(f'Solution table written to {build(*sys.argv[2:])}')
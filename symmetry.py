@@ -0,0 +1,45 @@
+"""Symmetries of the 3x3 Tic Tac Toe board.
+
+The board has 8 symmetries (4 rotations, each optionally mirrored). Every
+symmetry is stored as a permutation of cell indices 0-8, where cell index is
+row * 3 + column, the same order as GameBoard.get_board(string_format=True).
+"""
+
+
+def _rotate(cells):
+    """Returns cells permutation rotated by 90 degrees clockwise."""
+    return tuple(cells[(2 - column) * 3 + row]
+                 for row in range(3) for column in range(3))
+
+
+def _mirror(cells):
+    """Returns cells permutation mirrored along the vertical axis."""
+    return tuple(cells[row * 3 + (2 - column)]
+                 for row in range(3) for column in range(3))
+
+
+def _build_symmetries():
+    """Creates the tuple of all 8 board symmetries, identity first."""
+    symmetries = []
+    cells = tuple(range(9))
+    for _ in range(4):
+        symmetries.append(cells)
+        symmetries.append(_mirror(cells))
+        cells = _rotate(cells)
+    return tuple(symmetries)
+
+
+SYMMETRIES = _build_symmetries()
+
+
+def canonical_string(board_string):
+    """Function to reduce the board under all 8 symmetries.
+
+    Params:
+        board_string (str): Board in '___X_O_XO' format.
+
+    Returns:
+        canonical (str): The lexicographically smallest equivalent board.
+    """
+    return min(''.join([board_string[i] for i in permutation])
+               for permutation in SYMMETRIES)
@@ -0,0 +1,269 @@
+"""Threat analysis for boards of any size.
+
+ThreatBoard extends SearchState, whose per line sign counters already tell
+for every line how many signs of each player it holds. One pass over the
+empty cells and the lines through them flags every cell that:
+    WIN - wins at once,
+    BLOCK - blocks the opponent's immediate win,
+    THREAT - makes a line one sign short of a win,
+    FORK - makes two such lines with different winning cells,
+    FORK_BLOCK - is a cell where the opponent would fork.
+The flags are written into a preallocated bytearray, so the analysis does
+not allocate anything.
+
+ThreatBoard.candidates applies the Newell and Simon move rules one by one
+(see RULES) and backs the 'tactical' bot level. The chosen cells are
+written into the preallocated moves list, and the bot resets one board
+per move with set_rows, so choosing a move does not allocate lists either.
+"""
+from functools import lru_cache
+
+from search_state import EMPTY, SearchState
+from game_board import winning_lines
+
+WIN, BLOCK, THREAT, FORK, FORK_BLOCK = 1, 2, 4, 8, 16
+RULES = ('win', 'block', 'fork', 'block_fork', 'center', 'opposite_corner',
+         'corner', 'side')
+
+
+@lru_cache(maxsize=None)
+def _line_cells(size, win_length):
+    """Creates tuple of cells indexes of every winning line, built once
+    per board size and win length."""
+    return tuple(tuple(cord_x * size + cord_y for cord_x, cord_y in line)
+                 for line in winning_lines(size, win_length))
+
+
+@lru_cache(maxsize=None)
+def _rule_cells(size):
+    """Creates tuples of the center cells, the corners, the (corner,
+    opposite corner) pairs and the side cells (edge cells other than the
+    corners) used by the rules, built once per board size."""
+    last = size - 1
+    cells_count = size * size
+    middle = {(size - 1) // 2, size // 2}
+    center = tuple(sorted(cord_x * size + cord_y for cord_x in middle
+                          for cord_y in middle))
+    corners = tuple(sorted({0, last, last * size, cells_count - 1}))
+    opposite = tuple((corner, cells_count - 1 - corner)
+                     for corner in corners)
+    sides = tuple(cell for cell in range(cells_count)
+                  if cell not in corners
+                  and (cell // size in (0, last) or cell % size in (0, last)))
+    return center, corners, opposite, sides
+
+
+class ThreatBoard(SearchState):
+    """SearchState with threat analysis of the empty cells.
+
+    Attributes:
+        flags (bytearray): Threat flags of every cell set by analyze.
+        replies (list): Cell where the opponent has to answer the THREAT
+                        move of every cell, set by analyze.
+        moves (list): Cells chosen by flagged or candidates, only the first
+                      count items returned by them are valid.
+    """
+    __slots__ = ('flags', 'replies', 'moves', '_line_cells', '_rule_cells')
+
+    def __init__(self, size=3, win_length=None, count_nodes=False):
+        """The constructor for ThreatBoard class.
+        Params:
+            size (int): Default = 3, number of board's rows and columns.
+            win_length (int): Default = None, number of signs in a row
+                              needed to win, None means the board size.
+            count_nodes (bool): Default = False, see SearchState.
+        """
+        super().__init__(size, win_length, count_nodes)
+        self.flags = bytearray(size * size)
+        self.replies = [-1] * (size * size)
+        self.moves = [0] * (size * size)
+        self._line_cells = _line_cells(size, self.win_length)
+        self._rule_cells = _rule_cells(size)
+
+    def analyze(self, player):
+        """Method to flag the empty cells for the player to move.
+
+        Params: player (int): X or O, the player to move.
+
+        Returns: found (int): Bitwise or of the flags of all cells.
+        """
+        own_counts = self.counts[player]
+        opponents_counts = self.counts[3 - player]
+        cells = self.cells
+        flags = self.flags
+        replies = self.replies
+        cell_lines = self._cell_lines
+        line_cells = self._line_cells
+        win_count = self.win_length - 1
+        threat_count = self.win_length - 2
+        cells_count = self.size * self.size
+        found = 0
+        cell = 0
+        while cell < cells_count:
+            cell_flags = 0
+            if cells[cell] == EMPTY:
+                own_reply = opponents_reply = -1
+                lines = cell_lines[cell]
+                index, lines_count = 0, len(lines)
+                while index < lines_count:
+                    line = lines[index]
+                    index += 1
+                    own = own_counts[line]
+                    opponents = opponents_counts[line]
+                    if own and opponents:
+                        continue
+                    if opponents == 0 and own == win_count:
+                        cell_flags |= WIN
+                    elif own == 0 and opponents == win_count:
+                        cell_flags |= BLOCK
+                    elif own == threat_count or opponents == threat_count:
+                        # the other empty cell of the line wins after
+                        # the sign is put into this cell
+                        reply = self._other_empty(line_cells[line], cell)
+                        if opponents == 0:
+                            if own_reply == -1:
+                                own_reply = reply
+                                cell_flags |= THREAT
+                            elif reply != own_reply:
+                                cell_flags |= FORK
+                        if own == 0:
+                            if opponents_reply == -1:
+                                opponents_reply = reply
+                            elif reply != opponents_reply:
+                                cell_flags |= FORK_BLOCK
+                replies[cell] = own_reply
+            flags[cell] = cell_flags
+            found |= cell_flags
+            cell += 1
+        return found
+
+    def _other_empty(self, line, cell):
+        """Method to find the empty cell of the line other than cell."""
+        cells = self.cells
+        index, line_length = 0, len(line)
+        while index < line_length:
+            other = line[index]
+            if other != cell and cells[other] == EMPTY:
+                return other
+            index += 1
+        return -1
+
+    def flagged(self, flag):
+        """Method to write the cells with the flag set by analyze into moves.
+
+        Returns: count (int): Number of the cells.
+        """
+        flags, moves = self.flags, self.moves
+        cell, cells_count = 0, len(flags)
+        count = 0
+        while cell < cells_count:
+            if flags[cell] & flag:
+                moves[count] = cell
+                count += 1
+            cell += 1
+        return count
+
+    def _empty_of(self, cells):
+        """Method to write the empty cells of tuple of cells into moves.
+
+        Returns: count (int): Number of the empty cells.
+        """
+        board, moves = self.cells, self.moves
+        index, cells_count = 0, len(cells)
+        count = 0
+        while index < cells_count:
+            cell = cells[index]
+            if board[cell] == EMPTY:
+                moves[count] = cell
+                count += 1
+            index += 1
+        return count
+
+    def _all_empty(self):
+        """Method to write all empty cells into moves.
+
+        Returns: count (int): Number of the empty cells.
+        """
+        board, moves = self.cells, self.moves
+        cell, cells_count = 0, len(board)
+        count = 0
+        while cell < cells_count:
+            if board[cell] == EMPTY:
+                moves[count] = cell
+                count += 1
+            cell += 1
+        return count
+
+    def _forcing(self):
+        """Method to write into moves the THREAT cells whose reply is not
+        a FORK_BLOCK cell, the opponent has to block where it cannot fork.
+
+        Returns: count (int): Number of the cells.
+        """
+        flags, replies, moves = self.flags, self.replies, self.moves
+        cell, cells_count = 0, len(flags)
+        count = 0
+        while cell < cells_count:
+            if flags[cell] & THREAT and not flags[replies[cell]] & FORK_BLOCK:
+                moves[count] = cell
+                count += 1
+            cell += 1
+        return count
+
+    def _opposite_corners(self, player):
+        """Method to write into moves the empty corners opposite to the
+        opponent's corners.
+
+        Returns: count (int): Number of the corners.
+        """
+        opposite = self._rule_cells[2]
+        cells, moves = self.cells, self.moves
+        index, pairs_count = 0, len(opposite)
+        count = 0
+        while index < pairs_count:
+            corner, other = opposite[index]
+            if cells[corner] == EMPTY and cells[other] == 3 - player:
+                moves[count] = corner
+                count += 1
+            index += 1
+        return count
+
+    def candidates(self, player, strength=len(RULES)):
+        """Method to choose the best moves by the first matching rule.
+
+        Params:
+            player (int): X or O, the player to move.
+            strength (int): Default = len(RULES), number of RULES used, the
+                            rules are tried in order, 2 plays like 'medium'
+                            bot and 0 plays at random.
+
+        Returns: count (int): Number of the chosen cells, written into
+                 moves in ascending order, all empty cells if no used rule
+                 matches.
+        """
+        found = self.analyze(player)
+        center, corners, _opposite, sides = self._rule_cells
+        count = 0
+        rule_no = 0
+        while rule_no < strength and not count:
+            rule = RULES[rule_no]
+            rule_no += 1
+            if rule == 'win' and found & WIN:
+                count = self.flagged(WIN)
+            elif rule == 'block' and found & BLOCK:
+                count = self.flagged(BLOCK)
+            elif rule == 'fork' and found & FORK:
+                count = self.flagged(FORK)
+            elif rule == 'block_fork' and found & FORK_BLOCK:
+                count = self.flagged(FORK_BLOCK)
+                if count > 1:
+                    count = self._forcing() or self.flagged(FORK_BLOCK)
+            elif rule == 'center':
+                count = self._empty_of(center)
+            elif rule == 'opposite_corner':
+                count = self._opposite_corners(player)
+            elif rule == 'corner':
+                count = self._empty_of(corners)
+            elif rule == 'side':
+                count = self._empty_of(sides)
+        return count or self._all_empty()
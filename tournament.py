@@ -0,0 +1,171 @@
+"""Parallel bot versus bot tournaments.
+
+Usage:
+    python main.py tournament PLAYER_1 PLAYER_2 [--games N] [--seed S]
+                              [--workers W] [--executor process|thread|serial]
+                              [--chunk-size C] [--size N] [--win-length K]
+                              [--output FILE]
+
+Games are split into chunks of fixed size and the chunk results are
+merged in chunk order. Every game is played with its own seed derived from
+the master seed and the game number (see rng.py), so the results do not
+depend on the number of workers or the executor, and any game can be
+replayed from its seed alone.
+"""
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+
+from main import TicTacToe, check_game
+from rng import derive_seed
+from simulate import BOT_LEVELS, play_headless
+
+CHUNK_SIZE = 1000
+EXECUTORS = ('process', 'thread', 'serial')
+
+
+def play_chunk(task):
+    """Function to play one chunk of games, run by the pool workers.
+
+    Params:
+        task (tuple): (player_1, player_2, first game number, games,
+                      master seed, size, win_length)
+
+    Returns: results (dict): Chunk results counters and moves timing.
+    """
+    player_1, player_2, first_game, games, seed, size, win_length = task
+    results = {'player_1': 0, 'player_2': 0, 'draw': 0, 'moves': 0,
+               'move_time_s': 0.0}
+    for game_number in range(first_game, first_game + games):
+        game = TicTacToe(player_1, player_2, render=False, size=size,
+                         win_length=win_length,
+                         seed=derive_seed(seed, game_number))
+        winner, latencies = play_headless(game)
+        if winner is None:
+            results['draw'] += 1
+        elif winner == game.player1.sign:
+            results['player_1'] += 1
+        else:
+            results['player_2'] += 1
+        for player_latencies in latencies:
+            results['moves'] += len(player_latencies)
+            results['move_time_s'] += sum(player_latencies)
+    return results
+
+
+def run_tournament(player_1, player_2, games, seed=0, workers=None,
+                   executor='process', chunk_size=CHUNK_SIZE, size=3,
+                   win_length=None):
+    """Function to play many games between two bots on a pool of workers.
+
+    Params:
+        player_1 (str): Bot level playing 'X' sign.
+        player_2 (str): Bot level playing 'O' sign.
+        games (int): Number of games.
+        seed (int): Default = 0, master seed of the tournament.
+        workers (int): Default = None, number of workers, None means
+                       the number of processors.
+        executor (str): Default = 'process', 'process', 'thread' or 'serial'.
+        chunk_size (int): Default = CHUNK_SIZE, number of games per task.
+        size (int): Default = 3, number of board's rows and columns.
+        win_length (int): Default = None, number of signs in a row needed
+                          to win, None means the board size.
+
+    Returns: report (dict): JSON serializable tournament results.
+    """
+    for player in (player_1, player_2):
+        if player not in BOT_LEVELS:
+            raise ValueError(f'Unknown bot level: {player}')
+    if executor not in EXECUTORS:
+        raise ValueError(f'Unknown executor: {executor}')
+    if chunk_size < 1:
+        raise ValueError('chunk_size should be a positive number')
+    tasks = []
+    for first_game in range(0, games, chunk_size):
+        chunk_games = min(chunk_size, games - first_game)
+        tasks.append((player_1, player_2, first_game, chunk_games, seed,
+                      size, win_length))
+
+    start = perf_counter()
+    if executor == 'serial':
+        chunks = [play_chunk(task) for task in tasks]
+    else:
+        pool_class = ProcessPoolExecutor if executor == 'process' \
+            else ThreadPoolExecutor
+        with pool_class(workers) as pool:
+            # map returns results in tasks order, whichever worker ends first
+            chunks = list(pool.map(play_chunk, tasks))
+    elapsed = perf_counter() - start
+
+    totals = {'player_1': 0, 'player_2': 0, 'draw': 0, 'moves': 0,
+              'move_time_s': 0.0}
+    for chunk in chunks:
+        for key in totals:
+            totals[key] += chunk[key]
+    results = {key: totals[key] for key in ('player_1', 'player_2', 'draw')}
+    return {
+        'player_1': player_1,
+        'player_2': player_2,
+        'games': games,
+        'seed': seed,
+        'size': size,
+        'win_length': win_length or size,
+        'executor': executor,
+        'workers': workers,
+        'chunks': len(tasks),
+        'chunk_size': chunk_size,
+        'results': results,
+        'rates': {key: value / games if games else 0.0
+                  for key, value in results.items()},
+        'moves': totals['moves'],
+        'elapsed_s': elapsed,
+        'games_per_second': games / elapsed if elapsed else None,
+        'moves_per_second': totals['moves'] / elapsed if elapsed else None,
+        'mean_move_latency_ms': (totals['move_time_s'] / totals['moves']
+                                 * 1000 if totals['moves'] else None),
+    }
+
+
+def build_parser():
+    """Function to create tournament subcommand arguments parser."""
+    parser = argparse.ArgumentParser(
+        prog='main.py tournament',
+        description='Play bot versus bot games on a pool of workers.')
+    parser.add_argument('player_1', choices=BOT_LEVELS)
+    parser.add_argument('player_2', choices=BOT_LEVELS)
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--size', type=int, default=3,
+                        help='number of board rows and columns')
+    parser.add_argument('--win-length', type=int, default=None,
+                        help='signs in a row needed to win, default: size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--executor', choices=EXECUTORS, default='process')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--output', help='write JSON report to the file')
+    return parser
+
+
+def main(argv=None):
+    """The function running tournament subcommand."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        check_game(args.player_1, args.player_2, args.size, args.win_length)
+    except ValueError as error:
+        parser.error(str(error))
+    report = run_tournament(args.player_1, args.player_2, args.games,
+                            args.seed, args.workers, args.executor,
+                            args.chunk_size, args.size, args.win_length)
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(report_json + '\n')
+    else:
+        print(report_json)
+    return 0
+
+
+if __name__ == '__main__':
+    main()
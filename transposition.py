@@ -0,0 +1,85 @@
+from collections import OrderedDict
+# threading.Lock is this function, importing threading would slow down the
+# start of every game
+from _thread import allocate_lock
+
+
+class TranspositionTable:
+    """Bounded cache of already searched positions with LRU eviction.
+    Bots in threads share the table, so entries and counters are changed
+    under a lock.
+
+    Attributes:
+        maxsize (int): Maximal number of stored positions.
+        hits (int): Number of successful lookups.
+        misses (int): Number of failed lookups.
+    """
+
+    def __init__(self, maxsize=100_000):
+        """The constructor for TranspositionTable class.
+        Params:
+            maxsize (int): Maximal number of stored positions, the least
+                           recently used position is evicted first.
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize should be a positive number')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = allocate_lock()
+
+    def get(self, key):
+        """Method to look up the stored value of a position.
+
+        Params: key (hashable): Position key.
+
+        Returns: value or None if the position is not stored.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Method to store value of a position.
+
+        Params:
+            key (hashable): Position key.
+            value: Value of the position, None is not allowed.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Method to remove all positions and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Method to return table usage counters.
+
+        Returns: stats (dict): size, maxsize, hits, misses and hit_rate.
+        """
+        with self._lock:
+            size, hits, misses = len(self._entries), self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'size': size,
+            'maxsize': self.maxsize,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._entries)